@@ -1,27 +1,51 @@
 import sys
 import os
+import argparse
+import profiler
+
+if __name__ == '__main__' and '--profile' in sys.argv:
+    # Switched on before the remaining imports so they are timed too
+    profiler.enable()
+profiler.start_span('imports')
+
 from PySide6.QtCore import QUrl, Qt, QSize, QOperatingSystemVersion, QTimer
-from PySide6.QtGui import QIcon, QPixmap, QAction, QPainter, QPainterPath, QRegion, QColor, QCursor
+from PySide6.QtGui import QAction, QPainter, QPainterPath, QRegion, QColor, QCursor, QStandardItemModel, QStandardItem
 from PySide6.QtWebEngineCore import (
     QWebEngineProfile, QWebEnginePage, QWebEngineSettings
 )
-from PySide6.QtWidgets import QApplication, QMainWindow, QLineEdit, QToolBar, QPushButton, QTabWidget, QWidget, QHBoxLayout, QLabel, QMenu, QInputDialog, QDialog, QTabBar, QMenu, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton, QMessageBox, QSizePolicy
+from PySide6.QtWidgets import QApplication, QMainWindow, QLineEdit, QToolBar, QPushButton, QTabWidget, QWidget, QHBoxLayout, QLabel, QMenu, QInputDialog, QDialog, QTabBar, QMenu, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton, QMessageBox, QSizePolicy, QFileDialog, QCompleter, QProgressBar, QCheckBox
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from functools import partial
 from custom_dialog import CustomInputDialog, DraggableTitle, ResourceDialog
 from error_handling import ErrorHandler
+from protocol_prober import ProtocolProber
+from hsts_store import HstsStore
+from url_classifier import UrlClassifier
+from omnibox_index import OmniboxIndex, OmniboxEntry
 from protocol_handler import ProtocolHandler
 from page_templates import PageTemplates
 
 from download_manager import DownloadManager
 from microphone_manager import MicrophoneManager
 from tab_manager import add_new_tab, RoundedWebView
-from styles import get_main_window_style, get_toolbar_style, get_button_style, get_line_edit_style, get_bookmark_menu_style, get_bookmark_header_style
+from styles import DEFAULT_THEME, THEMES, apply_theme, theme_color
 from event_handler import DraggableTitleBar
 from bookmark_manager import BookmarkManager
+from bookmark_importer import BookmarkImporter
 from resource_manager import ResourceManager
-from custom_network_manager import ThrottledNetworkManager
+from custom_network_manager import ThrottledNetworkManager, NetworkLimiter
 from fingerprint_manager import FingerprintManager
+from chromium_flags import PRESETS, apply_flags, selected_preset
+import asset_registry as assets
+
+profiler.end_span('imports')
+
+# Slots wrapped in cProfile by --profile; --profile-slots picks a subset
+PROFILED_SLOTS = {
+    'add_new_tab': 'Browser',
+    'show_bookmark_menu': 'Browser',
+    'interceptRequest': 'NetworkLimiter',
+}
 
 class CustomTabBar(QTabBar):
     def mousePressEvent(self, event):
@@ -36,7 +60,7 @@ class CustomBookmarkMenu(QWidget):
         super().__init__(parent, Qt.Popup)
         self.setWindowFlags(Qt.Popup | Qt.FramelessWindowHint | Qt.NoDropShadowWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setStyleSheet(get_bookmark_menu_style())
+        self.setObjectName("bookmarkMenu")
         
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(5, 5, 5, 5)
@@ -50,12 +74,14 @@ class CustomBookmarkMenu(QWidget):
         
         # Header
         header = QLabel("Bookmarks")
-        header.setStyleSheet(get_bookmark_header_style())
+        header.setObjectName("bookmarkMenuHeader")
         self.layout.addWidget(header)
         
         # Add bookmark container to main layout
         self.layout.addWidget(self.bookmark_container)
 
+        self.import_btn = None
+
         # Set a minimum width but allow expansion
         self.setMinimumWidth(300)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
@@ -76,6 +102,12 @@ class CustomBookmarkMenu(QWidget):
             bookmark_id, title, url = bookmark
             self.add_bookmark_item(title, url, bookmark_id, callbacks)
 
+        # Import button stays below the bookmark list
+        if self.import_btn is None and 'import' in callbacks:
+            self.import_btn = QPushButton("Import Bookmarks...")
+            self.import_btn.clicked.connect(callbacks['import'])
+            self.layout.addWidget(self.import_btn)
+
     def add_bookmark_item(self, title, url, bookmark_id, callbacks):
         item_widget = QWidget()
         item_layout = QHBoxLayout(item_widget)
@@ -95,14 +127,14 @@ class CustomBookmarkMenu(QWidget):
         
         # Edit button
         edit_btn = QPushButton()
-        edit_btn.setIcon(QIcon('Images/edit-64.png'))
+        edit_btn.setIcon(assets.icon('edit-64.png'))
         edit_btn.setFixedSize(24, 24)
         edit_btn.clicked.connect(lambda: callbacks['rename'](bookmark_id))
         action_layout.addWidget(edit_btn)
         
         # Delete button
         delete_btn = QPushButton()
-        delete_btn.setIcon(QIcon('Images/delete-64.png'))
+        delete_btn.setIcon(assets.icon('delete-64.png'))
         delete_btn.setFixedSize(24, 24)
         delete_btn.clicked.connect(lambda: callbacks['delete'](bookmark_id))
         action_layout.addWidget(delete_btn)
@@ -132,23 +164,56 @@ class CustomBookmarkMenu(QWidget):
             self.hide()
 
 class Browser(QMainWindow):
-    def __init__(self):
+    def __init__(self, theme=DEFAULT_THEME):
         super().__init__()
+        profiler.start_span('Browser.__init__')
+        # One stylesheet for the whole application, in place before any widget is polished
+        apply_theme(QApplication.instance(), theme)
+        self.setObjectName("browserWindow")
         self.setWindowTitle("KEPLER COMMUNITY")
         self.setGeometry(100, 100, 1200, 800)
-        self.setStyleSheet(get_main_window_style())
         # Remove transparency
         self.setAttribute(Qt.WA_TranslucentBackground, False)
         
         # Set frameless window hint
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
 
+        profiler.start_span('Browser.__init__: managers')
         self.download_manager = DownloadManager()
         self.microphone_manager = MicrophoneManager()
         self.bookmark_manager = BookmarkManager()
+        self.bookmark_importer = BookmarkImporter(self.bookmark_manager, parent=self)
+        self.bookmark_importer.progress.connect(
+            lambda count: self.statusBar().showMessage(f"Importing bookmarks... {count} entries")
+        )
+        self.bookmark_importer.finished.connect(
+            lambda count: self.statusBar().showMessage(f"Imported {count} entries", 5000)
+        )
+        self.bookmark_importer.finished.connect(lambda count: self.load_omnibox_index())
+        self.bookmark_importer.error.connect(
+            lambda message: self.statusBar().showMessage(f"Import failed: {message}", 5000)
+        )
         self.resource_manager = ResourceManager()
+        # Before any web view exists, so the engine's child processes inherit the job
+        self.resource_manager.start_job()
+        self.hsts_store = HstsStore()
+        self.protocol_prober = ProtocolProber(hsts_store=self.hsts_store, parent=self)
+        self.url_classifier = UrlClassifier()
+
+        # Autocomplete index; filled after the first paint and patched incrementally afterwards
+        self.omnibox_index = OmniboxIndex()
+        self.bookmark_manager.bookmark_added.connect(
+            lambda title, url: self.omnibox_index.set_bookmarked(url, True, title)
+        )
+        self.bookmark_manager.bookmark_removed.connect(
+            lambda url: self.omnibox_index.set_bookmarked(url, self.bookmark_manager.is_bookmarked(url))
+        )
+        self.bookmark_manager.bookmark_renamed.connect(self.omnibox_index.set_title)
+        self.protocol_prober.hsts_header.connect(self.hsts_store.observe)
+        profiler.end_span('Browser.__init__: managers')
         
         # Set custom User-Agent
+        profiler.start_span('Browser.__init__: web profile')
         profile = QWebEngineProfile.defaultProfile()
         
         # Determine the Windows version first
@@ -204,41 +269,6 @@ class Browser(QMainWindow):
         settings.setAttribute(QWebEngineSettings.WebGLEnabled, True)
         settings.setAttribute(QWebEngineSettings.WebRTCPublicInterfacesOnly, False)
         
-        # Disable Google services and safebrowsing
-        os.environ["QTWEBENGINE_DISABLE_SANDBOX"] = "0"  # Keep sandbox enabled
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--disable-gpu-driver-bug-workarounds"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-breakpad"  # Disable crash reporting
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=OptimizationHints"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=MediaRouter"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=NetworkService"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=AudioServiceOutOfProcess"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-speech-api"  # Disable speech recognition
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-background-networking"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-component-update"  # Prevent auto-updates
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-default-apps"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-sync"  # Disable Chrome Sync
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-translate"  # Disable Google Translate
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-webrtc-hw-encoding"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-client-side-phishing-detection"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=AutofillServerCommunication"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=Translate"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=ChromeWhatsNew"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=SafetyCheck"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=ChromeCart"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=TabGroups"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=TabHoverCards"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=DesktopPWAs"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=WebOTP"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=WebPayments"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=WebUSB"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=WebXR"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --disable-features=WebAuthentication"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --no-pings"  # Disable hyperlink auditing
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --no-proxy-server"  # Disable proxy
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --no-service-autorun"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --safebrowsing-disable-auto-update"
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += " --safebrowsing-disable-download-protection"
-
         # Additional privacy-focused profile settings
         profile.setPersistentStoragePath("")  # Disable persistent storage by setting empty path
         profile.setHttpCacheType(QWebEngineProfile.NoCache)  # Disable HTTP cache
@@ -258,17 +288,17 @@ class Browser(QMainWindow):
         settings.setAttribute(QWebEngineSettings.PluginsEnabled, False)  # Disable plugins
         settings.setAttribute(QWebEngineSettings.PdfViewerEnabled, False)  # Disable PDF viewer
 
+        profiler.end_span('Browser.__init__: web profile')
+
         # Initialize fingerprint manager
+        profiler.start_span('Browser.__init__: fingerprint')
         self.fingerprint_manager = FingerprintManager()
         
-        # Get JavaScript code for fingerprint randomization
-        self.anti_fingerprint_js = self.fingerprint_manager.apply_fingerprint(profile, settings)
-        
-        # Set up timer for periodic fingerprint rotation
-        self.fingerprint_timer = QTimer(self)
-        self.fingerprint_timer.timeout.connect(self.rotate_fingerprint)
-        self.fingerprint_timer.start(1800000)  # Rotate every 30 minutes
+        # Rotate the profile-wide HTTP identity; per-site scripts are installed by each page on navigation
+        http_fingerprint = self.fingerprint_manager.apply_fingerprint(profile, settings)
+        profiler.end_span('Browser.__init__: fingerprint')
         
+        profiler.start_span('Browser.__init__: window')
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabBar(CustomTabBar())
         self.tab_widget.setTabsClosable(True)
@@ -277,8 +307,7 @@ class Browser(QMainWindow):
         self.tab_widget.customContextMenuRequested.connect(self.show_tab_context_menu)
         self.setCentralWidget(self.tab_widget)
 
-        self.toolbar = QToolBar()
-        self.toolbar.setStyleSheet(get_toolbar_style())
+        self.toolbar = QToolBar(self)
         self.addToolBar(self.toolbar)
 
         self.add_navigation_buttons()
@@ -287,18 +316,23 @@ class Browser(QMainWindow):
         # Check if the current OS is Windows 10
         self.is_windows_10 = QOperatingSystemVersion.current() == QOperatingSystemVersion.Windows10
 
-        # Use a timer to defer loading of the first tab
-        QTimer.singleShot(0, self.load_initial_tab)
+        # The first tab and everything not needed to draw the window wait for the first paint
+        self._first_paint_done = False
 
         self.init_title_bar()
+        profiler.end_span('Browser.__init__: window')
+
+        # Route downloads through the download scheduler
+        profile.downloadRequested.connect(self.download_manager.on_download_requested)
+        self.download_manager.attach_cookie_store(profile.cookieStore())
 
         # Set up the custom network manager
         self.network_manager = ThrottledNetworkManager(self.resource_manager)
         profile.setUrlRequestInterceptor(self.network_manager.get_interceptor())
-
-        self.resource_update_timer = QTimer(self)
-        self.resource_update_timer.timeout.connect(self.update_resource_usage)
-        self.resource_update_timer.start(1000)  # Update every second
+        self.network_manager.get_interceptor().set_hsts_store(self.hsts_store)
+        self.network_manager.get_interceptor().set_header_profile(
+            self.fingerprint_manager.build_header_profile(http_fingerprint)
+        )
 
         # Connect the tab changed signal
         self.tab_widget.currentChanged.connect(self.on_tab_changed)
@@ -311,46 +345,77 @@ class Browser(QMainWindow):
         # Connect to bookmark manager signals
         self.bookmark_manager.bookmarks_updated.connect(self.on_bookmarks_updated)
         self.current_bookmark_menu = None  # Keep track of the current menu
+        profiler.end_span('Browser.__init__')
+
+    def finish_startup(self):
+        """Second half of startup, run once the window has painted for the first time."""
+        profiler.start_span('finish_startup')
+        profiler.start_span('first tab load')
+        self.load_initial_tab()
+        if profiler.enabled:
+            self.tab_widget.currentWidget().loadFinished.connect(lambda ok: profiler.end_span('first tab load'))
+
+        self.resource_manager.start()
+        self.download_manager.attach_network_limiter(self.network_manager.get_interceptor(), self.resource_manager)
+
+        self.resource_update_timer = QTimer(self)
+        self.resource_update_timer.timeout.connect(self.update_resource_usage)
+        self.resource_update_timer.start(1000)  # Update every second
+
+        # Set up timer for periodic fingerprint rotation
+        self.fingerprint_timer = QTimer(self)
+        self.fingerprint_timer.timeout.connect(self.rotate_fingerprint)
+        self.fingerprint_timer.start(1800000)  # Rotate every 30 minutes
 
         self.setup_privacy_timer()
 
+        # Indexing history can take a while, let the first tab start loading before it
+        QTimer.singleShot(0, self.load_omnibox_index)
+        # PortAudio takes a while to scan devices; do it now so granting the microphone is quick
+        self.microphone_manager.warm_up()
+        profiler.end_span('finish_startup')
+
+    def set_theme(self, theme):
+        """Restyle every widget by swapping the application stylesheet."""
+        apply_theme(QApplication.instance(), theme)
+        self.update()
+
     def init_title_bar(self):
         self.title_bar = DraggableTitleBar(self)
         self.title_bar.setObjectName("titleBar")
-        self.title_bar.setStyleSheet("background-color: #240970;")
 
         self.title_bar_layout = QHBoxLayout(self.title_bar)
         self.title_bar_layout.setContentsMargins(0, 0, 0, 0)
         self.title_bar_layout.setSpacing(0)
 
         self.title_icon = QLabel(self.title_bar)
-        self.title_icon.setPixmap(QPixmap('Images/KEPLER-COMMUNITY-ICO.png').scaled(24, 24, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.title_icon.setPixmap(assets.pixmap('KEPLER-COMMUNITY-ICO.png', 24))
         self.title_bar_layout.addWidget(self.title_icon)
 
         self.title_label = QLabel("KEPLER COMMUNITY [ALPHA]", self.title_bar)
-        self.title_label.setStyleSheet("color: white; padding: 5px; font-size: 16px; font-weight: bold; font-family: 'Trebuchet MS', sans-serif;")
+        self.title_label.setObjectName("windowTitleLabel")
         self.title_bar_layout.addWidget(self.title_label)
 
         self.title_bar_layout.addStretch()
 
         minimize_btn = QPushButton(self.title_bar)
-        minimize_btn.setIcon(QIcon('Images/minimize-64.png'))
+        minimize_btn.setIcon(assets.icon('minimize-64.png'))
         minimize_btn.setIconSize(QSize(24, 24))
-        minimize_btn.setStyleSheet(get_button_style())
+        minimize_btn.setProperty("chromeButton", True)
         minimize_btn.clicked.connect(self.showMinimized)
         self.title_bar_layout.addWidget(minimize_btn)
 
         self.maximize_btn = QPushButton(self.title_bar)
-        self.maximize_btn.setIcon(QIcon('Images/maximize-64.png'))
+        self.maximize_btn.setIcon(assets.icon('maximize-64.png'))
         self.maximize_btn.setIconSize(QSize(24, 24))
-        self.maximize_btn.setStyleSheet(get_button_style())
+        self.maximize_btn.setProperty("chromeButton", True)
         self.maximize_btn.clicked.connect(self.toggle_maximize_restore)
         self.title_bar_layout.addWidget(self.maximize_btn)
 
         close_btn = QPushButton(self.title_bar)
-        close_btn.setIcon(QIcon('Images/close-64.png'))
+        close_btn.setIcon(assets.icon('close-64.png'))
         close_btn.setIconSize(QSize(24, 24))
-        close_btn.setStyleSheet(get_button_style())
+        close_btn.setProperty("chromeButton", True)
         close_btn.clicked.connect(self.close)
         self.title_bar_layout.addWidget(close_btn)
 
@@ -359,16 +424,16 @@ class Browser(QMainWindow):
     def toggle_maximize_restore(self):
         if self.isMaximized():
             self.showNormal()
-            self.maximize_btn.setIcon(QIcon('Images/maximize-64.png'))
+            self.maximize_btn.setIcon(assets.icon('maximize-64.png'))
         else:
             self.showMaximized()
-            self.maximize_btn.setIcon(QIcon('Images/restore-64.png'))
+            self.maximize_btn.setIcon(assets.icon('restore-64.png'))
             self.clearMask()
 
     def showNormal(self):
         super().showNormal()
         self.resize(1200, 800)  # Reset to original size
-        self.maximize_btn.setIcon(QIcon('Images/maximize-64.png'))
+        self.maximize_btn.setIcon(assets.icon('maximize-64.png'))
         if not self.is_windows_10:
             self.setMask(self.roundedMask())
 
@@ -379,47 +444,70 @@ class Browser(QMainWindow):
         nav_layout.setSpacing(5)
 
         back_btn = QPushButton()
-        back_btn.setIcon(QIcon('Images/return-64.png'))
+        back_btn.setIcon(assets.icon('return-64.png'))
         back_btn.setIconSize(QSize(24, 24))
-        back_btn.setStyleSheet(get_button_style())
+        back_btn.setProperty("chromeButton", True)
         back_btn.clicked.connect(lambda: self.tab_widget.currentWidget().back())
         nav_layout.addWidget(back_btn)
 
         forward_btn = QPushButton()
-        forward_btn.setIcon(QIcon('Images/forward-64.png'))
+        forward_btn.setIcon(assets.icon('forward-64.png'))
         forward_btn.setIconSize(QSize(24, 24))
-        forward_btn.setStyleSheet(get_button_style())
+        forward_btn.setProperty("chromeButton", True)
         forward_btn.clicked.connect(lambda: self.tab_widget.currentWidget().forward())
         nav_layout.addWidget(forward_btn)
 
         reload_btn = QPushButton()
-        reload_btn.setIcon(QIcon('Images/refresh-64.png'))
+        reload_btn.setIcon(assets.icon('refresh-64.png'))
         reload_btn.setIconSize(QSize(24, 24))
-        reload_btn.setStyleSheet(get_button_style())
+        reload_btn.setProperty("chromeButton", True)
         reload_btn.clicked.connect(lambda: self.tab_widget.currentWidget().reload())
         nav_layout.addWidget(reload_btn)
 
         home_btn = QPushButton()
-        home_btn.setIcon(QIcon('Images/home-page-64.png'))
+        home_btn.setIcon(assets.icon('home-page-64.png'))
         home_btn.setIconSize(QSize(24, 24))
-        home_btn.setStyleSheet(get_button_style())
+        home_btn.setProperty("chromeButton", True)
         home_btn.clicked.connect(lambda: self.load_homepage())
         nav_layout.addWidget(home_btn)
 
         new_tab_button = QPushButton()
-        new_tab_button.setIcon(QIcon('Images/add-new-64.png'))
+        new_tab_button.setIcon(assets.icon('add-new-64.png'))
         new_tab_button.setIconSize(QSize(24, 24))
-        new_tab_button.setStyleSheet(get_button_style())
+        new_tab_button.setProperty("chromeButton", True)
         new_tab_button.clicked.connect(lambda: self.add_new_tab())
         nav_layout.addWidget(new_tab_button)
 
         resource_btn = QPushButton()
-        resource_btn.setIcon(QIcon('Images/resource-64.png'))
+        resource_btn.setIcon(assets.icon('resource-64.png'))
         resource_btn.setIconSize(QSize(24, 24))
-        resource_btn.setStyleSheet(get_button_style())
+        resource_btn.setProperty("chromeButton", True)
         resource_btn.clicked.connect(self.show_resource_dialog)
         nav_layout.addWidget(resource_btn)
 
+        self.mic_btn = QPushButton()
+        self.mic_btn.setObjectName("micButton")
+        self.mic_btn.setIcon(assets.icon('microphone-64.png'))
+        self.mic_btn.setIconSize(QSize(24, 24))
+        self.mic_btn.setProperty("chromeButton", True)
+        self.mic_btn.setCheckable(True)
+        self.mic_btn.setToolTip("Microphone")
+        self.mic_btn.clicked.connect(self.toggle_microphone)
+        nav_layout.addWidget(self.mic_btn)
+
+        # Input level while the microphone is on, -60 to 0 dBFS
+        self.mic_level = QProgressBar()
+        self.mic_level.setObjectName("micLevel")
+        self.mic_level.setOrientation(Qt.Vertical)
+        self.mic_level.setRange(0, 60)
+        self.mic_level.setTextVisible(False)
+        self.mic_level.setFixedSize(6, 24)
+        self.mic_level.hide()
+        nav_layout.addWidget(self.mic_level)
+
+        self.microphone_manager.active_changed.connect(self.on_microphone_active_changed)
+        self.microphone_manager.level_meter.levels_changed.connect(self.update_microphone_level)
+
         self.toolbar.addWidget(nav_widget)
 
     def load_homepage(self):
@@ -427,22 +515,31 @@ class Browser(QMainWindow):
         current_widget = self.tab_widget.currentWidget()
         if current_widget:
             homepage_content = PageTemplates.get_homepage()
-            base_url = QUrl.fromLocalFile(os.path.abspath('Images/'))
+            base_url = QUrl.fromLocalFile(assets.IMAGES_DIR)
             current_widget.setHtml(homepage_content, base_url)
 
     def load_initial_tab(self):
         """Load the initial tab with homepage."""
         self.add_new_tab(None, "Homepage")
 
-    def add_new_tab(self, qurl=None, label="New Tab"):
+    def add_new_tab(self, qurl=None, label="New Tab", html=None):
         """Add a new tab with the given URL or homepage if none provided."""
-        browser = add_new_tab(self.tab_widget, self.url_bar, self.download_manager, qurl, label)
+        browser = add_new_tab(self.tab_widget, self.url_bar, self.download_manager, qurl, label, html)
         browser.titleChanged.connect(lambda title, browser=browser: self.update_tab_title(browser, title))
-        browser.page().featurePermissionRequested.connect(self.handle_permission_request)
-        
-        # Inject anti-fingerprinting JavaScript
-        browser.page().loadFinished.connect(
-            lambda: browser.page().runJavaScript(self.anti_fingerprint_js)
+        browser.page().featurePermissionRequested.connect(
+            lambda origin, feature, page=browser.page(): self.handle_permission_request(page, origin, feature)
+        )
+        browser.page().fingerprint_manager = self.fingerprint_manager
+        browser.crash_recovery.crashed.connect(
+            lambda record: self.statusBar().showMessage(
+                f"Tab renderer {record['reason']} (exit code {record['exit_code']}), "
+                + ("reloading" if record['reloading'] else "too many crashes, not reloading"), 5000
+            )
+        )
+        browser.indexed_url = None
+        browser.urlChanged.connect(lambda qurl, browser=browser: self.on_tab_url_changed(browser, qurl))
+        browser.titleChanged.connect(
+            lambda title, browser=browser: browser.indexed_url and self.omnibox_index.set_title(browser.indexed_url, title)
         )
         
         # Set the new tab as the current tab
@@ -453,6 +550,17 @@ class Browser(QMainWindow):
 
         return browser
 
+    def open_fingerprint_benchmark(self):
+        """Open the fingerprint shim benchmark once with protection and once without."""
+        benchmark_page = PageTemplates.get_fingerprint_benchmark_page()
+        protected = self.add_new_tab(None, "Benchmark", benchmark_page)
+        unprotected = self.add_new_tab(None, "Benchmark", benchmark_page)
+        unprotected.page().fingerprint_manager = None
+        for tab in (protected, unprotected):
+            # WebGL is off profile-wide; the benchmark needs it to time the getParameter shim.
+            # Page settings override the profile's, and the tabs load on the next event loop turn.
+            tab.page().settings().setAttribute(QWebEngineSettings.WebGLEnabled, True)
+
     def add_url_bar(self):
         url_widget = QWidget()
         url_layout = QHBoxLayout(url_widget)
@@ -460,23 +568,32 @@ class Browser(QMainWindow):
         url_layout.setSpacing(5)
 
         self.url_bar = QLineEdit()
-        self.url_bar.setStyleSheet(get_line_edit_style())
+        self.url_bar.setObjectName("urlBar")
         self.url_bar.returnPressed.connect(self.navigate_to_url)
         url_layout.addWidget(self.url_bar)
 
+        # Suggestions are computed per keystroke by the omnibox index, so the completer never filters
+        self.completion_model = QStandardItemModel(self)
+        self.url_completer = QCompleter(self.completion_model, self)
+        self.url_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.url_completer.setCompletionRole(Qt.UserRole)
+        self.url_completer.activated.connect(self.navigate_to_completion)
+        self.url_bar.setCompleter(self.url_completer)
+        self.url_bar.textEdited.connect(self.update_completions)
+
         # Add to Bookmarks button
         add_bookmark_btn = QPushButton()
-        add_bookmark_btn.setIcon(QIcon('Images/bookmark-64.png'))
+        add_bookmark_btn.setIcon(assets.icon('bookmark-64.png'))
         add_bookmark_btn.setIconSize(QSize(24, 24))
-        add_bookmark_btn.setStyleSheet(get_button_style())
+        add_bookmark_btn.setProperty("chromeButton", True)
         add_bookmark_btn.clicked.connect(self.add_bookmark)
         url_layout.addWidget(add_bookmark_btn)
 
         # Bookmark Menu button
         bookmark_menu_btn = QPushButton()
-        bookmark_menu_btn.setIcon(QIcon('Images/bookmark-menu-64.png'))
+        bookmark_menu_btn.setIcon(assets.icon('bookmark-menu-64.png'))
         bookmark_menu_btn.setIconSize(QSize(24, 24))
-        bookmark_menu_btn.setStyleSheet(get_button_style())
+        bookmark_menu_btn.setProperty("chromeButton", True)
         bookmark_menu_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         bookmark_menu_btn.customContextMenuRequested.connect(self.show_bookmark_menu)
         bookmark_menu_btn.clicked.connect(lambda: self.show_bookmark_menu(bookmark_menu_btn))
@@ -499,8 +616,56 @@ class Browser(QMainWindow):
             browser.setMask(QRegion(path.toFillPolygon().toPolygon()))
 
     def navigate_to_url(self):
+        # Enter on a highlighted suggestion reaches the line edit while the popup is
+        # still open, with the typed text; the completer's activated navigates instead
+        popup = self.url_completer.popup()
+        if popup.isVisible() and popup.currentIndex().isValid():
+            return
         ProtocolHandler.handle_url(self, self.url_bar.text())
 
+    def navigate_to_completion(self, url):
+        self.url_bar.setText(url)
+        ProtocolHandler.handle_url(self, url)
+
+    def update_completions(self, text):
+        self.completion_model.clear()
+        for entry in self.omnibox_index.query(text):
+            item = QStandardItem(f"{entry.title}  —  {entry.url}" if entry.title else entry.url)
+            item.setData(entry.url, Qt.UserRole)
+            self.completion_model.appendRow(item)
+        if self.completion_model.rowCount():
+            self.url_completer.complete()
+        else:
+            self.url_completer.popup().hide()
+
+    def load_omnibox_index(self):
+        """Rebuild the autocomplete index from stored bookmarks and visits plus the open tabs."""
+        entries = {}
+        for url, title, visit_count, last_visit in self.bookmark_manager.get_history():
+            entry = entries[url] = OmniboxEntry(url)
+            entry.title, entry.visit_count, entry.last_visit = title or '', visit_count, last_visit
+        for _, title, url in self.bookmark_manager.get_bookmarks():
+            entry = entries.setdefault(url, OmniboxEntry(url))
+            entry.bookmarked = True
+            entry.title = title or entry.title
+        for index in range(self.tab_widget.count()):
+            url = getattr(self.tab_widget.widget(index), 'indexed_url', None)
+            if url:
+                entries.setdefault(url, OmniboxEntry(url)).open_tabs += 1
+        self.omnibox_index.rebuild(entries.values())
+
+    def on_tab_url_changed(self, browser, qurl):
+        # Visits are only kept in memory; the history table holds imported data only
+        url = qurl.toString() if qurl.scheme() in ('http', 'https', 'file') else None
+        if url == browser.indexed_url:
+            return
+        if browser.indexed_url:
+            self.omnibox_index.remove_open_tab(browser.indexed_url)
+        browser.indexed_url = url
+        if url:
+            self.omnibox_index.add_history(url)
+            self.omnibox_index.add_open_tab(url)
+
     def update_window_title(self, index=None):
         if index is None:
             index = self.tab_widget.currentIndex()
@@ -513,14 +678,52 @@ class Browser(QMainWindow):
 
     def close_current_tab(self, index):
         if self.tab_widget.count() > 1:
+            url = getattr(self.tab_widget.widget(index), 'indexed_url', None)
+            if url:
+                self.omnibox_index.remove_open_tab(url)
             self.tab_widget.removeTab(index)
         else:
             self.close()
 
-    def handle_permission_request(self, origin, feature):
-        if feature == QWebEnginePage.Feature.MediaAudioCapture:
-            return self.microphone_manager.handle_permission_request(origin, feature)
-        return False
+    def toggle_microphone(self):
+        if self.microphone_manager.is_active():
+            self.microphone_manager.stop_microphone()
+        elif not self.microphone_manager.start_microphone():
+            self.mic_btn.setChecked(False)
+            self.statusBar().showMessage("Microphone unavailable", 5000)
+
+    def on_microphone_active_changed(self, active):
+        self.mic_btn.setChecked(active)
+        self.mic_level.setValue(0)
+        self.mic_level.setVisible(active)
+        if not active:
+            self.mic_btn.setToolTip("Microphone")
+
+    def update_microphone_level(self, rms_db, peak_db, voice):
+        """Levels from the audio thread, already throttled by the meter."""
+        self.mic_level.setValue(max(0, int(rms_db) + 60))
+        if self.mic_level.property("voice") != voice:
+            self.mic_level.setProperty("voice", voice)
+            # Property selectors are only matched again on a repolish
+            self.mic_level.style().unpolish(self.mic_level)
+            self.mic_level.style().polish(self.mic_level)
+        self.mic_btn.setToolTip(f"Microphone: {rms_db:.0f} dBFS, peak {peak_db:.0f} dBFS{', voice' if voice else ''}")
+
+    def handle_permission_request(self, page, origin, feature):
+        # Chromium waits for an answer, so every request is granted or denied here
+        self.microphone_manager.grant_microphone_permission(page, origin, feature, self.ask_microphone_permission)
+
+    def ask_microphone_permission(self, origin):
+        """(allowed, remember) for a site asking to use the microphone."""
+        box = QMessageBox(self)
+        box.setWindowTitle("Microphone")
+        box.setText(f"{origin} wants to use your microphone.")
+        allow = box.addButton("Allow", QMessageBox.AcceptRole)
+        box.addButton("Block", QMessageBox.RejectRole)
+        remember = QCheckBox("Remember for this site")
+        box.setCheckBox(remember)
+        box.exec()
+        return box.clickedButton() is allow, remember.isChecked()
 
     def add_bookmark(self):
         current_browser = self.tab_widget.currentWidget()
@@ -547,6 +750,19 @@ class Browser(QMainWindow):
     def delete_bookmark(self, bookmark_id):
         self.bookmark_manager.remove_bookmark(bookmark_id)
 
+    def import_bookmarks(self):
+        if self.current_bookmark_menu:
+            self.current_bookmark_menu.hide()
+        if self.bookmark_importer.is_running():
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Bookmarks", "",
+            "Bookmark files (*.html *.htm *.json Bookmarks History places.sqlite);;All files (*)"
+        )
+        if path:
+            self.bookmark_importer.import_file(path)
+
     def open_bookmark(self, url):
         self.add_new_tab(QUrl(url), "Bookmark")
 
@@ -573,6 +789,10 @@ class Browser(QMainWindow):
                 self.tab_widget.setTabText(index, new_title)
 
     def paintEvent(self, event):
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            profiler.end_span('show -> first paint')
+            QTimer.singleShot(0, self.finish_startup)
         if not self.isMaximized() and not self.is_windows_10:
             painter = QPainter(self)
             painter.setRenderHint(QPainter.Antialiasing)
@@ -581,7 +801,7 @@ class Browser(QMainWindow):
             path.addRoundedRect(self.rect(), 10, 10)
             
             painter.setClipPath(path)
-            painter.fillPath(path, QColor("#240970"))
+            painter.fillPath(path, QColor(theme_color('window')))
         else:
             super().paintEvent(event)
 
@@ -633,11 +853,17 @@ class Browser(QMainWindow):
 
     def update_resource_usage(self):
         usage = self.resource_manager.get_current_usage()
-        self.statusBar().showMessage(
+        if usage is None:
+            return
+        message = (
             f"CPU: {usage['cpu']:.1f}% | "
             f"Memory: {usage['memory']:.1f} MB | "
             f"Network: ↑{usage['network_sent']:.2f} MB ↓{usage['network_recv']:.2f} MB"
         )
+        active_downloads, download_rate = self.download_manager.active_summary()
+        if active_downloads:
+            message += f" | Downloads: {active_downloads} active, {download_rate / (1024 * 1024):.2f} MB/s"
+        self.statusBar().showMessage(message)
 
     def suspend_inactive_tabs(self):
         current_index = self.tab_widget.currentIndex()
@@ -651,6 +877,9 @@ class Browser(QMainWindow):
         web_view = self.tab_widget.widget(index)
         web_view.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
 
+        # Tabs pick up a rotated fingerprint lazily, when they are looked at again
+        web_view.page().refresh_fingerprint()
+
     def closeEvent(self, event):
         super().closeEvent(event)
 
@@ -666,7 +895,8 @@ class Browser(QMainWindow):
         callbacks = {
             'open': self.open_bookmark,
             'rename': self.rename_bookmark,
-            'delete': self.delete_bookmark
+            'delete': self.delete_bookmark,
+            'import': self.import_bookmarks
         }
         self.current_bookmark_menu.refresh_bookmarks(bookmarks, callbacks)
         
@@ -680,7 +910,8 @@ class Browser(QMainWindow):
             callbacks = {
                 'open': self.open_bookmark,
                 'rename': self.rename_bookmark,
-                'delete': self.delete_bookmark
+                'delete': self.delete_bookmark,
+                'import': self.import_bookmarks
             }
             self.current_bookmark_menu.refresh_bookmarks(bookmarks, callbacks)
 
@@ -700,24 +931,52 @@ class Browser(QMainWindow):
         gc.collect()
 
     def rotate_fingerprint(self):
-        """Periodically rotate the browser fingerprint"""
+        """Periodically rotate the browser fingerprint.
+
+        This only replaces the session secret, so it costs the same with any number
+        of tabs. Tabs notice the new generation when they navigate or are activated.
+        """
         profile = QWebEngineProfile.defaultProfile()
         settings = profile.settings()
-        self.anti_fingerprint_js = self.fingerprint_manager.apply_fingerprint(profile, settings)
-        
-        # Apply new fingerprint to all existing tabs
-        for i in range(self.tab_widget.count()):
-            browser = self.tab_widget.widget(i)
-            if isinstance(browser, RoundedWebView):
-                browser.page().runJavaScript(self.anti_fingerprint_js)
+        self.fingerprint_manager.rotate()
+        http_fingerprint = self.fingerprint_manager.apply_fingerprint(profile, settings)
+        self.network_manager.get_interceptor().set_header_profile(
+            self.fingerprint_manager.build_header_profile(http_fingerprint)
+        )
+
+        # The visible tab is already active, so bring it up to date right away
+        current_widget = self.tab_widget.currentWidget()
+        if isinstance(current_widget, RoundedWebView):
+            current_widget.page().refresh_fingerprint()
 
 if __name__ == '__main__':
-    resource_manager = ResourceManager()
-    resource_manager.assign_process_to_job()
+    parser = argparse.ArgumentParser(description="KEPLER COMMUNITY browser")
+    parser.add_argument('--profile', action='store_true',
+                        help="time startup phases and profile selected slots, report on exit")
+    parser.add_argument('--profile-slots', default=','.join(PROFILED_SLOTS),
+                        help="comma-separated slots to run under cProfile with --profile (default: %(default)s)")
+    parser.add_argument('--flags-preset', choices=sorted(PRESETS),
+                        help="Chromium flags preset, overrides the KEPLER_FLAGS_PRESET environment variable")
+    parser.add_argument('--theme', choices=sorted(THEMES), default=DEFAULT_THEME)
+    args, _ = parser.parse_known_args()
+
+    # QtWebEngine reads its flags once, when the engine starts
+    apply_flags(selected_preset(args.flags_preset))
+
+    if args.profile:
+        classes = {'Browser': Browser, 'NetworkLimiter': NetworkLimiter}
+        for slot in filter(None, args.profile_slots.split(',')):
+            if slot in PROFILED_SLOTS:
+                profiler.profile_methods(classes[PROFILED_SLOTS[slot]], slot)
+            else:
+                print(f"Unknown slot for --profile-slots: {slot}", file=sys.stderr)
 
-    app = QApplication([])
-    app.setApplicationName("KEPLER COMMUNITY")
-    window = Browser()
+    with profiler.span('QApplication'):
+        app = QApplication([])
+        app.setApplicationName("KEPLER COMMUNITY")
+    window = Browser(theme=args.theme)
+    profiler.start_span('show -> first paint')
     window.show()
     app.exec()
+    profiler.write_report()
 
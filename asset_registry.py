@@ -0,0 +1,75 @@
+import os
+from PySide6.QtCore import Qt, QResource
+from PySide6.QtGui import QIcon, QPixmap
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('AssetRegistry')
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(APP_DIR, 'Images')
+
+# Built from resources.qrc with: pyside6-rcc --binary resources.qrc -o resources.rcc
+RESOURCE_BUNDLE = os.path.join(APP_DIR, 'resources.rcc')
+
+class AssetRegistry:
+    """Icons and pixmaps loaded once and shared by every widget that shows them.
+
+    Images come from the compiled resource bundle, which Qt memory-maps, and fall
+    back to the loose files in Images/ when the bundle has not been built. QIcon
+    and QPixmap are implicitly shared, so handing out the cached instances costs
+    no copies.
+    """
+
+    def __init__(self, bundle=RESOURCE_BUNDLE, images_dir=IMAGES_DIR):
+        self.images_dir = images_dir
+        self.icons = {}
+        self.pixmaps = {}
+        self.use_bundle = os.path.exists(bundle) and QResource.registerResource(bundle)
+        if not self.use_bundle:
+            logger.info(f"Resource bundle {bundle} unavailable, loading images from {images_dir}")
+
+    def path(self, name):
+        if self.use_bundle:
+            return f":/Images/{name}"
+        return os.path.join(self.images_dir, name)
+
+    def icon(self, name):
+        icon = self.icons.get(name)
+        if icon is None:
+            icon = self.icons[name] = QIcon(self.pixmap(name))
+        return icon
+
+    def pixmap(self, name, size=None):
+        """The image as a pixmap, optionally scaled to fit a size x size square."""
+        key = (name, size)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            if size is None:
+                pixmap = QPixmap(self.path(name))
+                if pixmap.isNull():
+                    logger.warning(f"Missing image {name}")
+            else:
+                pixmap = self.pixmap(name).scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.pixmaps[key] = pixmap
+        return pixmap
+
+_asset_registry = None
+
+def get_asset_registry():
+    """Shared registry, created on first use once a QGuiApplication exists."""
+    global _asset_registry
+    if _asset_registry is None:
+        _asset_registry = AssetRegistry()
+    return _asset_registry
+
+def icon(name):
+    return get_asset_registry().icon(name)
+
+def pixmap(name, size=None):
+    return get_asset_registry().pixmap(name, size)
@@ -0,0 +1,116 @@
+"""Cost of level metering and voice detection against the audio callback budget at 44.1 kHz.
+
+For each block size the whole callback path is timed: MicrophoneRecorder.new_frame()
+writing into the ring buffer and running AudioLevelMeter.process(). The signal
+alternates quiet noise and louder bursts, so voice detection switches state. The
+budget is the time one block lasts at the sample rate; PortAudio needs the
+callback back well before then. A per-sample Python loop computing the same
+RMS and peak is shown for reference. Finally a few seconds are fed at the real
+rate to show how often levels reach the UI.
+
+    python benchmarks/audio_level_benchmark.py --blocks 5000 --realtime-seconds 2
+"""
+import os
+import sys
+import math
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from microphone_manager import AudioLevelMeter, MicrophoneRecorder
+
+RATE = 44100
+BLOCK_SIZES = [256, 512, 1024, 4096]
+
+class IdleStream:
+    """Stands in for the PortAudio stream; the benchmark calls the callback itself."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def start_stream(self):
+        pass
+
+    def stop_stream(self):
+        pass
+
+    def is_active(self):
+        return True
+
+    def close(self):
+        pass
+
+def make_blocks(size, count, seed=0):
+    """Quiet noise and louder bursts, alternating every 20 blocks."""
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for index in range(count):
+        amplitude = 4000 if (index // 20) % 2 else 40
+        blocks.append(rng.normal(0, amplitude, size).clip(-32768, 32767).astype(np.int16).tobytes())
+    return blocks
+
+def python_levels(data):
+    samples = memoryview(data).cast('h')
+    total, peak = 0, 0
+    for sample in samples:
+        total += sample * sample
+        peak = max(peak, abs(sample))
+    return math.sqrt(total / len(samples)), peak
+
+def time_callback(size, count):
+    meter = AudioLevelMeter(RATE, interval=0.05)
+    recorder = MicrophoneRecorder(RATE, size, open_stream=IdleStream, meter=meter)
+    blocks = make_blocks(size, count)
+    recorder.new_frame(blocks[0], size, None, 0)  # numpy is imported by the first block
+    times = []
+    for data in blocks:
+        start = time.perf_counter()
+        recorder.new_frame(data, size, None, 0)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6, max(times) * 1e6
+
+def time_python(size, count):
+    blocks = make_blocks(size, count)
+    start = time.perf_counter()
+    for data in blocks:
+        python_levels(data)
+    return (time.perf_counter() - start) / count * 1e6
+
+def publish_rate(seconds, size=1024):
+    meter = AudioLevelMeter(RATE)
+    published, voiced = [], []
+    meter.levels_changed.connect(lambda rms, peak, voice: (published.append(rms), voiced.append(voice)))
+    blocks = make_blocks(size, int(seconds * RATE / size))
+    period = size / RATE
+    start = time.perf_counter()
+    for index, data in enumerate(blocks):
+        meter.process(data)
+        time.sleep(max(0.0, start + (index + 1) * period - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    changes = sum(1 for before, after in zip(voiced, voiced[1:]) if before != after)
+    return len(published) / elapsed, changes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=5000, help="blocks timed per size")
+    parser.add_argument('--python-blocks', type=int, default=200)
+    parser.add_argument('--realtime-seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'block':>6} {'budget ms':>10} {'median us':>10} {'max us':>8} {'of budget':>10} {'python loop us':>15}")
+    for size in BLOCK_SIZES:
+        budget = size / RATE * 1e6
+        median, worst = time_callback(size, args.blocks)
+        python = time_python(size, args.python_blocks)
+        print(f"{size:>6} {budget / 1000:10.1f} {median:10.1f} {worst:8.0f} {median / budget:10.2%} {python:15.0f}")
+
+    if args.realtime_seconds:
+        rate, changes = publish_rate(args.realtime_seconds)
+        print(f"\nUI updates: {rate:.1f} per second over {args.realtime_seconds:.0f} s of real-time audio, "
+              f"{changes} voice changes")
+
+if __name__ == '__main__':
+    main()
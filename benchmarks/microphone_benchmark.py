@@ -0,0 +1,117 @@
+"""Callback and read cost of MicrophoneRecorder's ring buffer against the old deque of chunks.
+
+No audio hardware is needed: FakeStream calls the recorder's callback from its
+own thread the way PortAudio does. "deque" is the previous implementation, which
+made an array per callback and copied the whole deque into a list on every read.
+Reads take the last --window milliseconds as one contiguous array. Gaps and torn
+reads are checked by tests/test_microphone_recorder.py.
+
+    python benchmarks/microphone_benchmark.py --chunks 20000 --window 500
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from microphone_manager import MicrophoneRecorder, PA_CONTINUE
+
+RATE = 44100
+CHUNK = 1024
+
+class FakeStream:
+    """Feeds chunks of a counting int16 signal to callback, optionally at the real rate."""
+
+    def __init__(self, callback, chunks, realtime=False):
+        self.callback = callback
+        self.chunks = chunks
+        self.realtime = realtime
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.callback_time = 0.0
+        self.done = threading.Event()
+
+    def run(self):
+        period = CHUNK / RATE
+        start = time.perf_counter()
+        for index in range(self.chunks):
+            data = (np.arange(index * CHUNK, (index + 1) * CHUNK) % 32768).astype(np.int16).tobytes()
+            before = time.perf_counter()
+            self.callback(data, CHUNK, None, 0)
+            self.callback_time += time.perf_counter() - before
+            if self.realtime:
+                time.sleep(max(0.0, start + (index + 1) * period - time.perf_counter()))
+        self.done.set()
+
+    def start_stream(self):
+        self.thread.start()
+
+    def is_active(self):
+        return self.thread.is_alive()
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.done.wait()
+
+class DequeRecorder:
+    """What MicrophoneRecorder did before the ring buffer."""
+
+    def __init__(self, open_stream, max_frames=100):
+        self.lock = threading.Lock()
+        self.frames = deque(maxlen=max_frames)
+        self.stream = open_stream(self.new_frame)
+
+    def new_frame(self, data, frame_count, time_info, status):
+        data = np.frombuffer(data, dtype=np.int16)
+        with self.lock:
+            self.frames.append(data)
+        return None, PA_CONTINUE
+
+    def get_samples(self, milliseconds):
+        with self.lock:
+            frames = list(self.frames)
+        if not frames:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate(frames)[-(RATE * milliseconds // 1000):]
+
+def run(name, make_recorder, chunks, window, realtime):
+    streams = []
+
+    def open_stream(callback):
+        streams.append(FakeStream(callback, chunks, realtime))
+        return streams[0]
+
+    recorder = make_recorder(open_stream)
+    stream = streams[0]
+    stream.start_stream()
+    reads, read_time = 0, 0.0
+    while not stream.done.is_set():
+        start = time.perf_counter()
+        recorder.get_samples(window)
+        read_time += time.perf_counter() - start
+        reads += 1
+        if realtime:
+            time.sleep(0.01)  # A UI refresh rather than a busy loop
+    stream.close()
+    print(f"{name:<6} {stream.callback_time / chunks * 1e6:14.1f} {read_time / max(reads, 1) * 1e6:10.1f} "
+          f"{reads:8d}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20000)
+    parser.add_argument('--window', type=int, default=500, help="ms of audio per read")
+    parser.add_argument('--realtime', action='store_true', help="deliver chunks at %d Hz" % RATE)
+    args = parser.parse_args()
+
+    print(f"{'buffer':<6} {'callback us':>14} {'read us':>10} {'reads':>8}")
+    run('deque', DequeRecorder, args.chunks, args.window, args.realtime)
+    run('ring', lambda open_stream: MicrophoneRecorder(RATE, CHUNK, open_stream=open_stream),
+        args.chunks, args.window, args.realtime)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Memory and load time of each Chromium flags preset, measured offscreen.
+
+Every preset runs in a fresh interpreter, because QtWebEngine reads its flags once
+per process. A local server hands out a page with a large DOM and some script
+work; it is opened in several views spread over a few loopback sites, so the
+process model settings in the presets have something to group. Load time runs
+from the first navigation to the last loadFinished. Memory is the RSS of the
+browser process and all its helper processes once the pages have settled.
+
+    python benchmarks/preset_benchmark.py --tabs 8 --runs 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromium_flags import PRESETS, apply_flags
+
+SITES = 4  # Tabs are spread over 127.0.0.1 .. 127.0.0.4, each a separate site
+
+def make_page(rows=2000):
+    cells = ''.join(f'<tr><td>{i}</td><td>row {i}</td><td><a href="#r{i}">link</a></td></tr>' for i in range(rows))
+    script = ("<script>let data = [];"
+              "for (let i = 0; i < 200000; i++) data.push({i: i, s: 'item' + i});"
+              "document.title = 'ready ' + data.length;</script>")
+    return f"<!DOCTYPE html><html><head><title>load</title></head><body><table>{cells}</table>{script}</body></html>".encode()
+
+class PageHandler(BaseHTTPRequestHandler):
+    page = make_page()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+    def log_message(self, format, *args):
+        pass
+
+def process_tree_rss():
+    """(total RSS in bytes, number of helper processes) of this process and its children."""
+    import psutil
+    process = psutil.Process()
+    children = process.children(recursive=True)
+    total = process.memory_info().rss
+    for child in children:
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total, len(children)
+
+def run_child(preset, tabs, settle):
+    apply_flags(preset)
+    from PySide6.QtCore import QUrl, QTimer
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+
+    server = ThreadingHTTPServer(('', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    app = QApplication([])
+    result = {'preset': preset}
+    views, pending = [], set(range(tabs))
+    start = time.perf_counter()
+
+    def measure():
+        result['rss'], result['processes'] = process_tree_rss()
+        app.quit()
+
+    def on_load_finished(index, ok):
+        if index not in pending:
+            return
+        pending.discard(index)
+        if not ok:
+            result['failed'] = result.get('failed', 0) + 1
+        if not pending:
+            result['load_ms'] = (time.perf_counter() - start) * 1000
+            QTimer.singleShot(settle, measure)
+
+    for index in range(tabs):
+        view = QWebEngineView()
+        view.resize(1024, 768)
+        view.loadFinished.connect(lambda ok, index=index: on_load_finished(index, ok))
+        view.show()
+        views.append(view)
+        view.setUrl(QUrl(f"http://127.0.0.{index % SITES + 1}:{port}/tab{index}"))
+
+    QTimer.singleShot(120000, app.quit)
+    app.exec()
+    server.shutdown()
+    print(json.dumps(result))
+
+def run_once(preset, tabs, settle):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    env.pop('QTWEBENGINE_CHROMIUM_FLAGS', None)
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', preset,
+                             '--tabs', str(tabs), '--settle', str(settle)],
+                            env=env, capture_output=True, text=True)
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"{preset} run produced no result:\n{output.stderr[-2000:]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--presets', default=','.join(PRESETS))
+    parser.add_argument('--tabs', type=int, default=8)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--settle', type=int, default=2000, help="ms to wait after loading before measuring")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child, args.tabs, args.settle)
+        return
+
+    print(f"{'preset':<12} {'load ms':>9} {'RSS MB':>9} {'processes':>10}")
+    for preset in args.presets.split(','):
+        try:
+            runs = [run_once(preset, args.tabs, args.settle) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"FAIL {e}")
+            sys.exit(1)
+        complete = [run for run in runs if 'rss' in run]
+        if not complete:
+            print(f"{preset:<12} timed out")
+            continue
+        load_ms = statistics.median(run['load_ms'] for run in complete)
+        rss_mb = statistics.median(run['rss'] for run in complete) / (1024 * 1024)
+        processes = statistics.median(run['processes'] for run in complete)
+        failed = sum(run.get('failed', 0) for run in complete)
+        note = f"  ({failed} loads failed)" if failed else ""
+        print(f"{preset:<12} {load_ms:9.0f} {rss_mb:9.0f} {processes:10.0f}{note}")
+
+if __name__ == '__main__':
+    main()
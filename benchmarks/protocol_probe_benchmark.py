@@ -0,0 +1,113 @@
+"""Time ProtocolProber against local HTTP and HTTPS stand-in servers.
+
+The stand-ins replace ports 443/80 through the prober's ports= mapping. The
+HTTPS one uses a throwaway self-signed certificate made with the openssl
+command line tool, and peer verification is switched off for the run. Each
+case prints the median and worst time to an answer. The cases are: both
+schemes up, a repeat visit served from the cache, HTTP only (HTTPS grace
+period) and nothing listening. The answers themselves are checked by
+tests/test_protocol_prober.py.
+
+    python benchmarks/protocol_probe_benchmark.py --runs 5
+"""
+import os
+import sys
+import ssl
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtNetwork import QSslConfiguration, QSslSocket
+from protocol_prober import ProtocolProber
+
+class HeadHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        # Any status proves the scheme works, as it does for real servers rejecting HEAD
+        self.send_response(405)
+        self.end_headers()
+
+def serve(tls_context=None):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HeadHandler)
+    if tls_context:
+        server.socket = tls_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def unused_port():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HeadHandler)
+    port = server.server_port
+    server.server_close()
+    return port
+
+def make_tls_context(directory):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+                   check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+def probe(app, prober, domain='127.0.0.1'):
+    """Milliseconds to an answer for one probe."""
+    began = time.perf_counter()
+    prober.probe(domain, lambda url: app.quit())
+    app.exec()
+    return (time.perf_counter() - began) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--grace', type=int, default=300, help="HTTPS grace period in ms")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    config = QSslConfiguration.defaultConfiguration()
+    config.setPeerVerifyMode(QSslSocket.VerifyNone)  # the stand-in's certificate is self-signed
+    QSslConfiguration.setDefaultConfiguration(config)
+
+    with tempfile.TemporaryDirectory() as directory:
+        https = serve(make_tls_context(directory))
+        http = serve()
+        closed = unused_port()
+        cache_file = os.path.join(directory, 'protocol_cache.json')
+
+        def prober(https_port, http_port):
+            return ProtocolProber(cache_file=cache_file, https_grace=args.grace, timeout=2000,
+                                  ports={'https': https_port, 'http': http_port})
+
+        def fresh(https_port, http_port):
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            return prober(https_port, http_port)
+
+        cases = {
+            'both up': lambda: fresh(https.server_port, http.server_port),
+            'cached': lambda: prober(https.server_port, http.server_port),
+            'http only': lambda: fresh(closed, http.server_port),
+            'nothing': lambda: fresh(closed, closed),
+        }
+        print(f"{'case':<12} {'median ms':>10} {'max ms':>8}")
+        for name, make in cases.items():
+            times = []
+            for _ in range(args.runs):
+                if name == 'cached':
+                    probe(app, fresh(https.server_port, http.server_port))  # fill the cache
+                times.append(probe(app, make()))
+            print(f"{name:<12} {statistics.median(times):10.1f} {max(times):8.1f}")
+
+        for server in (https, http):
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
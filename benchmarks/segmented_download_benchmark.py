@@ -0,0 +1,109 @@
+"""Throughput of SegmentedDownload against a local HTTP server that supports Range requests.
+
+Each server connection is capped (like many real mirrors) so the benefit of
+parallel segments shows up on localhost too. Resume and fallback behaviour is
+covered by tests/test_segmented_downloader.py.
+
+    python benchmarks/segmented_download_benchmark.py --size-mb 64 --segments 1 4 8
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtNetwork import QNetworkAccessManager
+from segmented_downloader import SegmentedDownload
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    payload = b''
+    bytes_per_second = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_headers(self):
+        size = len(self.payload)
+        start, end = 0, size - 1
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes='):
+            first, _, last = range_header[6:].partition('-')
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        return start, end
+
+    def do_HEAD(self):
+        self._send_headers()
+
+    def do_GET(self):
+        start, end = self._send_headers()
+        chunk = 64 * 1024
+        position = start
+        began = time.monotonic()
+        try:
+            while position <= end:
+                block = self.payload[position:min(position + chunk, end + 1)]
+                self.wfile.write(block)
+                position += len(block)
+                if self.bytes_per_second:
+                    ahead = (position - start) / self.bytes_per_second - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client aborted the segment
+
+def run_download(app, url, path, segments):
+    manager = QNetworkAccessManager()
+    job = SegmentedDownload(manager, url, path, segments)
+    result = {}
+    job.finished.connect(lambda _: (result.setdefault('ok', True), app.quit()))
+    job.failed.connect(lambda error: (result.setdefault('error', error), app.quit()))
+    began = time.perf_counter()
+    job.start()
+    app.exec()
+    return time.perf_counter() - began, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--per-connection-mbps', type=float, default=80.0)
+    parser.add_argument('--segments', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    RangeRequestHandler.payload = os.urandom(args.size_mb * 1024 * 1024)
+    RangeRequestHandler.bytes_per_second = args.per_connection_mbps * 1024 * 1024 / 8
+    expected = hashlib.sha256(RangeRequestHandler.payload).hexdigest()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/payload.bin'
+
+    app = QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        for segments in args.segments:
+            path = os.path.join(directory, f'payload-{segments}.bin')
+            elapsed, result = run_download(app, url, path, segments)
+            if 'error' in result:
+                print(f"segments={segments}: failed: {result['error']}")
+                continue
+            with open(path, 'rb') as f:
+                intact = hashlib.sha256(f.read()).hexdigest() == expected
+            print(f"segments={segments}: {elapsed:.2f}s, "
+                  f"{args.size_mb / elapsed:.1f} MB/s, checksum {'ok' if intact else 'MISMATCH'}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Offscreen startup timeline: import cost per module and time to the first painted frame.
+
+Every run starts a fresh interpreter on the offscreen platform. Modules are imported
+in the order KEPLER_COMMUNITY.py pulls them in and each is timed on its own, so a
+figure is what that module adds on top of the ones before it. The Browser is then
+built, shown and followed until its first paint and through the deferred second
+half of startup. Medians over all runs are reported.
+
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_ORDER = [
+    'PySide6.QtCore',
+    'PySide6.QtWidgets',
+    'PySide6.QtWebEngineCore',
+    'PySide6.QtWebEngineWidgets',
+    'custom_dialog',
+    'error_handling',
+    'protocol_prober',
+    'hsts_store',
+    'url_classifier',
+    'omnibox_index',
+    'protocol_handler',
+    'page_templates',
+    'download_manager',
+    'microphone_manager',
+    'tab_manager',
+    'styles',
+    'event_handler',
+    'bookmark_manager',
+    'bookmark_importer',
+    'resource_manager',
+    'custom_network_manager',
+    'fingerprint_manager',
+    'KEPLER_COMMUNITY',
+]
+
+# Must not be imported before the first paint
+DEFERRED_MODULES = ['pyaudio', 'numpy', 'psutil', 'win32job']
+
+STARTUP_PHASES = [
+    ('QApplication', 'start', 'application'),
+    ('Browser.__init__', 'application', 'constructed'),
+    ('show -> first paint', 'constructed', 'first_paint'),
+    ('first paint -> finish_startup', 'first_paint', 'finish_startup_start'),
+    ('finish_startup', 'finish_startup_start', 'finish_startup_end'),
+    ('deferred indexing', 'finish_startup_end', 'idle'),
+]
+
+def run_child():
+    """One startup in this process; prints the timings as JSON."""
+    sys.path.insert(0, ROOT)
+    result = {'imports': {}, 'marks': {}, 'error': None}
+    import importlib
+    for name in IMPORT_ORDER:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            result['error'] = f"import {name}: {e}"
+            print(json.dumps(result))
+            return
+        result['imports'][name] = (time.perf_counter() - start) * 1000
+    result['loaded_early'] = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from KEPLER_COMMUNITY import Browser
+
+    marks = result['marks']
+    origin = time.perf_counter()
+
+    def mark(name):
+        marks.setdefault(name, (time.perf_counter() - origin) * 1000)
+
+    class TimedBrowser(Browser):
+        def paintEvent(self, event):
+            mark('first_paint')
+            super().paintEvent(event)
+
+        def finish_startup(self):
+            mark('finish_startup_start')
+            super().finish_startup()
+            mark('finish_startup_end')
+            # Queued behind the omnibox indexing that finish_startup schedules
+            QTimer.singleShot(0, self.on_idle)
+
+        def on_idle(self):
+            mark('idle')
+            QApplication.instance().quit()
+
+    mark('start')
+    app = QApplication([])
+    mark('application')
+    window = TimedBrowser()
+    mark('constructed')
+    window.show()
+    QTimer.singleShot(30000, app.quit)
+    app.exec()
+    print(json.dumps(result))
+
+def run_once():
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"startup run produced no timings:\n{output.stderr[-2000:]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child()
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    errors = {run['error'] for run in runs if run['error']}
+
+    print(f"imports (median of {len(runs)} runs, ms):")
+    for name in IMPORT_ORDER:
+        samples = [run['imports'][name] for run in runs if name in run['imports']]
+        if samples:
+            print(f"  {name:<28} {statistics.median(samples):8.1f}")
+    for error in errors:
+        print(f"FAIL {error}")
+    if errors:
+        sys.exit(1)
+
+    loaded_early = sorted({name for run in runs for name in run['loaded_early']})
+    if loaded_early:
+        print(f"WARNING imported before first paint: {', '.join(loaded_early)}")
+
+    print("startup phases (median, ms):")
+    for label, begin, end in STARTUP_PHASES:
+        samples = [run['marks'][end] - run['marks'][begin] for run in runs
+                   if begin in run['marks'] and end in run['marks']]
+        if samples:
+            print(f"  {label:<32} {statistics.median(samples):8.1f}")
+    total_imports = statistics.median(sum(run['imports'].values()) for run in runs)
+    to_paint = statistics.median(run['marks']['first_paint'] for run in runs if 'first_paint' in run['marks'])
+    print(f"time to first paint: {total_imports + to_paint:.1f} ms ({total_imports:.1f} ms of it imports)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""Widget construction and polish time with per-widget stylesheets versus one application stylesheet.
+
+Offscreen, it builds the browser chrome (title bar, toolbar, address bar) and
+shows it. It then opens the bookmark menu with --rows entries a few times,
+since the menu is rebuilt on every click, and finally swaps the theme. The
+"per-widget" mode styles widgets the old way: one setStyleSheet() per widget,
+right after creating it, using the strings styles.py used to return. The
+"application" mode uses styles.get_application_style().
+
+    python benchmarks/stylesheet_benchmark.py --rows 50 --runs 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import QEvent, QSize, Qt
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel,
+    QLineEdit, QToolBar, QSizePolicy
+)
+import asset_registry as assets
+from styles import THEMES, get_application_style
+
+# What styles.py returned before the application stylesheet, as the baseline
+LEGACY_MAIN_WINDOW = """
+    QMainWindow { background-color: %(window)s; border: none; }
+    QWidget#titleBar { background-color: %(panel)s; border-top-left-radius: 10px; border-top-right-radius: 10px; }
+"""
+LEGACY_TITLE_BAR = "background-color: %(window)s;"
+LEGACY_TITLE_LABEL = "color: %(text)s; padding: 5px; font-size: 16px; font-weight: bold; font-family: 'Trebuchet MS', sans-serif;"
+LEGACY_TOOLBAR = "QToolBar { background-color: %(window)s; spacing: 10px; border: none; }"
+LEGACY_BUTTON = """
+    QPushButton { background-color: transparent; border-style: none; border-width: 0px; border-radius: 10px;
+                  border-color: transparent; font: bold 16px; min-width: 1em; padding: 4px; }
+    QPushButton:hover { background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0,
+                        stop:0 %(hover_start)s, stop:1 %(hover_end)s); color: white; font-weight: bold; }
+    QPushButton:pressed { background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0,
+                          stop:0 %(pressed_start)s, stop:1 %(pressed_end)s); }
+"""
+LEGACY_LINE_EDIT = """
+    QLineEdit { border-radius: 10px; padding: 0 8px; selection-background-color: %(selection)s; font-size: 20px; }
+    QLineEdit:focus { border: 2px solid %(focus_border)s; }
+"""
+LEGACY_BOOKMARK_MENU = """
+    QWidget { background-color: %(window)s; border: 2px solid %(panel)s; border-radius: 10px; }
+    QPushButton { color: %(text)s; background-color: transparent; border: none; text-align: left;
+                  padding: 8px; border-radius: 5px; }
+    QPushButton:hover { background-color: %(panel)s; }
+    QLabel { color: %(text)s; padding: 8px; font-weight: bold; }
+"""
+LEGACY_BOOKMARK_HEADER = "font-size: 14px; border-bottom: 1px solid %(panel)s;"
+
+TOOLBAR_BUTTONS = ['return-64.png', 'forward-64.png', 'refresh-64.png', 'home-page-64.png',
+                   'add-new-64.png', 'resource-64.png']
+
+class Chrome:
+    """The styled part of the browser window, built in either mode."""
+
+    def __init__(self, legacy, theme):
+        # Legacy mode sets each sheet right after creating the widget, like the old
+        # code did. Application mode expects the sheet to be set already, as
+        # Browser.__init__ does before building anything.
+        self.legacy = legacy
+        self.theme = theme
+        self.styled = []  # (widget, legacy sheet) pairs, for theme swaps in legacy mode
+
+        self.window = QMainWindow()
+        self.window.resize(1200, 800)
+        self.style(self.window, 'browserWindow', LEGACY_MAIN_WINDOW)
+
+        title_bar = QWidget(self.window)
+        title_bar.setObjectName('titleBar')
+        if legacy:
+            self.set_legacy_sheet(title_bar, LEGACY_TITLE_BAR)
+        title_layout = QHBoxLayout(title_bar)
+        title_layout.setContentsMargins(0, 0, 0, 0)
+        icon = QLabel(title_bar)
+        icon.setPixmap(assets.pixmap('KEPLER-COMMUNITY-ICO.png', 24))
+        title_layout.addWidget(icon)
+        label = QLabel("KEPLER COMMUNITY [ALPHA]", title_bar)
+        self.style(label, 'windowTitleLabel', LEGACY_TITLE_LABEL)
+        title_layout.addWidget(label)
+        title_layout.addStretch()
+        for name in ('minimize-64.png', 'maximize-64.png', 'close-64.png'):
+            title_layout.addWidget(self.button(name, title_bar))
+        self.window.setMenuWidget(title_bar)
+
+        toolbar = QToolBar() if legacy else QToolBar(self.window)
+        if legacy:
+            self.set_legacy_sheet(toolbar, LEGACY_TOOLBAR)
+        self.window.addToolBar(toolbar)
+        nav = QWidget()
+        nav_layout = QHBoxLayout(nav)
+        nav_layout.setContentsMargins(0, 0, 0, 0)
+        for name in TOOLBAR_BUTTONS:
+            nav_layout.addWidget(self.button(name))
+        toolbar.addWidget(nav)
+        url_widget = QWidget()
+        url_layout = QHBoxLayout(url_widget)
+        url_layout.setContentsMargins(0, 0, 0, 0)
+        url_bar = QLineEdit("https://example.com")
+        self.style(url_bar, 'urlBar', LEGACY_LINE_EDIT)
+        url_layout.addWidget(url_bar)
+        url_layout.addWidget(self.button('bookmark-64.png'))
+        url_layout.addWidget(self.button('bookmark-menu-64.png'))
+        toolbar.addWidget(url_widget)
+        self.window.setCentralWidget(QWidget())
+
+    def set_legacy_sheet(self, widget, sheet):
+        self.styled.append((widget, sheet))
+        widget.setStyleSheet(sheet % THEMES[self.theme])
+
+    def style(self, widget, object_name, legacy_sheet):
+        if self.legacy:
+            self.set_legacy_sheet(widget, legacy_sheet)
+        else:
+            widget.setObjectName(object_name)
+
+    def button(self, name, parent=None):
+        button = QPushButton(parent)
+        button.setIcon(assets.icon(name))
+        button.setIconSize(QSize(24, 24))
+        if self.legacy:
+            self.set_legacy_sheet(button, LEGACY_BUTTON)
+        else:
+            button.setProperty('chromeButton', True)
+        return button
+
+    def open_menu(self, rows):
+        """Build and show a bookmark menu, structured like CustomBookmarkMenu.
+
+        The menu is rebuilt on every click, so its sheets are not kept for theme swaps.
+        """
+        menu = QWidget(self.window, Qt.Popup)
+        menu.setAttribute(Qt.WA_TranslucentBackground)
+        header = QLabel("Bookmarks")
+        if self.legacy:
+            menu.setStyleSheet(LEGACY_BOOKMARK_MENU % THEMES[self.theme])
+            header.setStyleSheet(LEGACY_BOOKMARK_HEADER % THEMES[self.theme])
+        else:
+            menu.setObjectName('bookmarkMenu')
+            header.setObjectName('bookmarkMenuHeader')
+        menu_layout = QVBoxLayout(menu)
+        container = QWidget()
+        container_layout = QVBoxLayout(container)
+        menu_layout.addWidget(header)
+        menu_layout.addWidget(container)
+        for row in range(rows):
+            item = QWidget()
+            item_layout = QHBoxLayout(item)
+            item_layout.setContentsMargins(2, 2, 2, 2)
+            open_btn = QPushButton(f"Bookmark {row}")
+            open_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+            item_layout.addWidget(open_btn)
+            actions = QWidget()
+            actions_layout = QHBoxLayout(actions)
+            actions_layout.setContentsMargins(0, 0, 0, 0)
+            for name in ('edit-64.png', 'delete-64.png'):
+                action = QPushButton()
+                action.setIcon(assets.icon(name))
+                action.setFixedSize(24, 24)
+                actions_layout.addWidget(action)
+            item_layout.addWidget(actions)
+            container_layout.addWidget(item)
+        menu.show()
+        QApplication.processEvents()
+        return menu
+
+    def apply_theme(self, theme):
+        self.theme = theme
+        if self.legacy:
+            for widget, sheet in self.styled:
+                widget.setStyleSheet(sheet % THEMES[theme])
+        else:
+            QApplication.instance().setStyleSheet(get_application_style(theme))
+        QApplication.processEvents()
+
+def delete(widget):
+    widget.close()
+    widget.deleteLater()
+    # Without a running event loop deleteLater() needs a nudge; a leftover tree
+    # would be repolished by the next run's setStyleSheet()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+def elapsed(start):
+    return (time.perf_counter() - start) * 1000
+
+def measure(legacy, rows, opens):
+    """(window build ms, median menu open ms, theme swap ms) for one mode."""
+    app = QApplication.instance()
+    app.setStyleSheet('')
+    start = time.perf_counter()
+    if not legacy:
+        app.setStyleSheet(get_application_style('dark'))
+    chrome = Chrome(legacy, 'dark')
+    chrome.window.show()
+    QApplication.processEvents()
+    build = elapsed(start)
+
+    menu_times = []
+    for _ in range(opens):
+        start = time.perf_counter()
+        menu = chrome.open_menu(rows)
+        menu_times.append(elapsed(start))
+        delete(menu)
+
+    # The menu is a popup, so it is closed whenever the theme changes
+    start = time.perf_counter()
+    chrome.apply_theme('light')
+    swap = elapsed(start)
+    delete(chrome.window)
+    return build, statistics.median(menu_times), swap
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50, help="bookmarks in the menu")
+    parser.add_argument('--opens', type=int, default=5, help="menu opens per run")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    QApplication([])
+    measure(False, 10, 1)  # Warm up fonts, icons and the style engine
+    results = {True: [], False: []}
+    for _ in range(args.runs):
+        for legacy in (True, False):
+            results[legacy].append(measure(legacy, args.rows, args.opens))
+
+    print(f"{args.rows} bookmarks, median of {args.runs} runs")
+    print(f"{'mode':<12} {'window ms':>10} {'menu open ms':>13} {'theme swap ms':>14}")
+    for legacy, label in ((True, 'per-widget'), (False, 'application')):
+        build, menu, swap = (statistics.median(run[i] for run in results[legacy]) for i in range(3))
+        print(f"{label:<12} {build:10.1f} {menu:13.1f} {swap:14.1f}")
+
+if __name__ == '__main__':
+    main()
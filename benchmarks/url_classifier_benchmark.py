@@ -0,0 +1,52 @@
+"""Per-call cost of UrlClassifier and the Public Suffix List trie.
+
+The classification corpus lives in tests/test_url_classifier.py.
+
+    python benchmarks/url_classifier_benchmark.py --iterations 20000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_classifier import UrlClassifier, PublicSuffixList
+
+# A mix of URLs, hosts, intranet names, IP literals and search queries
+CLASSIFY_INPUTS = [
+    'https://example.com', 'HTTP://Example.com/Path', 'about:blank', 'example.com',
+    'www.bbc.co.uk/news', 'example.com:8443/login?next=/', 'пример.рф', 'localhost:8080',
+    '192.168.1.1:8080/admin', '::1', '[::1]:3000', 'printer.local', 'nas:5000', 'intranet',
+    'wiki', 'foo.notatld', 'readme.txt', 'how to cook rice', 'user@example.com', 'example.com:99999',
+]
+
+HOSTS = [
+    'example.com', 'www.example.com', 'a.b.example.com', 'www.bbc.co.uk', 'user.github.io',
+    'a.b.c.kobe.jp', 'www.www.ck', 'www.食狮.公司.cn', 'www.xn--85x722f.xn--55qx5d.cn', '192.168.0.1',
+]
+
+def time_per_call(function, inputs, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for value in inputs:
+            function(value)
+    return (time.perf_counter() - start) / (iterations * len(inputs)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    suffix_list = PublicSuffixList(cache_file=None)
+    compile_ms = (time.perf_counter() - start) * 1000
+    classifier = UrlClassifier(suffix_list, intranet_hosts=['intranet'])
+
+    print(f"compile {suffix_list.rule_count} rules: {compile_ms:.1f} ms")
+    iterations = max(1, args.iterations // len(CLASSIFY_INPUTS))
+    print(f"classify: {time_per_call(classifier.classify, CLASSIFY_INPUTS, iterations):.2f} us/call")
+    print(f"registrable_domain: {time_per_call(suffix_list.registrable_domain, HOSTS, iterations):.2f} us/call")
+
+if __name__ == '__main__':
+    main()
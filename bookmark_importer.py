@@ -0,0 +1,244 @@
+import os
+import re
+import json
+import sqlite3
+from html.parser import HTMLParser
+from itertools import islice
+from PySide6.QtCore import QObject, Signal, QTimer, QUrl
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_import.log'
+)
+logger = logging.getLogger('BookmarkImporter')
+
+# Chrome stores timestamps as microseconds since 1601-01-01
+CHROME_EPOCH_OFFSET = 11644473600
+
+class NetscapeBookmarkParser(HTMLParser):
+    """Incremental parser for the Netscape bookmark HTML format exported by all major browsers."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self._href = None
+        self._title = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._title = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._title.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            if self._href.startswith(('http://', 'https://', 'file://')):
+                title = ''.join(self._title).strip() or self._href
+                self.entries.append(('bookmark', (title, self._href)))
+            self._href = None
+
+def iter_netscape_html(path, chunk_size=64 * 1024):
+    parser = NetscapeBookmarkParser()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from parser.entries
+            parser.entries.clear()
+    parser.close()
+    yield from parser.entries
+
+# Separators carry no information for iter_json_objects, so they are skipped with the whitespace
+JSON_SEPARATORS = re.compile(r'[\s,:]*')
+JSON_TOKEN_ENDS = set(' \t\r\n,:]}')
+
+def iter_json_objects(f, chunk_size=64 * 1024):
+    """Yield every object in a JSON file as a dict of its scalar members, as it closes.
+
+    Nested objects and arrays are streamed through rather than built, so memory
+    holds one chunk of text plus the scalars of the currently open objects,
+    however large the file is.
+    """
+    decoder = json.JSONDecoder()
+    stack = []  # [scalar members, pending key] per open object, None per open array
+    buffer, pos, eof = '', 0, False
+    while True:
+        pos = JSON_SEPARATORS.match(buffer, pos).end()
+        if pos >= len(buffer) - 1 and not eof:
+            # Keep a char of lookahead so a token is never decoded from a cut-off buffer
+            chunk = f.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        if pos >= len(buffer):
+            break
+
+        char = buffer[pos]
+        if char in '{[':
+            stack.append([{}, None] if char == '{' else None)
+            pos += 1
+            continue
+        if char in '}]':
+            if not stack:
+                raise ValueError(f"Unexpected {char!r} in JSON")
+            frame = stack.pop()
+            if frame is not None:
+                yield frame[0]
+            if stack and stack[-1] is not None:
+                stack[-1][1] = None  # the container was the pending key's value
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            end = None
+        if end is None or (not eof and buffer[end:end + 1] not in JSON_TOKEN_ENDS):
+            # The token may run on into the next chunk, e.g. '1' of '1.5'
+            chunk = f.read(chunk_size)
+            if not chunk:
+                if end is None:
+                    raise ValueError(f"Malformed JSON near {buffer[pos:pos + 40]!r}")
+                eof = True
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        pos = end
+        frame = stack[-1] if stack else None
+        if frame is not None:
+            if frame[1] is None:
+                frame[1] = value
+            else:
+                frame[0][frame[1]] = value
+                frame[1] = None
+    if stack:
+        raise ValueError("JSON ends inside an open object or array")
+
+def iter_chrome_bookmarks(path):
+    # URL nodes are leaves of the folder tree, so they close in document order
+    with open(path, 'r', encoding='utf-8') as f:
+        for node in iter_json_objects(f):
+            if node.get('type') == 'url':
+                url = node.get('url', '')
+                yield 'bookmark', (node.get('name') or url, url)
+
+def open_readonly_database(path):
+    # immutable=1 lets us read a profile database that the other browser still holds locked
+    uri = QUrl.fromLocalFile(os.path.abspath(path)).toString() + '?mode=ro&immutable=1'
+    return sqlite3.connect(uri, uri=True)
+
+def iter_chrome_history(path):
+    conn = open_readonly_database(path)
+    try:
+        cursor = conn.execute("SELECT url, title, visit_count, last_visit_time FROM urls")
+        for url, title, visit_count, last_visit_time in cursor:
+            last_visit = max(0, (last_visit_time or 0) // 1000000 - CHROME_EPOCH_OFFSET)
+            yield 'history', (url, title or '', visit_count or 0, last_visit)
+    finally:
+        conn.close()
+
+def iter_firefox_places(path):
+    conn = open_readonly_database(path)
+    try:
+        cursor = conn.execute('''
+            SELECT b.title, p.url FROM moz_bookmarks b
+            JOIN moz_places p ON b.fk = p.id
+            WHERE b.type = 1 AND p.url NOT LIKE 'place:%'
+        ''')
+        for title, url in cursor:
+            yield 'bookmark', (title or url, url)
+
+        cursor = conn.execute('''
+            SELECT url, title, visit_count, last_visit_date FROM moz_places
+            WHERE visit_count > 0
+        ''')
+        for url, title, visit_count, last_visit_date in cursor:
+            yield 'history', (url, title or '', visit_count, (last_visit_date or 0) // 1000000)
+    finally:
+        conn.close()
+
+def detect_source(path):
+    """Pick the entry iterator matching a bookmark export or browser profile file."""
+    name = os.path.basename(path).lower()
+    if name.endswith(('.html', '.htm')):
+        return iter_netscape_html
+    if name == 'bookmarks' or name.endswith('.json'):
+        return iter_chrome_bookmarks
+    if name == 'places.sqlite':
+        return iter_firefox_places
+    if name == 'history':
+        return iter_chrome_history
+    return None
+
+class BookmarkImporter(QObject):
+    """Streams entries from another browser into BookmarkManager in chunked transactions.
+
+    Each chunk runs in its own event loop iteration so the UI stays responsive,
+    and only one chunk of entries is ever held in memory.
+    """
+    progress = Signal(int)
+    finished = Signal(int)
+    error = Signal(str)
+
+    def __init__(self, bookmark_manager, chunk_size=2000, parent=None):
+        super().__init__(parent)
+        self.bookmark_manager = bookmark_manager
+        self.chunk_size = chunk_size
+        self._entries = None
+        self._imported = 0
+
+    def is_running(self):
+        return self._entries is not None
+
+    def import_file(self, path):
+        source = detect_source(path)
+        if source is None:
+            self.error.emit(f"Unsupported import file: {os.path.basename(path)}")
+            return False
+
+        self._entries = source(path)
+        self._imported = 0
+        logger.info(f"Importing from {path}")
+        QTimer.singleShot(0, self._import_next_chunk)
+        return True
+
+    def _import_next_chunk(self):
+        if self._entries is None:
+            return
+
+        try:
+            chunk = list(islice(self._entries, self.chunk_size))
+            bookmarks = [entry for kind, entry in chunk if kind == 'bookmark']
+            history = [entry for kind, entry in chunk if kind == 'history']
+            if bookmarks:
+                self._imported += self.bookmark_manager.add_bookmarks(bookmarks)
+            if history:
+                self.bookmark_manager.add_history_entries(history)
+                self._imported += len(history)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # The failed chunk's transaction was rolled back; earlier chunks stay imported
+            logger.error(f"Import failed after {self._imported} entries: {e}")
+            self._finish()
+            self.bookmark_manager.bookmarks_updated.emit()
+            self.error.emit(str(e))
+            return
+
+        if len(chunk) < self.chunk_size:
+            self._finish()
+            self.bookmark_manager.bookmarks_updated.emit()
+            logger.info(f"Import finished: {self._imported} entries")
+            self.finished.emit(self._imported)
+        else:
+            self.progress.emit(self._imported)
+            QTimer.singleShot(0, self._import_next_chunk)
+
+    def _finish(self):
+        if self._entries is not None:
+            self._entries.close()
+        self._entries = None
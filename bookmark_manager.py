@@ -3,6 +3,9 @@ from PySide6.QtCore import QObject, Signal
 
 class BookmarkManager(QObject):
     bookmarks_updated = Signal()
+    bookmark_added = Signal(str, str)  # title, url
+    bookmark_removed = Signal(str)  # url
+    bookmark_renamed = Signal(str, str)  # url, title
 
     def __init__(self, db_file='bookmarks.db'):
         super().__init__()
@@ -16,24 +19,59 @@ class BookmarkManager(QObject):
             CREATE TABLE IF NOT EXISTS bookmarks
             (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, url TEXT)
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookmarks_url ON bookmarks (url)")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS history
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, title TEXT,
+             visit_count INTEGER DEFAULT 0, last_visit INTEGER DEFAULT 0)
+        ''')
         self.conn.commit()
 
     def add_bookmark(self, title, url):
         cursor = self.conn.cursor()
         cursor.execute("INSERT INTO bookmarks (title, url) VALUES (?, ?)", (title, url))
         self.conn.commit()
+        self.bookmark_added.emit(title, url)
         self.bookmarks_updated.emit()
 
+    def add_bookmarks(self, entries):
+        """Insert many (title, url) pairs in a single transaction, skipping known URLs."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO bookmarks (title, url) "
+                "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM bookmarks WHERE url = ?)",
+                ((title, url, url) for title, url in entries)
+            )
+        return cursor.rowcount
+
+    def add_history_entries(self, entries):
+        """Insert or merge many (url, title, visit_count, last_visit) rows in a single transaction."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO history (url, title, visit_count, last_visit) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "visit_count = visit_count + excluded.visit_count, "
+                "last_visit = MAX(last_visit, excluded.last_visit)",
+                entries
+            )
+        return cursor.rowcount
+
     def remove_bookmark(self, bookmark_id):
         cursor = self.conn.cursor()
+        row = cursor.execute("SELECT url FROM bookmarks WHERE id = ?", (bookmark_id,)).fetchone()
         cursor.execute("DELETE FROM bookmarks WHERE id = ?", (bookmark_id,))
         self.conn.commit()
+        if row:
+            self.bookmark_removed.emit(row[0])
         self.bookmarks_updated.emit()
 
     def rename_bookmark(self, bookmark_id, new_title):
         cursor = self.conn.cursor()
         cursor.execute("UPDATE bookmarks SET title = ? WHERE id = ?", (new_title, bookmark_id))
         self.conn.commit()
+        row = cursor.execute("SELECT url FROM bookmarks WHERE id = ?", (bookmark_id,)).fetchone()
+        if row:
+            self.bookmark_renamed.emit(row[0], new_title)
         self.bookmarks_updated.emit()
 
     def get_bookmarks(self):
@@ -41,6 +79,16 @@ class BookmarkManager(QObject):
         cursor.execute("SELECT id, title, url FROM bookmarks")
         return cursor.fetchall()
 
+    def is_bookmarked(self, url):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM bookmarks WHERE url = ? LIMIT 1", (url,))
+        return cursor.fetchone() is not None
+
+    def get_history(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT url, title, visit_count, last_visit FROM history")
+        return cursor.fetchall()
+
     def __del__(self):
         if hasattr(self, 'conn'):
             self.conn.close()
\ No newline at end of file
@@ -0,0 +1,166 @@
+import os
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('ChromiumFlags')
+
+FLAGS_VARIABLE = "QTWEBENGINE_CHROMIUM_FLAGS"
+PRESET_VARIABLE = "KEPLER_FLAGS_PRESET"
+DEFAULT_PRESET = 'balanced'
+
+# Switches whose values are lists; repeating them would let the last one win
+LIST_SWITCHES = {
+    '--enable-features': ',',
+    '--disable-features': ',',
+    '--js-flags': ' ',
+}
+
+# Privacy switches every preset starts from
+BASE_FLAGS = [
+    "--disable-gpu-driver-bug-workarounds",
+    "--disable-breakpad",  # Disable crash reporting
+    "--disable-speech-api",  # Disable speech recognition
+    "--disable-background-networking",
+    "--disable-component-update",  # Prevent auto-updates
+    "--disable-default-apps",
+    "--disable-sync",  # Disable Chrome Sync
+    "--disable-translate",  # Disable Google Translate
+    "--disable-webrtc-hw-encoding",
+    "--disable-client-side-phishing-detection",
+    "--no-pings",  # Disable hyperlink auditing
+    "--no-proxy-server",  # Disable proxy
+    "--no-service-autorun",
+    "--safebrowsing-disable-auto-update",
+    "--safebrowsing-disable-download-protection",
+    "--disable-features=OptimizationHints,MediaRouter,NetworkService,AudioServiceOutOfProcess,"
+    "AutofillServerCommunication,Translate,ChromeWhatsNew,SafetyCheck,ChromeCart,TabGroups,"
+    "TabHoverCards,DesktopPWAs,WebOTP,WebPayments,WebUSB,WebXR,WebAuthentication",
+]
+
+PRESETS = {
+    # Chromium's own process model and caches
+    'balanced': [],
+    # Fewer, smaller renderers: tabs of one site share a process, no spare
+    # renderer is kept warm and V8 collects garbage earlier
+    'low-memory': [
+        "--renderer-process-limit=4",
+        "--process-per-site",
+        "--disable-site-isolation-trials",
+        "--disable-features=SpareRendererForSitePerProcess,BackForwardCache",
+        "--js-flags=--optimize-for-size --max-old-space-size=512",
+    ],
+    # Faster loads and scrolling at the cost of memory and background CPU
+    'throughput': [
+        "--enable-gpu-rasterization",
+        "--enable-zero-copy",
+        "--num-raster-threads=4",
+        "--disable-renderer-backgrounding",
+        "--enable-features=BackForwardCache",
+    ],
+}
+
+def split_flag(flag):
+    name, _, value = flag.partition('=')
+    return name, (value if _ else None)
+
+class ChromiumFlags:
+    """Ordered set of Chromium switches where later values replace earlier ones.
+
+    List switches such as --disable-features are merged instead, and enabling a
+    feature removes it from the disabled list and vice versa.
+    """
+
+    def __init__(self, flags=()):
+        self.switches = {}  # name -> value, None for bare switches
+        self.lists = {name: [] for name in LIST_SWITCHES}
+        self.extend(flags)
+
+    def extend(self, flags):
+        for flag in flags:
+            self.add(flag)
+        return self
+
+    def add(self, flag):
+        name, value = split_flag(flag)
+        if name in LIST_SWITCHES:
+            for item in (value or '').split(LIST_SWITCHES[name]):
+                self.add_to_list(name, item.strip())
+        else:
+            self.switches.pop(name, None)
+            self.switches[name] = value
+
+    def add_to_list(self, name, item):
+        if not item:
+            return
+        if name == '--enable-features':
+            self._remove('--disable-features', item)
+        elif name == '--disable-features':
+            self._remove('--enable-features', item)
+        items = self.lists[name]
+        if item not in items:
+            items.append(item)
+
+    def _remove(self, name, item):
+        if item in self.lists[name]:
+            self.lists[name].remove(item)
+
+    def to_list(self):
+        flags = [name if value is None else f"{name}={value}" for name, value in self.switches.items()]
+        for name, separator in LIST_SWITCHES.items():
+            if self.lists[name]:
+                flags.append(f"{name}={separator.join(self.lists[name])}")
+        return flags
+
+    def __str__(self):
+        # Chromium splits the variable on spaces; list values with spaces need quoting
+        return ' '.join(f'"{flag}"' if ' ' in flag else flag for flag in self.to_list())
+
+def parse_flags(text):
+    """Split a flags string the way QtWebEngine does, keeping double-quoted values together."""
+    flags, current, quoted = [], [], False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif char.isspace() and not quoted:
+            if current:
+                flags.append(''.join(current))
+                current = []
+        else:
+            current.append(char)
+    if current:
+        flags.append(''.join(current))
+    return flags
+
+def build_flags(preset=DEFAULT_PRESET, extra=''):
+    """Base flags, then the preset, then extra (usually the user's own environment) on top."""
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown flags preset {preset!r}, expected one of {', '.join(PRESETS)}")
+    return ChromiumFlags(BASE_FLAGS).extend(PRESETS[preset]).extend(parse_flags(extra))
+
+def selected_preset(argv_preset=None, environ=os.environ):
+    """The command line wins over KEPLER_FLAGS_PRESET, which wins over the default.
+
+    An unknown preset falls back to the default with a warning rather than
+    keeping the browser from starting.
+    """
+    preset = argv_preset or environ.get(PRESET_VARIABLE) or DEFAULT_PRESET
+    if preset not in PRESETS:
+        logger.warning(f"Unknown flags preset {preset!r}, expected one of {', '.join(PRESETS)}; "
+                       f"using {DEFAULT_PRESET!r}")
+        return DEFAULT_PRESET
+    return preset
+
+def apply_flags(preset=DEFAULT_PRESET, environ=os.environ):
+    """Export the flags for QtWebEngine; only effective before QApplication is created."""
+    from PySide6.QtCore import QCoreApplication
+    if QCoreApplication.instance() is not None:
+        logger.warning("Chromium flags applied after QApplication was created; they will be ignored")
+    flags = build_flags(preset, environ.get(FLAGS_VARIABLE, ''))
+    environ[FLAGS_VARIABLE] = str(flags)
+    logger.info(f"Chromium flags ({preset}): {environ[FLAGS_VARIABLE]}")
+    return flags
@@ -0,0 +1,162 @@
+import time
+from collections import deque
+from PySide6.QtCore import QObject, Signal, QTimer, QPointF
+from PySide6.QtWebEngineCore import QWebEnginePage
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_crash.log'
+)
+logger = logging.getLogger('CrashRecovery')
+
+TerminationStatus = QWebEnginePage.RenderProcessTerminationStatus
+
+TERMINATION_REASONS = {
+    TerminationStatus.NormalTerminationStatus: 'normal',
+    TerminationStatus.AbnormalTerminationStatus: 'abnormal',
+    TerminationStatus.CrashedTerminationStatus: 'crashed',
+    TerminationStatus.KilledTerminationStatus: 'killed',
+}
+
+class RendererMemorySampler(QObject):
+    """Samples the RSS of every tab's renderer process from one timer.
+
+    Tabs often share a renderer, so each process is measured once per round no
+    matter how many tabs it serves. Without psutil nothing is sampled.
+    """
+
+    def __init__(self, interval=5000, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.recoveries = []
+        self.processes = {}  # pid -> psutil.Process
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+
+    def add(self, recovery):
+        self.recoveries.append(recovery)
+        recovery.destroyed.connect(lambda: self.remove(recovery))
+        if not self.timer.isActive():
+            self.timer.start(self.interval)
+
+    def remove(self, recovery):
+        if recovery in self.recoveries:
+            self.recoveries.remove(recovery)
+        if not self.recoveries:
+            self.timer.stop()
+            self.processes.clear()
+
+    def sample(self):
+        try:
+            import psutil
+        except ImportError:
+            self.timer.stop()
+            return
+        recoveries_by_pid = {}
+        for recovery in self.recoveries:
+            pid = recovery.web_view.page().renderProcessPid()
+            if pid > 0:
+                recoveries_by_pid.setdefault(pid, []).append(recovery)
+        for pid in set(self.processes) - set(recoveries_by_pid):
+            del self.processes[pid]
+
+        for pid, recoveries in recoveries_by_pid.items():
+            try:
+                if pid not in self.processes:
+                    self.processes[pid] = psutil.Process(pid)
+                rss = self.processes[pid].memory_info().rss
+            except psutil.Error:
+                # The renderer may already be gone; keep the last good sample
+                self.processes.pop(pid, None)
+                continue
+            for recovery in recoveries:
+                recovery.last_rss = rss
+
+_memory_sampler = None
+
+def get_memory_sampler():
+    """Shared RendererMemorySampler, created on first use."""
+    global _memory_sampler
+    if _memory_sampler is None:
+        _memory_sampler = RendererMemorySampler()
+    return _memory_sampler
+
+class CrashRecovery(QObject):
+    """Brings a tab back after its renderer process crashes or is killed.
+
+    The shared RendererMemorySampler records renderer memory while the tab lives,
+    so a crash report can say how big the process was when it died. The page's
+    navigation history lives in the browser process and survives the crash, so a
+    reload returns to the same entry; the last scroll position is restored once
+    it has loaded. More than
+    max_restarts crashes within restart_window seconds show the crash page instead.
+    crashed carries the crash record, whose 'reloading' says which of the two happens.
+    """
+    crashed = Signal(dict)
+
+    def __init__(self, web_view, max_restarts=3, restart_window=60):
+        super().__init__(web_view)
+        self.web_view = web_view
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.crash_times = deque()
+        self.crash_log = []
+
+        self.last_rss = None
+        self.scroll_position = QPointF()
+        self._pending_scroll = None
+
+        page = web_view.page()
+        page.renderProcessTerminated.connect(self._on_render_process_terminated)
+        page.scrollPositionChanged.connect(self._on_scroll_position_changed)
+        page.loadFinished.connect(self._on_load_finished)
+        get_memory_sampler().add(self)
+
+    def _on_scroll_position_changed(self, position):
+        if self._pending_scroll is None:
+            self.scroll_position = position
+
+    def _on_render_process_terminated(self, status, exit_code):
+        url = self.web_view.url()
+        record = {
+            'time': time.time(),
+            'url': url.toString(),
+            'reason': TERMINATION_REASONS.get(status, str(status)),
+            'exit_code': exit_code,
+            'rss': self.last_rss,
+        }
+        self.crash_log.append(record)
+        rss_text = f"{self.last_rss / (1024 * 1024):.0f} MB" if self.last_rss else "unknown"
+        logger.warning(f"Renderer for {record['url']} {record['reason']} "
+                       f"(exit code {exit_code}, last RSS {rss_text})")
+        if status == TerminationStatus.NormalTerminationStatus:
+            return
+
+        now = time.monotonic()
+        while self.crash_times and now - self.crash_times[0] > self.restart_window:
+            self.crash_times.popleft()
+        self.crash_times.append(now)
+
+        record['reloading'] = len(self.crash_times) <= self.max_restarts
+        self.crashed.emit(record)
+        if not record['reloading']:
+            logger.error(f"Renderer for {record['url']} keeps crashing, not restarting")
+            error_code = 'OUT_OF_MEMORY' if status == TerminationStatus.KilledTerminationStatus else 'RENDERER_CRASHED'
+            self.web_view.navigation.fail(record['url'], error_code)
+            return
+
+        # Back off a little more with every crash in the window
+        delay = 500 * 2 ** (len(self.crash_times) - 1)
+        self._pending_scroll = QPointF(self.scroll_position)
+        self.last_rss = None
+        QTimer.singleShot(delay, self, self.web_view.reload)
+
+    def _on_load_finished(self, ok):
+        if self._pending_scroll is None:
+            return
+        position, self._pending_scroll = self._pending_scroll, None
+        if ok and (position.x() or position.y()):
+            self.web_view.page().runJavaScript(f"window.scrollTo({position.x()}, {position.y()});")
@@ -1,14 +1,11 @@
 from PySide6.QtCore import Qt, QPoint, QOperatingSystemVersion
-from PySide6.QtGui import QIcon, QColor, QPainterPath, QPainter
+from PySide6.QtGui import QColor, QPainterPath, QPainter
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QWidget, QSpinBox
 )
-from styles import (
-    get_resource_dialog_style, get_custom_input_dialog_style,
-    get_dialog_title_style, get_dialog_title_label_style,
-    get_dialog_close_button_style
-)
+import asset_registry as assets
+from styles import theme_color
 
 class DraggableTitle(QWidget):
     def __init__(self, parent=None):
@@ -46,8 +43,7 @@ class CustomInputDialog(QDialog):
         
         if self.is_windows_10:
             self.setAttribute(Qt.WA_TranslucentBackground, False)
-        
-        self.setStyleSheet(get_custom_input_dialog_style(self.is_windows_10))
+            self.setProperty("squareCorners", True)
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 10)
@@ -55,19 +51,19 @@ class CustomInputDialog(QDialog):
         # Custom title bar
         self.title_bar = DraggableTitle(self)
         self.title_bar.setFixedHeight(30)
-        self.title_bar.setStyleSheet(get_dialog_title_style())
+        self.title_bar.setObjectName("dialogTitle")
         title_layout = QHBoxLayout(self.title_bar)
         title_layout.setContentsMargins(10, 0, 10, 0)
 
         title_label = QLabel(title)
-        title_label.setStyleSheet(get_dialog_title_label_style())
+        title_label.setObjectName("dialogTitleLabel")
         title_layout.addWidget(title_label)
         title_layout.addStretch()
 
         close_button = QPushButton()
-        close_button.setIcon(QIcon('Images/close-64.png'))
+        close_button.setIcon(assets.icon('close-64.png'))
         close_button.setFixedSize(24, 24)
-        close_button.setStyleSheet(get_dialog_close_button_style())
+        close_button.setObjectName("dialogCloseButton")
         close_button.clicked.connect(self.reject)
         title_layout.addWidget(close_button)
 
@@ -103,7 +99,7 @@ class CustomInputDialog(QDialog):
             path.addRoundedRect(self.rect(), 10, 10)
             
             painter.setClipPath(path)
-            painter.fillPath(path, QColor("#240970"))
+            painter.fillPath(path, QColor(theme_color('window')))
         else:
             super().paintEvent(event)
 
@@ -120,8 +116,7 @@ class ResourceDialog(QDialog):
         
         if self.is_windows_10:
             self.setAttribute(Qt.WA_TranslucentBackground, False)
-        
-        self.setStyleSheet(get_resource_dialog_style(self.is_windows_10))
+            self.setProperty("squareCorners", True)
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 10)
@@ -129,19 +124,19 @@ class ResourceDialog(QDialog):
         # Custom title bar
         self.title_bar = DraggableTitle(self)
         self.title_bar.setFixedHeight(30)
-        self.title_bar.setStyleSheet(get_dialog_title_style())
+        self.title_bar.setObjectName("dialogTitle")
         title_layout = QHBoxLayout(self.title_bar)
         title_layout.setContentsMargins(10, 0, 10, 0)
 
         title_label = QLabel("Resource Management")
-        title_label.setStyleSheet(get_dialog_title_label_style())
+        title_label.setObjectName("dialogTitleLabel")
         title_layout.addWidget(title_label)
         title_layout.addStretch()
 
         close_button = QPushButton()
-        close_button.setIcon(QIcon('Images/close-64.png'))
+        close_button.setIcon(assets.icon('close-64.png'))
         close_button.setFixedSize(24, 24)
-        close_button.setStyleSheet(get_dialog_close_button_style())
+        close_button.setObjectName("dialogCloseButton")
         close_button.clicked.connect(self.reject)
         title_layout.addWidget(close_button)
 
@@ -287,7 +282,7 @@ class ResourceDialog(QDialog):
             path.addRoundedRect(self.rect(), 10, 10)
             
             painter.setClipPath(path)
-            painter.fillPath(path, QColor("#240970"))
+            painter.fillPath(path, QColor(theme_color('window')))
         else:
             super().paintEvent(event)
 
@@ -18,6 +18,8 @@ class NetworkLimiter(QWebEngineUrlRequestInterceptor):
         self.bytes_processed = 0
         self.request_queue = []
         self.window_size = 1000  # 1 second window
+        self.header_profile = None  # Swapped as a whole on fingerprint rotation
+        self.hsts_store = None
         
         # Start cleanup timer after initialization
         QTimer.singleShot(0, self.setup_timer)
@@ -27,8 +29,27 @@ class NetworkLimiter(QWebEngineUrlRequestInterceptor):
         self.cleanup_timer.timeout.connect(self.cleanup_old_requests)
         self.cleanup_timer.start(1000)  # Cleanup every second
 
+    def set_header_profile(self, header_profile):
+        self.header_profile = header_profile
+
+    def set_hsts_store(self, hsts_store):
+        self.hsts_store = hsts_store
+
     def interceptRequest(self, info):
         try:
+            url = info.requestUrl()
+            if self.hsts_store and url.scheme() == 'http' and self.hsts_store.should_upgrade(url.host()):
+                # Upgrade before any plain-text connection is made; the redirect is intercepted again
+                url.setScheme('https')
+                if url.port() == 80:
+                    url.setPort(-1)
+                info.redirect(url)
+                return
+
+            header_profile = self.header_profile
+            if header_profile:
+                header_profile.apply(info)
+
             current_time = QDateTime.currentMSecsSinceEpoch()
             
             # Clean up old requests
@@ -1,24 +1,506 @@
 import os
-from PySide6.QtCore import QObject, Signal, Slot
-from PySide6.QtWidgets import QFileDialog
+import time
+import sqlite3
+from collections import deque
+from PySide6.QtCore import QObject, Signal, Slot, QStandardPaths, QTimer, QUrl
+from PySide6.QtNetwork import QNetworkAccessManager
 from PySide6.QtWebEngineCore import QWebEngineDownloadRequest
+from download_pipeline import DownloadPostProcessor
+from segmented_downloader import SegmentedDownload, unique_path
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_download.log'
+)
+logger = logging.getLogger('DownloadManager')
+
+DOWNLOAD_STATES = {
+    QWebEngineDownloadRequest.DownloadState.DownloadRequested: 'requested',
+    QWebEngineDownloadRequest.DownloadState.DownloadInProgress: 'downloading',
+    QWebEngineDownloadRequest.DownloadState.DownloadCompleted: 'completed',
+    QWebEngineDownloadRequest.DownloadState.DownloadCancelled: 'cancelled',
+    QWebEngineDownloadRequest.DownloadState.DownloadInterrupted: 'interrupted',
+}
+
+class DownloadStore:
+    """SQLite-backed download records that survive a restart."""
+
+    def __init__(self, db_file='downloads.db'):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(self.db_file)
+        self.create_table()
+
+    def create_table(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS downloads
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, path TEXT, state TEXT,
+             received_bytes INTEGER DEFAULT 0, total_bytes INTEGER DEFAULT -1,
+             started INTEGER, finished INTEGER)
+        ''')
+
+        # Post-processing columns, added in place for databases from older versions
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(downloads)")}
+        for column, column_type in (('sha256', 'TEXT'), ('expected_sha256', 'TEXT'),
+                                    ('mime_type', 'TEXT'), ('verified', 'INTEGER')):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE downloads ADD COLUMN {column} {column_type}")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_state ON downloads (state)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_url ON downloads (url)")
+
+        # Anything still running when the last session ended can no longer be resumed
+        cursor.execute(
+            "UPDATE downloads SET state = 'interrupted' "
+            "WHERE state IN ('requested', 'queued', 'downloading', 'paused')"
+        )
+        self.conn.commit()
+
+    def add_download(self, url, path, state):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT INTO downloads (url, path, state, started) VALUES (?, ?, ?, ?)",
+            (url, path, state, int(time.time()))
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def update_download(self, record_id, **fields):
+        if not fields:
+            return
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        cursor = self.conn.cursor()
+        cursor.execute(f"UPDATE downloads SET {columns} WHERE id = ?", (*fields.values(), record_id))
+        self.conn.commit()
+
+    def get_download(self, record_id):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT path, sha256, expected_sha256 FROM downloads WHERE id = ?", (record_id,))
+        return cursor.fetchone()
+
+    def get_downloads(self, state=None):
+        cursor = self.conn.cursor()
+        if state:
+            cursor.execute("SELECT * FROM downloads WHERE state = ? ORDER BY id DESC", (state,))
+        else:
+            cursor.execute("SELECT * FROM downloads ORDER BY id DESC")
+        return cursor.fetchall()
+
+    def __del__(self):
+        if hasattr(self, 'conn'):
+            self.conn.close()
 
 class DownloadManager(QObject):
     download_requested = Signal(QWebEngineDownloadRequest)
+    download_added = Signal(int)
+    download_progress = Signal(int, int, int, float)  # id, received bytes, total bytes, bytes per second
+    download_state_changed = Signal(int, str)
+    download_verified = Signal(int, dict)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, download_dir=None, max_concurrent=3, db_file='downloads.db'):
         super().__init__(parent)
+        self.download_dir = download_dir or QStandardPaths.writableLocation(QStandardPaths.DownloadLocation)
+        self.max_concurrent = max_concurrent
+        self.store = DownloadStore(db_file)
+
+        self.downloads = {}  # record id -> tracking info for downloads of this session
+        self.active = set()
+        self.queue = deque()
+
+        self.post_processor = DownloadPostProcessor(parent=self)
+        self.post_processor.processed.connect(self._on_post_processed)
+        self.post_processor.failed.connect(
+            lambda record_id, error: logger.error(f"Post-processing failed for download {record_id}: {error}")
+        )
+        self._record_ids = {}  # QWebEngineDownloadRequest id -> record id
+
+        # Bandwidth shaping against the NetworkLimiter budget, see attach_network_limiter()
+        self.limiter = None
+        self.resource_manager = None
+        self.download_share = 0.5
+        self.throttled = set()
+        self._download_credit = 0.0
+        self._last_shape_time = time.monotonic()
+
+        # Optional segmented engine for large files on servers that support Range requests
+        self.use_segmented_engine = False
+        self.segmented_threshold = 32 * 1024 * 1024
+        self.segment_count = 4
+        self._network_access_manager = None
+
+    def set_download_directory(self, path):
+        self.download_dir = path
+
+    def set_max_concurrent(self, max_concurrent):
+        self.max_concurrent = max(1, max_concurrent)
+        self._start_queued()
+
+    def attach_network_limiter(self, limiter, resource_manager, download_share=0.5):
+        """Make downloads share ResourceManager.network_limit with page loads.
+
+        While pages are loading, downloads may use at most download_share of the
+        limit; when browsing is idle they can use all of it. Downloads over budget
+        stop reading until credit returns, without dropping their connections.
+        """
+        self.limiter = limiter
+        self.resource_manager = resource_manager
+        self.download_share = download_share
+        self.shaping_timer = QTimer(self)
+        self.shaping_timer.timeout.connect(self._shape_bandwidth)
+        self.shaping_timer.start(250)
+
+    def set_download_share(self, download_share):
+        self.download_share = min(max(download_share, 0.05), 1.0)
 
     @Slot(QWebEngineDownloadRequest)
     def on_download_requested(self, download: QWebEngineDownloadRequest):
-        download_path, _ = QFileDialog.getSaveFileName(
-            None, "Save File", download.downloadFileName()
+        os.makedirs(self.download_dir, exist_ok=True)
+        download.setDownloadDirectory(self.download_dir)
+        download.accept()
+
+        if self.use_segmented_engine and self._should_segment(download):
+            # Parked rather than cancelled until the segmented engine's probe is answered,
+            # so a download it cannot fetch (HTTP auth, say) goes back to Chromium
+            download.pause()
+            path = os.path.join(self.download_dir, download.downloadFileName())
+            self.start_segmented_download(download.url().toString(), path,
+                                          headers=self._handoff_headers(download), handoff=download)
+            return
+
+        path = os.path.join(download.downloadDirectory(), download.downloadFileName())
+        record_id = self.store.add_download(download.url().toString(), path, 'queued')
+        self._track_browser_download(record_id, download)
+
+        logger.info(f"Download accepted: {download.url().toString()} -> {path}")
+        self.download_added.emit(record_id)
+        self.download_requested.emit(download)
+
+    def _track_browser_download(self, record_id, download):
+        self._record_ids[download.id()] = record_id
+        self.downloads[record_id] = {
+            'request': download,
+            'state': 'queued',
+            'last_bytes': 0,
+            'last_time': time.monotonic(),
+            'rate': 0.0,
+        }
+
+        download.receivedBytesChanged.connect(lambda: self._on_received_bytes(record_id))
+        download.stateChanged.connect(lambda state: self._on_state_changed(record_id, state))
+
+        # Chromium starts the transfer on accept, so queued downloads are parked until a slot frees up
+        if len(self.active) < self.max_concurrent:
+            self.active.add(record_id)
+            if download.isPaused():
+                download.resume()
+            self._set_state(record_id, 'downloading')
+        else:
+            download.pause()
+            self.queue.append(record_id)
+            self._set_state(record_id, 'queued')
+
+    def attach_cookie_store(self, cookie_store):
+        """Mirror the browser's cookies into the segmented engine, so handed-off downloads keep the session."""
+        jar = self._segmented_network_manager().cookieJar()
+        cookie_store.cookieAdded.connect(jar.insertCookie)
+        cookie_store.cookieRemoved.connect(jar.deleteCookie)
+        cookie_store.loadAllCookies()
+
+    def _segmented_network_manager(self):
+        if self._network_access_manager is None:
+            self._network_access_manager = QNetworkAccessManager(self)
+        return self._network_access_manager
+
+    def _handoff_headers(self, download):
+        """Request headers Chromium would have sent that the segmented engine can reproduce."""
+        headers = {}
+        page = download.page()
+        if page:
+            referrer = QUrl(page.url())
+            if referrer.scheme() in ('http', 'https') and referrer != download.url():
+                referrer.setUserInfo(None)
+                referrer.setFragment(None)
+                headers[b'Referer'] = bytes(referrer.toEncoded().data())
+            headers[b'User-Agent'] = page.profile().httpUserAgent().encode()
+        return headers
+
+    def start_segmented_download(self, url, path=None, segments=None, headers=None, handoff=None):
+        """Download url with parallel Range requests, falling back to one stream if unsupported.
+
+        handoff is a paused browser download for the same url, taken over if the server
+        turns the segmented engine away and cancelled once it answers.
+        """
+        os.makedirs(self.download_dir, exist_ok=True)
+        # Never write over an existing file or another download's checkpoint
+        path = unique_path(path or os.path.join(self.download_dir, QUrl(url).fileName() or 'download'))
+
+        record_id = self.store.add_download(url, path, 'queued')
+        job = SegmentedDownload(self._segmented_network_manager(), url, path, segments or self.segment_count,
+                                headers=headers, parent=self)
+        self.downloads[record_id] = {
+            'request': job,
+            'segmented': True,
+            'handoff': handoff,
+            'state': 'queued',
+            'last_bytes': 0,
+            'last_time': time.monotonic(),
+            'rate': 0.0,
+        }
+        job.progress.connect(lambda received, total: self._track_progress(record_id, received, total))
+        job.finished.connect(lambda path: self._on_segmented_finished(record_id, path))
+        job.failed.connect(lambda error: self._on_segmented_failed(record_id, error))
+        job.accepted.connect(lambda: self._on_segmented_accepted(record_id))
+        job.rejected.connect(lambda error: self._on_segmented_rejected(record_id, error))
+
+        # Counts against max_concurrent and the bandwidth shaper like any other download
+        if len(self.active) < self.max_concurrent:
+            self.active.add(record_id)
+            job.start()
+            self._set_state(record_id, 'downloading')
+        else:
+            self.queue.append(record_id)
+
+        logger.info(f"Segmented download started: {url} -> {path}")
+        self.download_added.emit(record_id)
+        return record_id
+
+    def pause(self, record_id):
+        info = self.downloads.get(record_id)
+        if not info or info['state'] not in ('downloading', 'queued'):
+            return
+        info['request'].pause()
+        info['rate'] = 0.0
+        self.throttled.discard(record_id)
+        self._release_slot(record_id)
+        self._set_state(record_id, 'paused')
+        self._start_queued()
+
+    def resume(self, record_id):
+        info = self.downloads.get(record_id)
+        if not info or info['state'] not in ('paused', 'interrupted'):
+            return
+        if len(self.active) < self.max_concurrent:
+            self.active.add(record_id)
+            info['request'].resume()
+            self._set_state(record_id, 'downloading')
+        else:
+            self.queue.append(record_id)
+            self._set_state(record_id, 'queued')
+
+    def retry(self, record_id):
+        """Resume an interrupted download from where Chromium left off."""
+        self.resume(record_id)
+
+    def cancel(self, record_id):
+        info = self.downloads.get(record_id)
+        if not info:
+            return
+        if info.get('segmented'):
+            if info['state'] != 'completed':
+                self._drop_handoff(info)
+                info['request'].cancel()
+                info['rate'] = 0.0
+                self.throttled.discard(record_id)
+                self._release_slot(record_id)
+                self._set_state(record_id, 'cancelled')
+                self._start_queued()
+        elif not info['request'].isFinished():
+            info['request'].cancel()
+
+    def set_expected_hash(self, record_id, sha256):
+        """Register the published SHA-256 for a download; verifies immediately if it already finished."""
+        sha256 = sha256.strip().lower()
+        self.store.update_download(record_id, expected_sha256=sha256)
+        record = self.store.get_download(record_id)
+        if record and record[1]:
+            verified = record[1] == sha256
+            self.store.update_download(record_id, verified=int(verified))
+            self.download_verified.emit(record_id, {'sha256': record[1], 'verified': verified})
+
+    def get_download_history(self):
+        return self.store.get_downloads()
+
+    def active_summary(self):
+        """Return (active count, combined bytes per second) for the status bar."""
+        running = [info for info in self.downloads.values() if info['state'] == 'downloading']
+        return len(running), sum(info['rate'] for info in running)
+
+    def _should_segment(self, download):
+        return (download.url().scheme() in ('http', 'https')
+                and not download.isSavePageDownload()
+                and download.totalBytes() >= self.segmented_threshold)
+
+    def _on_received_bytes(self, record_id):
+        download = self.downloads[record_id]['request']
+        self._track_progress(record_id, download.receivedBytes(), download.totalBytes())
+
+    def _track_progress(self, record_id, received, total):
+        info = self.downloads[record_id]
+        now = time.monotonic()
+
+        self._download_credit -= received - info['last_bytes']
+
+        elapsed = now - info['last_time']
+        if elapsed > 0:
+            instant_rate = (received - info['last_bytes']) / elapsed
+            # Smooth the rate so the status bar doesn't jitter between chunks
+            info['rate'] = 0.7 * info['rate'] + 0.3 * instant_rate
+        info['last_bytes'] = received
+        info['last_time'] = now
+
+        self.download_progress.emit(record_id, received, total, info['rate'])
+
+    def _on_segmented_finished(self, record_id, path):
+        info = self.downloads[record_id]
+        info['rate'] = 0.0
+        self.throttled.discard(record_id)
+        self._release_slot(record_id)
+        size = os.path.getsize(path)
+        self.store.update_download(record_id, received_bytes=size, total_bytes=size, finished=int(time.time()))
+        self._set_state(record_id, 'completed')
+        record = self.store.get_download(record_id)
+        self.post_processor.submit(record_id, path, record[2] if record else None)
+        self._start_queued()
+
+    def _on_segmented_accepted(self, record_id):
+        self._drop_handoff(self.downloads[record_id])
+
+    def _drop_handoff(self, info):
+        handoff = info.pop('handoff', None)
+        if handoff is not None:
+            handoff.cancel()
+
+    def _on_segmented_rejected(self, record_id, error):
+        info = self.downloads[record_id]
+        handoff = info.pop('handoff', None)
+        if handoff is None:
+            self._on_segmented_failed(record_id, error)
+            return
+
+        # Chromium may have what the segmented engine lacks, so the record continues as its download
+        logger.info(f"Segmented engine refused ({error}), download {record_id} stays with the browser")
+        info['request'].deleteLater()
+        self.throttled.discard(record_id)
+        self._release_slot(record_id)
+        path = os.path.join(handoff.downloadDirectory(), handoff.downloadFileName())
+        self.store.update_download(record_id, path=path)
+        self._track_browser_download(record_id, handoff)
+        self._start_queued()
+
+    def _on_segmented_failed(self, record_id, error):
+        self.downloads[record_id]['rate'] = 0.0
+        self.throttled.discard(record_id)
+        self._release_slot(record_id)
+        logger.warning(f"Segmented download {record_id} interrupted: {error}")
+        self._set_state(record_id, 'interrupted')
+        self._start_queued()
+
+    def _on_state_changed(self, record_id, state):
+        state_name = DOWNLOAD_STATES.get(state, 'unknown')
+        if state_name not in ('completed', 'cancelled', 'interrupted'):
+            return
+
+        info = self.downloads[record_id]
+        download = info['request']
+        info['rate'] = 0.0
+        self.throttled.discard(record_id)
+        self._release_slot(record_id)
+        self.store.update_download(
+            record_id,
+            received_bytes=download.receivedBytes(),
+            total_bytes=download.totalBytes(),
+            finished=int(time.time())
         )
-        if download_path:
-            download.setPath(download_path)
-            download.accept()
-            download.finished.connect(lambda: self.on_download_finished(download))
+        self._set_state(record_id, state_name)
+
+        if state_name == 'completed':
+            self.on_download_finished(download)
+        elif state_name == 'interrupted':
+            logger.warning(f"Download interrupted: {download.interruptReasonString()}")
+
+        self._start_queued()
+
+    def _shape_bandwidth(self):
+        now = time.monotonic()
+        elapsed = now - self._last_shape_time
+        self._last_shape_time = now
+
+        limit = self.resource_manager.network_limit if self.resource_manager else None
+        if not limit:
+            self._download_credit = 0.0
+            self._resume_throttled()
+            return
+
+        # Interactive page loads get first claim on the budget
+        page_bandwidth = self.limiter.calculate_current_bandwidth()
+        download_budget = limit * self.download_share if page_bandwidth > 0 else limit
+        download_budget = min(download_budget, max(limit - page_bandwidth, limit * 0.05))
+
+        # Allow at most one second of burst so an idle period can't be saved up
+        self._download_credit = min(self._download_credit + download_budget * elapsed, download_budget)
+
+        if self._download_credit < 0:
+            for record_id in self.active - self.throttled:
+                self._set_throttled(record_id, True)
+                self.throttled.add(record_id)
+        else:
+            self._resume_throttled()
+
+    def _resume_throttled(self):
+        for record_id in self.throttled:
+            if record_id in self.active:
+                self._set_throttled(record_id, False)
+        self.throttled.clear()
+
+    def _set_throttled(self, record_id, throttled):
+        info = self.downloads[record_id]
+        if info.get('segmented'):
+            # Pausing would abort its replies, and a server without Range support starts over
+            info['request'].set_throttled(throttled)
+        elif throttled:
+            # Chromium holds a paused request open and only stops reading it
+            info['request'].pause()
+        else:
+            info['request'].resume()
+
+    def _set_state(self, record_id, state_name):
+        self.downloads[record_id]['state'] = state_name
+        self.store.update_download(record_id, state=state_name)
+        self.download_state_changed.emit(record_id, state_name)
+
+    def _release_slot(self, record_id):
+        self.active.discard(record_id)
+        if record_id in self.queue:
+            self.queue.remove(record_id)
+
+    def _start_queued(self):
+        while self.queue and len(self.active) < self.max_concurrent:
+            record_id = self.queue.popleft()
+            self.active.add(record_id)
+            self.downloads[record_id]['request'].resume()
+            self._set_state(record_id, 'downloading')
 
     @Slot()
     def on_download_finished(self, download):
-        print(f"Download finished: {download.path()}")
\ No newline at end of file
+        path = os.path.join(download.downloadDirectory(), download.downloadFileName())
+        logger.info(f"Download finished: {path}")
+
+        record_id = self._record_ids.get(download.id())
+        if record_id is not None:
+            record = self.store.get_download(record_id)
+            self.post_processor.submit(record_id, path, record[2] if record else None)
+
+    def _on_post_processed(self, record_id, result):
+        verified = result['verified']
+        self.store.update_download(
+            record_id,
+            sha256=result['sha256'],
+            mime_type=result['mime_type'],
+            verified=None if verified is None else int(verified)
+        )
+        if verified is False:
+            logger.warning(f"Checksum mismatch for download {record_id}: {result['sha256']}")
+        self.download_verified.emit(record_id, result)
@@ -0,0 +1,106 @@
+import hashlib
+import mimetypes
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_download.log'
+)
+logger = logging.getLogger('DownloadPipeline')
+
+READ_BUFFER_SIZE = 4 * 1024 * 1024  # hashlib releases the GIL for large updates
+
+MAGIC_SIGNATURES = [
+    (b'%PDF-', 'application/pdf'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'MZ', 'application/vnd.microsoft.portable-executable'),
+    (b'\x7fELF', 'application/x-elf'),
+    (b'\x1f\x8b', 'application/gzip'),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (b'OggS', 'audio/ogg'),
+    (b'ID3', 'audio/mpeg'),
+    (b'fLaC', 'audio/flac'),
+    (b'\x1aE\xdf\xa3', 'video/webm'),
+]
+
+def sniff_file_type(header, path):
+    """Guess a MIME type from the leading bytes, falling back to the file extension."""
+    for signature, mime_type in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    if header[4:8] == b'ftyp':
+        return 'video/mp4'
+    if header.startswith(b'RIFF'):
+        if header[8:12] == b'WEBP':
+            return 'image/webp'
+        if header[8:12] == b'WAVE':
+            return 'audio/wav'
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or 'application/octet-stream'
+
+class _TaskSignals(QObject):
+    processed = Signal(int, dict)
+    failed = Signal(int, str)
+
+class FileDigestTask(QRunnable):
+    """Hashes and sniffs one finished download on a pool thread."""
+
+    def __init__(self, record_id, path, expected_sha256, signals):
+        super().__init__()
+        self.record_id = record_id
+        self.path = path
+        self.expected_sha256 = expected_sha256
+        self.signals = signals
+
+    def run(self):
+        try:
+            digest = hashlib.sha256()
+            buffer = bytearray(READ_BUFFER_SIZE)
+            view = memoryview(buffer)
+            header = b''
+            with open(self.path, 'rb', buffering=0) as f:
+                while True:
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    if not header:
+                        header = bytes(view[:64])
+                    digest.update(view[:count])
+
+            sha256 = digest.hexdigest()
+            result = {
+                'sha256': sha256,
+                'mime_type': sniff_file_type(header, self.path),
+                'verified': None if not self.expected_sha256 else sha256 == self.expected_sha256.lower(),
+            }
+            self.signals.processed.emit(self.record_id, result)
+        except OSError as e:
+            self.signals.failed.emit(self.record_id, str(e))
+
+class DownloadPostProcessor(QObject):
+    """Runs checksum and type detection for finished downloads off the GUI thread."""
+    processed = Signal(int, dict)
+    failed = Signal(int, str)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = _TaskSignals(self)
+        self.signals.processed.connect(self.processed)
+        self.signals.failed.connect(self.failed)
+
+    def submit(self, record_id, path, expected_sha256=None):
+        logger.info(f"Queued post-processing for {path}")
+        self.pool.start(FileDigestTask(record_id, path, expected_sha256, self.signals))
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
@@ -1,9 +1,48 @@
 import random
-import string
-from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings
-import platform
-import json
-import os
+import secrets
+import hmac
+import hashlib
+from collections import OrderedDict
+from url_classifier import get_public_suffix_list
+from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings, QWebEngineScript, QWebEngineUrlRequestInfo
+
+FINGERPRINT_SCRIPT_NAME = "kepler-anti-fingerprint"
+
+CLIENT_HINT_BRANDS = (("Edg/", "Microsoft Edge"), ("Edge/", "Microsoft Edge"), ("Chrome/", "Google Chrome"))
+
+_ResourceType = QWebEngineUrlRequestInfo.ResourceType
+_HTML_ACCEPT = b'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'
+
+# Resource type -> (Accept, Sec-Fetch-Dest, Sec-Fetch-Mode) as a real browser sends them.
+# Only navigations and subresources are listed: page script cannot attach headers to
+# these, whereas XHR/fetch, beacons and reports carry whatever the page asked for.
+# None marks a value the type does not decide (a crossorigin attribute or a module
+# script makes the mode cors, media may be audio or video, a subframe an iframe or
+# a frame); Chromium's own header is kept for those.
+FETCH_METADATA = {
+    _ResourceType.ResourceTypeMainFrame: (_HTML_ACCEPT, b'document', b'navigate'),
+    _ResourceType.ResourceTypeSubFrame: (_HTML_ACCEPT, None, b'navigate'),
+    _ResourceType.ResourceTypeStylesheet: (b'text/css,*/*;q=0.1', b'style', None),
+    _ResourceType.ResourceTypeScript: (b'*/*', b'script', None),
+    _ResourceType.ResourceTypeImage: (b'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8', b'image', None),
+    _ResourceType.ResourceTypeFavicon: (b'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8', b'image', b'no-cors'),
+    _ResourceType.ResourceTypeFontResource: (b'*/*', b'font', b'cors'),
+    _ResourceType.ResourceTypeMedia: (b'*/*', None, None),
+    _ResourceType.ResourceTypeWorker: (b'*/*', b'worker', None),
+    _ResourceType.ResourceTypeSharedWorker: (b'*/*', b'sharedworker', None),
+    _ResourceType.ResourceTypeServiceWorker: (b'*/*', b'serviceworker', b'same-origin'),
+    _ResourceType.ResourceTypeObject: (b'*/*', None, b'no-cors'),
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ws': 80, 'wss': 443}
+
+# Headers the engine itself fills in for the types above; ours replace its defaults.
+# Anything else already on the request is left alone.
+ENGINE_HEADERS = {b'accept', b'upgrade-insecure-requests'}
+
+def client_hint_brand(user_agent):
+    """Brand for the Sec-CH-UA header, or None when the User-Agent is not Chromium-based."""
+    return next((name for token, name in CLIENT_HINT_BRANDS if token in user_agent), None)
 
 class FingerprintManager:
     def __init__(self):
@@ -63,31 +102,62 @@ class FingerprintManager:
             "Win32", "Win64", "MacIntel", "Linux x86_64"
         ]
         
-        # Load or create canvas noise
-        self.canvas_noise = self.load_or_create_canvas_noise()
-
-    def load_or_create_canvas_noise(self):
-        noise_file = "canvas_noise.json"
-        if os.path.exists(noise_file):
-            with open(noise_file, 'r') as f:
-                return json.load(f)
-        else:
-            # Generate random noise pattern
-            noise = {
-                'offset': random.uniform(0, 1),
-                'multiplier': random.uniform(0.9, 1.1)
-            }
-            with open(noise_file, 'w') as f:
-                json.dump(noise, f)
-            return noise
+        # Per-site fingerprints are derived from this secret, see rotate()
+        self.session_secret = secrets.token_bytes(32)
+        self.generation = 0
+
+        # Compiled per-site scripts, least recently used first
+        self.script_cache = OrderedDict()
+        self.script_cache_size = 256
+
+    def rotate(self):
+        """Start a new identity for every site. Cached scripts belong to the old secret and are dropped."""
+        self.session_secret = secrets.token_bytes(32)
+        self.generation += 1
+        self.script_cache.clear()
+
+    def site_for_host(self, host):
+        """Reduce a host to the registrable domain (eTLD+1) that shares one identity."""
+        return get_public_suffix_list().registrable_domain(host)
+
+    def get_site_fingerprint(self, site):
+        """Derive a stable identity for a site that can't be linked to other sites without the secret."""
+        digest = hmac.new(self.session_secret, site.encode('utf-8'), hashlib.sha256).digest()
+        return {
+            'platform': self.platforms[digest[0] % len(self.platforms)],
+            'resolution': self.screen_resolutions[digest[1] % len(self.screen_resolutions)],
+            'canvas_noise': {
+                'offset': int.from_bytes(digest[4:8], 'big') / 2**32,
+                'multiplier': 0.9 + 0.2 * int.from_bytes(digest[8:12], 'big') / 2**32
+            },
+            # Window property holding the identity updater, and the token it requires.
+            # Both differ per site and per rotation, so neither links sites.
+            'state_key': '__kepler_' + digest[12:20].hex(),
+            'state_token': digest[20:32].hex()
+        }
+
+    def get_site_state(self, site):
+        """(state key, token) that documents of site created from now on are patched under."""
+        fingerprint = self.get_site_fingerprint(site)
+        return fingerprint['state_key'], fingerprint['state_token']
+
+    def get_script_for_site(self, site):
+        script = self.script_cache.get(site)
+        if script is not None:
+            self.script_cache.move_to_end(site)
+            return script
+
+        script = self.build_script(self.get_site_fingerprint(site))
+        self.script_cache[site] = script
+        if len(self.script_cache) > self.script_cache_size:
+            self.script_cache.popitem(last=False)
+        return script
 
     def get_random_fingerprint(self):
+        # The HTTP identity is profile-wide, so it is rotated globally
         return {
             'user_agent': random.choice(self.user_agents),
-            'platform': random.choice(self.platforms),
-            'language': random.choice(self.languages),
-            'resolution': random.choice(self.screen_resolutions),
-            'canvas_noise': self.canvas_noise
+            'language': random.choice(self.languages)
         }
 
     def apply_fingerprint(self, profile: QWebEngineProfile, settings: QWebEngineSettings):
@@ -96,70 +166,220 @@ class FingerprintManager:
         # Set user agent
         profile.setHttpUserAgent(fingerprint['user_agent'])
         profile.setHttpAcceptLanguage(fingerprint['language'])
-        
-        # Inject JavaScript to override fingerprinting APIs
+
+        # Firefox and Safari send no client hints; the interceptor cannot remove
+        # headers, so the engine must not add its own Sec-CH-UA* (Qt 6.8+)
+        if hasattr(profile, 'clientHints'):
+            profile.clientHints().setAllClientHintsEnabled(client_hint_brand(fingerprint['user_agent']) is not None)
+        return fingerprint
+
+    def build_script(self, fingerprint):
+        # Prototypes are patched once per document. The updater left on window only
+        # swaps the identity the patched functions read, and only for a caller that
+        # knows the token held in this closure, which page script never sees.
         js_code = f"""
-        // Override platform
-        Object.defineProperty(navigator, 'platform', {{
-            get: function() {{ return '{fingerprint['platform']}'; }}
-        }});
-        
-        // Override screen resolution
-        Object.defineProperty(screen, 'width', {{
-            get: function() {{ return {fingerprint['resolution'][0]}; }}
-        }});
-        Object.defineProperty(screen, 'height', {{
-            get: function() {{ return {fingerprint['resolution'][1]}; }}
-        }});
-        
-        // Add noise to canvas fingerprinting
-        const originalGetContext = HTMLCanvasElement.prototype.getContext;
-        HTMLCanvasElement.prototype.getContext = function() {{
-            const context = originalGetContext.apply(this, arguments);
-            if (context && arguments[0] === '2d') {{
-                const originalFillRect = context.fillRect;
-                context.fillRect = function() {{
-                    const offset = {fingerprint['canvas_noise']['offset']};
-                    const multiplier = {fingerprint['canvas_noise']['multiplier']};
-                    arguments[0] += offset;
-                    arguments[1] += offset;
-                    arguments[2] *= multiplier;
-                    arguments[3] *= multiplier;
-                    return originalFillRect.apply(this, arguments);
-                }};
+        (function() {{
+            const identity = {self.identity_js(fingerprint)};
+
+            const stateKey = '{fingerprint['state_key']}';
+            if (window[stateKey]) {{
+                return;
             }}
-            return context;
-        }};
-        
-        // Override WebGL fingerprinting
-        const getParameterProxyHandler = {{
-            apply: function(target, thisArg, argumentsList) {{
-                const param = argumentsList[0];
-                if (param === thisArg.VENDOR || param === thisArg.RENDERER) {{
-                    return 'KEPLER COMMUNITY Browser';
+
+            let current = identity;
+            let token = '{fingerprint['state_token']}';
+            Object.defineProperty(window, stateKey, {{
+                value: function(givenToken, next, nextToken) {{
+                    if (givenToken !== token) {{
+                        return false;
+                    }}
+                    current = next;
+                    token = nextToken;
+                    return true;
                 }}
-                return target.apply(thisArg, argumentsList);
+            }});
+
+            // Override platform and screen resolution
+            Object.defineProperty(Navigator.prototype, 'platform', {{
+                get: function() {{ return current.platform; }},
+                configurable: true
+            }});
+            Object.defineProperty(Screen.prototype, 'width', {{
+                get: function() {{ return current.width; }},
+                configurable: true
+            }});
+            Object.defineProperty(Screen.prototype, 'height', {{
+                get: function() {{ return current.height; }},
+                configurable: true
+            }});
+
+            // Add noise to canvas fingerprinting
+            const fillRect = CanvasRenderingContext2D.prototype.fillRect;
+            CanvasRenderingContext2D.prototype.fillRect = function(x, y, width, height) {{
+                return fillRect.call(
+                    this,
+                    x + current.offset,
+                    y + current.offset,
+                    width * current.multiplier,
+                    height * current.multiplier
+                );
+            }};
+
+            // Override WebGL vendor and renderer (VENDOR = 0x1F00, RENDERER = 0x1F01)
+            const patchGetParameter = function(prototype) {{
+                const getParameter = prototype.getParameter;
+                prototype.getParameter = function(param) {{
+                    if (param === 0x1F00 || param === 0x1F01) {{
+                        return 'KEPLER COMMUNITY Browser';
+                    }}
+                    return getParameter.call(this, param);
+                }};
+            }};
+            if (window.WebGLRenderingContext) {{
+                patchGetParameter(WebGLRenderingContext.prototype);
             }}
-        }};
-        
-        if (WebGLRenderingContext.prototype) {{
-            WebGLRenderingContext.prototype.getParameter = new Proxy(
-                WebGLRenderingContext.prototype.getParameter,
-                getParameterProxyHandler
-            );
-        }}
+            if (window.WebGL2RenderingContext) {{
+                patchGetParameter(WebGL2RenderingContext.prototype);
+            }}
+        }})();
         """
-        
-        # Add the script to be injected on page load
         return js_code
 
-    def randomize_headers(self, request):
-        """Add random headers to requests to further prevent fingerprinting"""
-        headers = request.header()
-        headers.add("Accept", "*/*")
-        headers.add("DNT", "1")  # Do Not Track
-        headers.add("Upgrade-Insecure-Requests", "1")
-        headers.add("Sec-Fetch-Dest", random.choice(["document", "empty", "image"]))
-        headers.add("Sec-Fetch-Mode", random.choice(["navigate", "cors", "no-cors"]))
-        headers.add("Sec-Fetch-Site", random.choice(["none", "same-origin", "cross-site"]))
-        return headers 
\ No newline at end of file
+    def identity_js(self, fingerprint):
+        return f"""{{
+                platform: '{fingerprint['platform']}',
+                width: {fingerprint['resolution'][0]},
+                height: {fingerprint['resolution'][1]},
+                offset: {fingerprint['canvas_noise']['offset']},
+                multiplier: {fingerprint['canvas_noise']['multiplier']}
+            }}"""
+
+    def build_update_script(self, site, state_key, state_token):
+        """Script moving a document patched under (state_key, state_token) to site's current identity.
+
+        Returns the script and the token the document's updater expects afterwards.
+        """
+        fingerprint = self.get_site_fingerprint(site)
+        js_code = f"""
+        (function() {{
+            const update = window['{state_key}'];
+            if (update) {{
+                update('{state_token}', {self.identity_js(fingerprint)}, '{fingerprint['state_token']}');
+            }}
+        }})();
+        """
+        return js_code, fingerprint['state_token']
+
+    def install_script(self, scripts, js_code):
+        """Install the anti-fingerprint code so it runs before any page script.
+
+        The previous version is replaced in the same call, so documents created
+        after a rotation see exactly one copy of the new fingerprint.
+        """
+        script = QWebEngineScript()
+        script.setName(FINGERPRINT_SCRIPT_NAME)
+        script.setSourceCode(js_code)
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.MainWorld)
+        script.setRunsOnSubFrames(True)
+
+        for old_script in scripts.find(FINGERPRINT_SCRIPT_NAME):
+            scripts.remove(old_script)
+        scripts.insert(script)
+
+    def build_header_profile(self, fingerprint):
+        """Precompute request headers that agree with the rotated User-Agent.
+
+        Called once per rotation; the interceptor then only does dictionary lookups.
+        """
+        user_agent = fingerprint['user_agent']
+        common = [(b'DNT', b'1')]
+
+        # Only Chromium-based browsers send User-Agent client hints
+        brand = client_hint_brand(user_agent)
+        if brand:
+            if 'Windows' in user_agent:
+                platform_name = 'Windows'
+            elif 'Macintosh' in user_agent:
+                platform_name = 'macOS'
+            else:
+                platform_name = 'Linux'
+            common += [
+                (b'Sec-CH-UA', f'"{brand}";v="120", "Chromium";v="120", "Not_A Brand";v="8"'.encode()),
+                (b'Sec-CH-UA-Mobile', b'?0'),
+                (b'Sec-CH-UA-Platform', f'"{platform_name}"'.encode()),
+            ]
+
+        headers_by_type = {}
+        for resource_type, (accept, dest, mode) in FETCH_METADATA.items():
+            headers = list(common)
+            headers.append((b'Accept', accept))
+            if dest is not None:
+                headers.append((b'Sec-Fetch-Dest', dest))
+            if mode is not None:
+                headers.append((b'Sec-Fetch-Mode', mode))
+            if mode == b'navigate':
+                headers.append((b'Upgrade-Insecure-Requests', b'1'))
+            headers_by_type[resource_type] = tuple(
+                (name, value, name.lower() in ENGINE_HEADERS or name.startswith(b'Sec-'))
+                for name, value in headers
+            )
+        return HeaderProfile(headers_by_type, self.site_for_host)
+
+class HeaderProfile:
+    """Request headers for one rotation, keyed by QWebEngineUrlRequestInfo.ResourceType.
+
+    Each entry is (name, value, replace): replace is set for headers only the engine
+    writes (Sec-* names are forbidden to page script), the rest are only added when
+    the request does not carry them yet.
+    """
+
+    def __init__(self, headers_by_type, site_for_host):
+        self.headers_by_type = headers_by_type
+        self.site_for_host = site_for_host
+
+        # Registrable domain per host, least recently used first
+        self.site_cache = OrderedDict()
+        self.site_cache_size = 256
+
+    def apply(self, info):
+        headers = self.headers_by_type.get(info.resourceType())
+        if headers is None:
+            return
+        # httpHeaders() arrived in Qt 6.5; before that nothing can be checked
+        present = {bytes(name).lower() for name in info.httpHeaders()} if hasattr(info, 'httpHeaders') else ()
+        for name, value, replace in headers:
+            if replace or name.lower() not in present:
+                info.setHttpHeader(name, value)
+        info.setHttpHeader(b'Sec-Fetch-Site', self.fetch_site(info))
+
+    def fetch_site(self, info):
+        # Sec-Fetch-Site describes the initiator relative to the target; typed navigations have none
+        initiator = info.initiator()
+        if not initiator.host():
+            return b'none'
+        target = info.requestUrl()
+        scheme = target.scheme()
+        if initiator.scheme() != scheme:
+            return b'cross-site'  # Sites are schemeful: http and https never share one
+        if initiator.host() == target.host():
+            default_port = DEFAULT_PORTS.get(scheme, -1)
+            if initiator.port(default_port) == target.port(default_port):
+                return b'same-origin'
+            return b'same-site'
+        if self.site(initiator.host()) == self.site(target.host()):
+            return b'same-site'
+        return b'cross-site'
+
+    def site(self, host):
+        """site_for_host(host), cached so each request costs no Public Suffix List walks."""
+        site = self.site_cache.get(host)
+        if site is not None:
+            self.site_cache.move_to_end(host)
+            return site
+
+        site = self.site_for_host(host)
+        self.site_cache[host] = site
+        if len(self.site_cache) > self.site_cache_size:
+            self.site_cache.popitem(last=False)
+        return site
@@ -0,0 +1,158 @@
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_network.log'
+)
+logger = logging.getLogger('HstsStore')
+
+PRELOAD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hsts_preload.txt')
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one BLAKE2b digest."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % size
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        # Most lookups miss, usually on the first probed bit
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class HstsStore:
+    """Hosts that must only be reached over HTTPS.
+
+    Entries come from the shipped preload list and from Strict-Transport-Security
+    headers seen at runtime. Lookups walk the host's parent domains through the
+    Bloom filter first, so the common negative case never touches the exact sets.
+    Everything runs on the GUI thread: since Qt 6 the request interceptor calls
+    should_upgrade() there too, so the observed entries need no lock.
+    """
+
+    def __init__(self, preload_file=PRELOAD_FILE, observed_file='hsts_observed.json'):
+        self.observed_file = observed_file
+        exact, subdomains = self.load_preload_list(preload_file)
+        self.preload_exact = frozenset(exact)
+        self.preload_subdomains = frozenset(subdomains)
+        self.observed = self.load_observed()  # host -> {'expires': ..., 'include_subdomains': ...}
+
+        # Leave headroom for hosts learned at runtime
+        self.bloom = BloomFilter(2 * (len(exact) + len(subdomains) + len(self.observed)) + 1024)
+        for host in self.preload_exact | self.preload_subdomains | self.observed.keys():
+            self.bloom.add(host)
+        logger.info(f"HSTS store loaded {len(exact) + len(subdomains)} preloaded and {len(self.observed)} observed hosts")
+
+    @staticmethod
+    def load_preload_list(path):
+        exact, subdomains = set(), set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.split('#', 1)[0].split()
+                    if not fields:
+                        continue
+                    host = fields[0].lower().rstrip('.')
+                    if 'include_subdomains' in fields[1:]:
+                        subdomains.add(host)
+                    else:
+                        exact.add(host)
+        except OSError as e:
+            logger.warning(f"HSTS preload list unavailable: {e}")
+        return exact, subdomains
+
+    def load_observed(self):
+        if not os.path.exists(self.observed_file):
+            return {}
+        try:
+            with open(self.observed_file, 'r') as f:
+                observed = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable HSTS observations: {e}")
+            return {}
+        now = time.time()
+        return {host: entry for host, entry in observed.items() if entry.get('expires', 0) > now}
+
+    def save_observed(self):
+        try:
+            with open(self.observed_file, 'w') as f:
+                json.dump(self.observed, f)
+        except OSError as e:
+            logger.error(f"Error saving HSTS observations: {e}")
+
+    def should_upgrade(self, host):
+        host = host.lower().rstrip('.')
+        if not host or host.replace('.', '').isdigit() or ':' in host:
+            return False  # IP literals never carry HSTS
+        candidate = host
+        while True:
+            if candidate in self.bloom and self._confirm(candidate, candidate == host):
+                return True
+            dot = candidate.find('.')
+            if dot == -1:
+                return False
+            candidate = candidate[dot + 1:]
+
+    def _confirm(self, candidate, is_exact_host):
+        if candidate in self.preload_subdomains or (is_exact_host and candidate in self.preload_exact):
+            return True
+        entry = self.observed.get(candidate)
+        if entry is None:
+            return False
+        if entry['expires'] <= time.time():
+            del self.observed[candidate]
+            return False
+        return is_exact_host or entry['include_subdomains']
+
+    def observe(self, host, header):
+        """Record a Strict-Transport-Security header received over HTTPS from host."""
+        host = host.lower().rstrip('.')
+        max_age = None
+        include_subdomains = False
+        for directive in header.split(';'):
+            name, _, value = directive.strip().partition('=')
+            name = name.strip().lower()
+            if name == 'max-age':
+                try:
+                    max_age = int(value.strip().strip('"'))
+                except ValueError:
+                    return
+            elif name == 'includesubdomains':
+                include_subdomains = True
+        if max_age is None:
+            return
+
+        if max_age == 0:
+            # max-age=0 is the site asking to be forgotten
+            if self.observed.pop(host, None) is not None:
+                self.save_observed()
+            return
+
+        self.observed[host] = {'expires': time.time() + max_age, 'include_subdomains': include_subdomains}
+        self.bloom.add(host)
+        self.save_observed()
+        logger.info(f"Learned HSTS policy for {host} (includeSubDomains={include_subdomains})")
@@ -1,67 +1,435 @@
-import pyaudio
-import threading
+import os
+import json
+import math
+import time
 import atexit
-import numpy as np
-from PySide6.QtWebEngineCore import QWebEnginePage
-from collections import deque
+import threading
+from PySide6.QtCore import QObject, Signal
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('MicrophoneManager')
+
+# PortAudio callback results, the values of pyaudio.paContinue and pyaudio.paComplete
+PA_CONTINUE = 0
+PA_COMPLETE = 1
+
+class AudioRingBuffer:
+    """Preallocated ring of int16 samples, filled in place by the audio callback.
+
+    There is one writer, the PortAudio callback thread, and it never waits on a
+    lock. It claims the range it is about to overwrite before copying; readers
+    copy, then drop whatever fell inside a claimed range in the meantime.
+    """
+
+    def __init__(self, capacity):
+        import numpy as np
+        self.np = np
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.raw = memoryview(self.buffer).cast('B')  # Byte view for copying callback data in
+        self.written = 0  # Samples written since creation
+        self.claimed = 0  # Where written will be once the current write is done
+
+    def write(self, data):
+        """Append int16 samples, given as bytes or anything else supporting the buffer protocol."""
+        data = memoryview(data).cast('B')
+        count = len(data) // 2
+        skipped = max(0, count - self.capacity)
+        if skipped:
+            data, count = data[skipped * 2:], self.capacity
+        start = (self.written + skipped) % self.capacity
+        self.claimed = self.written + skipped + count
+        if start + count <= self.capacity:
+            self.raw[start * 2:(start + count) * 2] = data
+        else:
+            first = (self.capacity - start) * 2
+            self.raw[start * 2:] = data[:first]
+            self.raw[:len(data) - first] = data[first:]
+        self.written = self.claimed
+
+    def _views(self, end, count):
+        count = min(end, self.capacity if count is None else count, self.capacity)
+        start = (end - count) % self.capacity
+        if start + count <= self.capacity:
+            return (self.buffer[start:start + count],)
+        return self.buffer[start:], self.buffer[:start + count - self.capacity]
+
+    def views(self, count=None):
+        """The last count samples (all available by default) as one or two views, oldest first.
+
+        No copy is made, so the views are only valid until the writer comes round
+        again; use read() for data that has to outlive the next callback.
+        """
+        return self._views(self.written, count)
+
+    def read(self, count=None):
+        """A contiguous copy of the last count samples, oldest first."""
+        end = self.written
+        views = self._views(end, count)
+        samples = views[0].copy() if len(views) == 1 else self.np.concatenate(views)
+        # Anything within capacity of a claimed position may have been overwritten
+        overwritten = self.claimed - self.capacity - (end - len(samples))
+        if overwritten > 0:
+            samples = samples[overwritten:]
+        return samples
+
+class AudioLevelMeter(QObject):
+    """RMS, peak and energy-based voice activity for each block the audio callback delivers.
+
+    process() runs on the PortAudio thread and only does a cast into a reused
+    float32 scratch array, a dot product and a min/max. levels_changed is emitted
+    from there at most every interval seconds, with the peak held over the
+    interval, plus right away when voice activity starts or stops; Qt queues it
+    to the receivers in the UI thread.
+
+    Voice is present when the level is threshold_db above a noise floor that
+    follows quiet blocks quickly and loud ones slowly, and above min_db. It stays
+    on for hangover seconds after the last loud block so pauses between words do
+    not flicker.
+    """
+    levels_changed = Signal(float, float, bool)  # RMS dBFS, peak dBFS, voice
+
+    SILENCE_DB = -100.0
+
+    def __init__(self, rate=44100, interval=1 / 15, threshold_db=10.0, min_db=-50.0, hangover=0.3, parent=None):
+        super().__init__(parent)
+        self.np = None  # Imported with the first block, like the rest of the audio stack
+        self.rate = rate
+        self.interval = interval
+        self.threshold_db = threshold_db
+        self.min_db = min_db
+        self.hangover = hangover
+        self.scratch = ()
+        self.reset()
+
+    def reset(self):
+        self.rms_db = self.peak_db = self.SILENCE_DB
+        self.noise_floor_db = None  # Starts at the level of the first block
+        self.voice = False
+        self.voice_until = 0.0  # Audio time, in seconds, the hangover runs to
+        self.clock = 0.0  # Seconds of audio processed
+        self.held_peak_db = self.SILENCE_DB
+        self.last_publish = 0.0
+
+    def to_db(self, value):
+        return 20 * math.log10(value / 32768) if value > 0 else self.SILENCE_DB
+
+    def process(self, data):
+        """Analyse one block of int16 samples, given as bytes or an array."""
+        if self.np is None:
+            import numpy
+            self.np = numpy
+        np = self.np
+        samples = np.frombuffer(data, dtype=np.int16)
+        count = len(samples)
+        if not count:
+            return
+        if len(self.scratch) < count:
+            self.scratch = np.zeros(count, dtype=np.float32)
+        block = self.scratch[:count]
+        block[:] = samples
+        self.rms_db = self.to_db(math.sqrt(float(np.dot(block, block)) / count))
+        self.peak_db = self.to_db(max(float(block.max()), -float(block.min())))
+        step = count / self.rate
+        self.clock += step
+
+        # The floor drops to quiet blocks within a tenth of a second, rises over seconds
+        if self.noise_floor_db is None:
+            self.noise_floor_db = self.rms_db
+        elif self.rms_db < self.noise_floor_db:
+            self.noise_floor_db += (self.rms_db - self.noise_floor_db) * min(1.0, step * 20)
+        else:
+            self.noise_floor_db += (self.rms_db - self.noise_floor_db) * min(1.0, step * 0.2)
+        if self.rms_db > self.min_db and self.rms_db > self.noise_floor_db + self.threshold_db:
+            self.voice_until = self.clock + self.hangover
+        voice = self.clock < self.voice_until
+
+        self.held_peak_db = max(self.held_peak_db, self.peak_db)
+        now = time.monotonic()
+        if voice != self.voice or now - self.last_publish >= self.interval:
+            self.voice = voice
+            self.last_publish = now
+            self.levels_changed.emit(self.rms_db, self.held_peak_db, voice)
+            self.held_peak_db = self.SILENCE_DB
+
+class AudioHost:
+    """The process's one PyAudio instance, created on first use and terminated once at exit.
+
+    Initialising PortAudio scans every audio device and is by far the slowest
+    step of opening a stream, so it happens once per process rather than per
+    recording.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pa = None
+        self.devices = None
+
+    def get(self):
+        with self.lock:
+            if self.pa is None:
+                import pyaudio
+                self.pa = pyaudio.PyAudio()
+                atexit.register(self.terminate)
+            return self.pa
+
+    def input_devices(self):
+        """[{'index', 'name', 'channels', 'rate'}] of every input device.
+
+        PortAudio only rescans devices when it is initialised again, so the list
+        stays valid for the life of the host.
+        """
+        pa = self.get()
+        if self.devices is None:
+            devices = []
+            for index in range(pa.get_device_count()):
+                info = pa.get_device_info_by_index(index)
+                if info['maxInputChannels'] > 0:
+                    devices.append({'index': index, 'name': info['name'],
+                                    'channels': info['maxInputChannels'], 'rate': int(info['defaultSampleRate'])})
+            self.devices = devices
+        return self.devices
+
+    def open_input(self, rate, chunksize, callback, device=None):
+        """A mono 16-bit input stream, not yet started; device None is the system default."""
+        import pyaudio
+        return self.get().open(format=pyaudio.paInt16,
+                               channels=1,
+                               rate=rate,
+                               input=True,
+                               input_device_index=device,
+                               frames_per_buffer=chunksize,
+                               stream_callback=callback,
+                               start=False)
+
+    def warm_up(self):
+        """Initialise PortAudio and enumerate devices ahead of the first recording."""
+        try:
+            logger.info(f"Audio host ready, {len(self.input_devices())} input devices")
+        except Exception as e:
+            logger.warning(f"Audio host unavailable: {e}")
+
+    def terminate(self):
+        with self.lock:
+            if self.pa is not None:
+                self.pa.terminate()  # Also closes any stream still open
+                self.pa = None
+                self.devices = None
+
+_audio_host = None
+
+def get_audio_host():
+    """Shared audio host; PortAudio itself is only initialised when first needed."""
+    global _audio_host
+    if _audio_host is None:
+        _audio_host = AudioHost()
+    return _audio_host
 
 class MicrophoneRecorder(object):
-    def __init__(self, rate=44100, chunksize=1024, max_frames=100):
+    def __init__(self, rate=44100, chunksize=1024, max_frames=100, open_stream=None, device=None, meter=None):
+        """Capture mono 16-bit audio into a ring buffer holding max_frames chunks.
+
+        open_stream(callback) returns the stream to read from, not yet started; by
+        default an input stream is opened on the shared audio host. Anything with
+        start_stream(), stop_stream(), is_active() and close() that calls
+        callback(data, frame_count, time_info, status) with int16 bytes will do.
+        Every block is also handed to meter.process() when a meter is given.
+        """
         self.rate = rate
         self.chunksize = chunksize
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(format=pyaudio.paInt16,
-                                  channels=1,
-                                  rate=self.rate,
-                                  input=True,
-                                  frames_per_buffer=self.chunksize,
-                                  stream_callback=self.new_frame)
-        self.lock = threading.Lock()
+        self.device = device
+        self.meter = meter
+        # numpy is only needed once a page records, so keep it off the startup path
+        self.ring = AudioRingBuffer(max_frames * chunksize)
         self.stop = False
-        self.frames = deque(maxlen=max_frames)
-        atexit.register(self.close)
+        if open_stream is None:
+            open_stream = self.open_host_stream
+        self.stream = open_stream(self.new_frame)
+
+    def open_host_stream(self, callback):
+        return get_audio_host().open_input(self.rate, self.chunksize, callback, self.device)
 
     def new_frame(self, data, frame_count, time_info, status):
-        data = np.frombuffer(data, dtype=np.int16)
-        with self.lock:
-            self.frames.append(data)
-            if self.stop:
-                return None, pyaudio.paComplete
-        return None, pyaudio.paContinue
-    
-    def get_frames(self):
-        with self.lock:
-            return list(self.frames)
-    
+        self.ring.write(data)
+        if self.meter is not None:
+            self.meter.process(data)
+        if self.stop:
+            return None, PA_COMPLETE
+        return None, PA_CONTINUE
+
+    def samples_for(self, milliseconds):
+        if milliseconds is None:
+            return None
+        return self.rate * milliseconds // 1000
+
+    def get_samples(self, milliseconds=None):
+        """The last milliseconds of audio (everything buffered by default) as one array."""
+        return self.ring.read(self.samples_for(milliseconds))
+
+    def get_sample_views(self, milliseconds=None):
+        """Like get_samples() without copying; see AudioRingBuffer.views()."""
+        return self.ring.views(self.samples_for(milliseconds))
+
+    def is_active(self):
+        return not self.stop and self.stream.is_active()
+
     def start(self):
-        self.stream.start_stream()
+        """Start or resume capture; the stream stays open in between."""
+        if not self.stream.is_active():
+            self.stream.start_stream()
+
+    def pause(self):
+        if self.stream.is_active():
+            self.stream.stop_stream()
 
     def close(self):
-        with self.lock:
+        if not self.stop:
             self.stop = True
-        self.stream.close()
-        self.p.terminate()
+            self.stream.close()
 
-class MicrophoneManager:
-    def __init__(self):
+def origin_of(url):
+    """scheme://host[:port] of a QUrl, the unit permissions are granted to."""
+    port = url.port()
+    return f"{url.scheme()}://{url.host()}" + (f":{port}" if port != -1 else "")
+
+class MicrophoneManager(QObject):
+    """Owns the microphone stream for the pages that were granted audio capture.
+
+    Sites only get the microphone once the user allowed their origin, either in
+    the prompt or through a remembered decision. The stream is opened the first
+    time a page is granted access and paused when no granted page is left, because
+    it was closed, navigated to another origin or had its permission revoked, so
+    turning the microphone back on is a stream restart rather than a new
+    PortAudio session.
+    """
+    active_changed = Signal(bool)
+
+    def __init__(self, parent=None, decisions_file='microphone_permissions.json'):
+        super().__init__(parent)
         self.microphone = None
+        self.level_meter = AudioLevelMeter(parent=self)
+        self.decisions_file = decisions_file
+        self.decisions = self.load_decisions()  # origin -> allowed
+        self.capturing_pages = {}  # id(page) -> origin it was granted for
+        self.watched_pages = set()
+
+    def load_decisions(self):
+        if not os.path.exists(self.decisions_file):
+            return {}
+        try:
+            with open(self.decisions_file, 'r') as f:
+                return {origin: bool(allowed) for origin, allowed in json.load(f).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable microphone permissions: {e}")
+            return {}
+
+    def save_decisions(self):
+        try:
+            with open(self.decisions_file, 'w') as f:
+                json.dump(self.decisions, f)
+        except OSError as e:
+            logger.error(f"Error saving microphone permissions: {e}")
+
+    def warm_up(self):
+        """Initialise the audio host off the UI thread, so the first grant only opens a stream."""
+        threading.Thread(target=get_audio_host().warm_up, daemon=True).start()
+
+    def input_devices(self):
+        return get_audio_host().input_devices()
+
+    def is_active(self):
+        return self.microphone is not None and self.microphone.is_active()
 
     def start_microphone(self):
-        self.microphone = MicrophoneRecorder()
-        self.microphone.start()
+        try:
+            if self.microphone is None:
+                self.microphone = MicrophoneRecorder(meter=self.level_meter)
+            was_active = self.microphone.is_active()
+            self.microphone.start()
+        except Exception as e:
+            logger.error(f"Could not start microphone: {e}")
+            return False
+        if not was_active:
+            self.active_changed.emit(True)
+        return True
 
     def stop_microphone(self):
+        """Pause capture, keeping the stream open for the next start."""
+        if self.microphone and self.microphone.is_active():
+            self.microphone.pause()
+            self.level_meter.reset()
+            self.active_changed.emit(False)
+
+    def close_microphone(self):
         if self.microphone:
+            active = self.microphone.is_active()
             self.microphone.close()
             self.microphone = None
+            if active:
+                self.active_changed.emit(False)
 
-    def grant_microphone_permission(self, page, url, feature):
-        if feature == QWebEnginePage.Feature.MediaAudioCapture:
+    def grant_microphone_permission(self, page, url, feature, ask):
+        """Answer a feature permission request from page.
+
+        Audio capture is granted when the origin has a remembered decision allowing
+        it, or when ask(origin) returns (allowed, remember) with allowed true; every
+        other feature is denied.
+        """
+        from PySide6.QtWebEngineCore import QWebEnginePage
+        allowed = False
+        if self.handle_permission_request(url, feature):
+            origin = origin_of(url)
+            allowed = self.decisions.get(origin)
+            if allowed is None:
+                allowed, remember = ask(origin)
+                if remember:
+                    self.decisions[origin] = allowed
+                    self.save_decisions()
+        if allowed:
             page.setFeaturePermission(url, feature, QWebEnginePage.PermissionPolicy.PermissionGrantedByUser)
+            self.acquire(page, origin_of(url))
         else:
             page.setFeaturePermission(url, feature, QWebEnginePage.PermissionPolicy.PermissionDeniedByUser)
 
     def handle_permission_request(self, origin, feature):
+        from PySide6.QtWebEngineCore import QWebEnginePage
         if feature == QWebEnginePage.Feature.MediaAudioCapture:
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def revoke(self, origin):
+        """Forget the decision for origin and stop capturing for its pages."""
+        if self.decisions.pop(origin, None) is not None:
+            self.save_decisions()
+        for key, granted_origin in list(self.capturing_pages.items()):
+            if granted_origin == origin:
+                self.release(key)
+
+    def acquire(self, page, origin):
+        key = id(page)
+        self.capturing_pages[key] = origin
+        if key not in self.watched_pages:
+            self.watched_pages.add(key)
+            page.destroyed.connect(lambda obj=None, key=key: self.forget_page(key))
+            page.urlChanged.connect(lambda url, key=key: self.on_page_navigated(key, url))
+        self.start_microphone()
+
+    def on_page_navigated(self, key, url):
+        # Same-origin navigations keep the grant, like Chromium's own permission
+        if key in self.capturing_pages and origin_of(url) != self.capturing_pages[key]:
+            self.release(key)
+
+    def forget_page(self, key):
+        self.watched_pages.discard(key)
+        self.release(key)
+
+    def release(self, key):
+        self.capturing_pages.pop(key, None)
+        if not self.capturing_pages:
+            self.stop_microphone()
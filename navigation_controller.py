@@ -0,0 +1,304 @@
+import random
+from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtNetwork import QNetworkInformation
+from PySide6.QtWebEngineCore import QWebEngineLoadingInfo
+from page_templates import PageTemplates
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('NavigationController')
+
+# Navigation states
+IDLE = 'idle'
+PROBING = 'probing'
+LOADING = 'loading'
+COMMITTED = 'committed'  # The server answered and the page is being drawn
+LOADED = 'loaded'
+RETRYING = 'retrying'
+FAILED = 'failed'
+
+LoadStatus = QWebEngineLoadingInfo.LoadStatus
+ErrorDomain = QWebEngineLoadingInfo.ErrorDomain
+
+ERROR_CODES = {
+    ErrorDomain.CertificateErrorDomain: 'CERTIFICATE_ERROR',
+    ErrorDomain.DnsErrorDomain: 'NAME_NOT_RESOLVED',
+    ErrorDomain.ConnectionErrorDomain: 'CONNECTION_FAILED',
+    ErrorDomain.HttpErrorDomain: 'HTTP_ERROR',
+}
+
+# Chromium net errors that usually clear up on their own. Qt's error domain does
+# not follow the net error's kind (-7 and -21 come as internal errors, -324 as an
+# HTTP error), so only the code is checked; net errors are negative, HTTP statuses
+# are not.
+TRANSIENT_NET_ERRORS = {
+    7,    # TIMED_OUT
+    21,   # NETWORK_CHANGED
+    100,  # CONNECTION_CLOSED
+    101,  # CONNECTION_RESET
+    103,  # CONNECTION_ABORTED
+    106,  # INTERNET_DISCONNECTED
+    109,  # ADDRESS_UNREACHABLE
+    118,  # CONNECTION_TIMED_OUT
+    137,  # NAME_RESOLUTION_FAILED
+    324,  # EMPTY_RESPONSE
+}
+
+# Chromium reports this much progress as soon as a load starts; anything past it
+# comes from the renderer, which only gets the page once the navigation commits.
+INITIAL_LOAD_PROGRESS = 10
+
+_network_information_loaded = False
+
+def network_information():
+    """The shared QNetworkInformation instance, or None when no backend is available."""
+    global _network_information_loaded
+    if not _network_information_loaded:
+        _network_information_loaded = True
+        if not QNetworkInformation.loadBackendByFeatures(QNetworkInformation.Feature.Reachability):
+            logger.info("No network reachability backend; retries will not wait for connectivity")
+    return QNetworkInformation.instance()
+
+def is_offline():
+    info = network_information()
+    return info is not None and info.reachability() == QNetworkInformation.Reachability.Disconnected
+
+class NavigationController(QObject):
+    """Owns every navigation of one tab and decides when it has failed.
+
+    The controller follows the page's loadingChanged signal through its own
+    connection, so nothing needs to disconnect the view's signals. It shows the
+    error page exactly once per failure. A navigation is COMMITTED once the
+    page reports progress past Chromium's initial value, and LOADED when it
+    succeeds.
+
+    A watchdog stops loads that make no progress for stall_timeout or run longer
+    than load_timeout. Until the navigation commits, those and other transient
+    failures are retried with exponential backoff and jitter; a committed page
+    is only stopped, keeping whatever it already shows. While the network is down, retries wait for
+    connectivity instead of spending attempts.
+    """
+    state_changed = Signal(str)
+
+    def __init__(self, web_view, probe_timeout=10000, stall_timeout=20000, load_timeout=60000,
+                 max_retries=3, retry_base_delay=1000, retry_max_delay=30000):
+        super().__init__(web_view)
+        self.web_view = web_view
+        self.state = IDLE
+        self.target = None  # What the user asked for, shown on the error page
+        self.url = None
+        self.probe_timeout = probe_timeout
+        self.stall_timeout = stall_timeout
+        self.load_timeout = load_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retries = 0
+        self.waiting_for_network = False
+
+        self._generation = 0  # Invalidates probe callbacks from superseded navigations
+        self._probe = None  # (prober, domain) while a probed URL may still be stale
+        self._error_page = False  # The error page's own data: load is in flight
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self._on_timeout)
+        self.stall_timer = QTimer(self)
+        self.stall_timer.setSingleShot(True)
+        self.stall_timer.timeout.connect(self._on_stalled)
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self._retry)
+
+        web_view.page().loadingChanged.connect(self._on_loading_changed)
+        web_view.loadProgress.connect(self._on_load_progress)
+        info = network_information()
+        if info is not None:
+            info.reachabilityChanged.connect(self._on_reachability_changed)
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.state_changed.emit(state)
+
+    def load(self, url, target=None):
+        """Load url in this tab; target names the navigation on the error page."""
+        self._new_navigation()
+        self._start_loading(url, target)
+
+    def probe_and_load(self, domain, prober):
+        """Find the protocol domain answers on, then load it."""
+        self._new_navigation()
+        self._probe = (prober, domain)
+        self.target = domain
+        self._start_probe()
+
+    def fail(self, target=None, error_code='CONNECTION_FAILED'):
+        """Stop the current navigation and show the error page once."""
+        self._new_navigation()
+        target = target or self.target or self.web_view.url().toString()
+        logger.info(f"Navigation to {target} failed: {error_code}")
+        self._set_state(FAILED)
+        self._error_page = True
+        self.web_view.stop()
+        PageTemplates.show_error_page(self.web_view, target, error_code)
+
+    def _new_navigation(self):
+        self._generation += 1
+        self._probe = None
+        self.retries = 0
+        self.waiting_for_network = False
+        self._stop_timers()
+
+    def _stop_timers(self):
+        self.timeout_timer.stop()
+        self.stall_timer.stop()
+        self.retry_timer.stop()
+
+    def _start_probe(self):
+        prober, domain = self._probe
+        generation = self._generation
+        self._set_state(PROBING)
+        self.timeout_timer.start(self.probe_timeout)
+        prober.probe(domain, lambda url: self._on_probed(generation, url))
+
+    def _start_loading(self, url, target=None):
+        self.url = url
+        self.target = target or url.toString()
+        self._set_state(LOADING)
+        self._start_watchdog()
+        self.web_view.setUrl(url)
+
+    def _start_watchdog(self):
+        self.timeout_timer.start(self.load_timeout)
+        self.stall_timer.start(self.stall_timeout)
+
+    def _on_load_progress(self, progress):
+        if self.state not in (LOADING, COMMITTED):
+            return
+        self.stall_timer.start(self.stall_timeout)
+        if self.state == LOADING and progress > INITIAL_LOAD_PROGRESS:
+            self._set_state(COMMITTED)
+
+    def _on_probed(self, generation, url):
+        if generation != self._generation:
+            return
+        if url is None:
+            self.fail(self.target)
+            return
+        self._start_loading(url, self.target)
+
+    def _on_loading_changed(self, info):
+        status = info.status()
+        if self._error_page:
+            if info.url().scheme() == 'data':
+                # The error page itself
+                if status != LoadStatus.LoadStartedStatus:
+                    self._error_page = False
+                return
+            if status != LoadStatus.LoadStartedStatus:
+                return  # The aborted load reporting in late
+            self._error_page = False
+
+        if status == LoadStatus.LoadStartedStatus:
+            if self.state != LOADING:
+                # Link clicks, history navigation and page-initiated loads, also
+                # ones that replace a committed page still loading
+                self._new_navigation()
+                self.url = info.url()
+                self.target = self.url.toString()
+                self._set_state(LOADING)
+                self._start_watchdog()
+            return
+
+        if self.state not in (LOADING, COMMITTED):
+            return
+        if status == LoadStatus.LoadStoppedStatus:
+            # Stopped by the user or superseded; a replacing load keeps us in LOADING
+            if not self.web_view.page().isLoading():
+                self._stop_timers()
+                self._set_state(IDLE)
+        elif status == LoadStatus.LoadSucceededStatus or info.errorDomain() == ErrorDomain.HttpStatusCodeDomain:
+            # An HTTP error status still delivers the server's own page
+            self._stop_timers()
+            self.retries = 0
+            self._set_state(LOADED)
+        else:
+            self._stop_timers()
+            self._on_load_failed(info)
+
+    def _on_load_failed(self, info):
+        logger.info(f"Load of {info.url().toString()} failed: {info.errorString()} ({info.errorCode()})")
+        transient = -info.errorCode() in TRANSIENT_NET_ERRORS
+        if transient and self._schedule_retry():
+            return
+        if self._probe and info.errorDomain() != ErrorDomain.CertificateErrorDomain:
+            # The cached protocol may be stale; probe again once before giving up
+            prober, domain = self._probe
+            prober.invalidate(domain)
+            self._start_probe()
+            self._probe = None
+            return
+        self.fail(self.target, ERROR_CODES.get(info.errorDomain(), 'CONNECTION_FAILED'))
+
+    def _on_timeout(self):
+        if self.state == PROBING:
+            self.fail(self.target, 'TIMED_OUT')
+        elif self.state in (LOADING, COMMITTED):
+            self._abort_runaway_load('total load time exceeded')
+
+    def _on_stalled(self):
+        if self.state in (LOADING, COMMITTED):
+            self._abort_runaway_load('no progress')
+
+    def _abort_runaway_load(self, reason):
+        logger.info(f"Stopping load of {self.target}: {reason}")
+        self._stop_timers()
+        if self.state == COMMITTED:
+            # The server answered; a slow subresource is no reason to replace the page
+            self._set_state(IDLE)
+            self.web_view.stop()
+            return
+        # Leave LOADING first so the stop this causes is not treated as a user stop
+        self._set_state(RETRYING)
+        self.web_view.stop()
+        if not self._schedule_retry():
+            self.fail(self.target, 'TIMED_OUT')
+
+    def _schedule_retry(self):
+        """Plan another attempt at self.url; False once the attempts are used up."""
+        if self.url is None:
+            return False
+        if is_offline():
+            # Offline attempts are free; the reachability signal resumes us
+            logger.info(f"Network unreachable, holding retry of {self.target}")
+            self._set_state(RETRYING)
+            self.waiting_for_network = True
+            return True
+        if self.retries >= self.max_retries:
+            return False
+        self._set_state(RETRYING)
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** self.retries)
+        delay = int(delay * random.uniform(0.5, 1.0))  # Jitter keeps tabs from retrying in lockstep
+        self.retries += 1
+        logger.info(f"Retrying {self.target} in {delay} ms (attempt {self.retries} of {self.max_retries})")
+        self.retry_timer.start(delay)
+        return True
+
+    def _retry(self):
+        if self.state != RETRYING:
+            return
+        self.waiting_for_network = False
+        self._set_state(LOADING)
+        self._start_watchdog()
+        self.web_view.setUrl(self.url)
+
+    def _on_reachability_changed(self, reachability):
+        if self.waiting_for_network and reachability != QNetworkInformation.Reachability.Disconnected:
+            logger.info(f"Connectivity restored, retrying {self.target}")
+            self._retry()
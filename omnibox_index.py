@@ -0,0 +1,214 @@
+import re
+import time
+import heapq
+from bisect import bisect_left
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('OmniboxIndex')
+
+DAY = 24 * 3600
+
+# (maximum age, weight) buckets for the most recent visit, like Firefox frecency
+RECENCY_WEIGHTS = ((4 * DAY, 100), (14 * DAY, 70), (31 * DAY, 50), (90 * DAY, 30))
+OLD_VISIT_WEIGHT = 10
+BOOKMARK_BONUS = 150
+OPEN_TAB_BONUS = 50
+
+MAX_TITLE_WORDS = 8
+TOP_SET_SIZE = 2000
+SCAN_LIMIT = 20000
+
+_WORD_SPLIT = re.compile(r'[^\w]+')
+_URL_PREFIX = re.compile(r'^(?:https?://|file://)?(?:www\.)?', re.IGNORECASE)
+
+def url_key(url):
+    """Lowercased URL without scheme and www., the form users start typing."""
+    return _URL_PREFIX.sub('', url, count=1).lower()
+
+class OmniboxEntry:
+    __slots__ = ('url', 'title', 'visit_count', 'last_visit', 'bookmarked', 'open_tabs', 'score', 'keys')
+
+    def __init__(self, url):
+        self.url = url
+        self.title = ''
+        self.visit_count = 0
+        self.last_visit = 0
+        self.bookmarked = False
+        self.open_tabs = 0
+        self.score = 0
+        self.keys = ()
+
+class OmniboxIndex:
+    """In-memory prefix index over bookmarks, history and open tabs, ranked by frecency.
+
+    Keys (the URL without scheme, plus title words) live in a sorted array searched
+    with bisect. A second array holds only the highest-scoring entries; any prefix
+    with enough matches there is answered from it exactly, since every entry left
+    out scores below its threshold. Narrow prefixes scan their range directly.
+    """
+
+    def __init__(self, top_set_size=TOP_SET_SIZE):
+        self.entries = {}
+        self.keys, self.key_urls = [], []
+        self.top_keys, self.top_key_urls = [], []
+        self.top_set_size = top_set_size
+        self.top_threshold = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def score(self, entry, now=None):
+        now = now or time.time()
+        score = 0
+        if entry.visit_count:
+            age = now - entry.last_visit
+            weight = next((w for max_age, w in RECENCY_WEIGHTS if age < max_age), OLD_VISIT_WEIGHT)
+            score += weight * entry.visit_count
+        if entry.bookmarked:
+            score += BOOKMARK_BONUS
+        if entry.open_tabs:
+            score += OPEN_TAB_BONUS
+        return score
+
+    def entry_keys(self, entry):
+        keys = {url_key(entry.url)}
+        words = [word for word in _WORD_SPLIT.split(entry.title.lower()) if len(word) > 1]
+        keys.update(words[:MAX_TITLE_WORDS])
+        keys.discard('')
+        return tuple(keys)
+
+    def rebuild(self, entries=None):
+        """Rebuild both key arrays in one sort, for initial loads and bulk imports."""
+        start = time.perf_counter()
+        if entries is not None:
+            self.entries = {entry.url: entry for entry in entries}
+        now = time.time()
+        for entry in self.entries.values():
+            entry.score = self.score(entry, now)
+            entry.keys = self.entry_keys(entry)
+        self.keys, self.key_urls = self._sorted_keys(self.entries.values())
+
+        best = heapq.nlargest(self.top_set_size, self.entries.values(), key=lambda e: e.score)
+        self.top_threshold = best[-1].score if len(best) == self.top_set_size else 0
+        self.top_keys, self.top_key_urls = self._sorted_keys(best)
+        logger.info(f"Indexed {len(self.entries)} entries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    @staticmethod
+    def _sorted_keys(entries):
+        keys, key_urls = [], []
+        for entry in entries:
+            keys.extend(entry.keys)
+            key_urls.extend([entry.url] * len(entry.keys))
+        # Sorting plain strings by index is much cheaper than sorting (key, url) tuples
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return [keys[i] for i in order], [key_urls[i] for i in order]
+
+    def _insert_keys(self, keys, key_urls, entry):
+        for key in entry.keys:
+            index = bisect_left(keys, key)
+            keys.insert(index, key)
+            key_urls.insert(index, entry.url)
+
+    def _remove_keys(self, keys, key_urls, entry):
+        for key in entry.keys:
+            index = bisect_left(keys, key)
+            while index < len(keys) and keys[index] == key:
+                if key_urls[index] == entry.url:
+                    del keys[index]
+                    del key_urls[index]
+                    break
+                index += 1
+
+    def _update(self, url, change):
+        """Apply change(entry) to one entry and patch only its keys in the arrays."""
+        entry = self.entries.get(url)
+        if entry is None:
+            entry = self.entries[url] = OmniboxEntry(url)
+        in_top = bool(entry.keys) and self._in_top(entry)
+        if entry.keys:
+            self._remove_keys(self.keys, self.key_urls, entry)
+            if in_top:
+                self._remove_keys(self.top_keys, self.top_key_urls, entry)
+
+        change(entry)
+        if not (entry.visit_count or entry.bookmarked or entry.open_tabs):
+            del self.entries[url]
+            return
+
+        entry.score = self.score(entry)
+        entry.keys = self.entry_keys(entry)
+        self._insert_keys(self.keys, self.key_urls, entry)
+        # Entries leave the top set only on rebuild, so everything outside stays below the threshold
+        if in_top or entry.score >= self.top_threshold:
+            self._insert_keys(self.top_keys, self.top_key_urls, entry)
+
+    def _in_top(self, entry):
+        key = entry.keys[0]
+        index = bisect_left(self.top_keys, key)
+        while index < len(self.top_keys) and self.top_keys[index] == key:
+            if self.top_key_urls[index] == entry.url:
+                return True
+            index += 1
+        return False
+
+    def add_history(self, url, title='', visit_count=1, last_visit=None):
+        def change(entry):
+            entry.visit_count += visit_count
+            entry.last_visit = max(entry.last_visit, last_visit or time.time())
+            if title:
+                entry.title = title
+        self._update(url, change)
+
+    def set_title(self, url, title):
+        if url in self.entries and title and self.entries[url].title != title:
+            self._update(url, lambda entry: setattr(entry, 'title', title))
+
+    def set_bookmarked(self, url, bookmarked, title=''):
+        def change(entry):
+            entry.bookmarked = bookmarked
+            if title:
+                entry.title = title
+        self._update(url, change)
+
+    def add_open_tab(self, url, title=''):
+        def change(entry):
+            entry.open_tabs += 1
+            if title:
+                entry.title = title
+        self._update(url, change)
+
+    def remove_open_tab(self, url):
+        if url in self.entries:
+            self._update(url, lambda entry: setattr(entry, 'open_tabs', max(0, entry.open_tabs - 1)))
+
+    def _matches(self, keys, key_urls, prefix, limit):
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + '\uffff', lo)
+        seen = set()
+        for index in range(lo, min(hi, lo + limit)):
+            seen.add(key_urls[index])
+        return seen, hi - lo > limit
+
+    def query(self, text, limit=8):
+        """Best entries whose URL or a title word starts with text, highest frecency first."""
+        prefix = url_key(text.strip())
+        if not prefix:
+            return []
+        entries = self.entries
+        by_score = lambda url: (entries[url].score, entries[url].last_visit)
+
+        urls, _ = self._matches(self.top_keys, self.top_key_urls, prefix, SCAN_LIMIT)
+        best = heapq.nlargest(limit, urls, key=by_score)
+        if len(best) == limit and entries[best[-1]].score >= self.top_threshold:
+            return [entries[url] for url in best]
+
+        urls, truncated = self._matches(self.keys, self.key_urls, prefix, SCAN_LIMIT)
+        if truncated:
+            logger.debug(f"Omnibox scan for {prefix!r} truncated at {SCAN_LIMIT} keys")
+        return [entries[url] for url in heapq.nlargest(limit, urls, key=by_score)]
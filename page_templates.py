@@ -1,3 +1,5 @@
+import html
+from urllib.parse import quote_plus
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
 class PageTemplates:
@@ -173,8 +175,98 @@ class PageTemplates:
         """
 
     @staticmethod
-    def show_error_page(web_view: QWebEngineView, domain: str):
+    def get_fingerprint_benchmark_page():
+        """Return a page that measures canvas/WebGL call throughput under the fingerprint shims."""
+        return """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Fingerprint Benchmark</title>
+            <style>
+                body {
+                    font-family: 'Segoe UI', Arial, sans-serif;
+                    background-color: #240970;
+                    color: white;
+                    margin: 0;
+                    padding: 40px;
+                }
+                h1 {
+                    color: #a8a8ff;
+                }
+                table {
+                    border-collapse: collapse;
+                    background-color: rgba(26, 7, 72, 0.8);
+                    border-radius: 10px;
+                }
+                th, td {
+                    padding: 10px 20px;
+                    text-align: left;
+                    border-bottom: 1px solid #3d1db8;
+                }
+            </style>
+        </head>
+        <body>
+            <h1>Fingerprint Protection Benchmark</h1>
+            <p id="mode"></p>
+            <table>
+                <tr><th>Operation</th><th>Calls</th><th>Best ops/sec</th></tr>
+                <tbody id="results"></tbody>
+            </table>
+            <script>
+                const isProtected = !CanvasRenderingContext2D.prototype.fillRect
+                    .toString().includes('[native code]');
+                const mode = isProtected ? 'protected' : 'unprotected';
+                document.title = 'Fingerprint Benchmark (' + mode + ')';
+                document.getElementById('mode').textContent = 'Fingerprint protection: ' + mode;
+
+                function measure(name, calls, run) {
+                    let best = 0;
+                    for (let round = 0; round < 5; round++) {
+                        const start = performance.now();
+                        run(calls);
+                        const seconds = (performance.now() - start) / 1000;
+                        best = Math.max(best, calls / Math.max(seconds, 0.000001));
+                    }
+                    const row = document.createElement('tr');
+                    row.innerHTML = '<td>' + name + '</td><td>' + calls + '</td><td>' +
+                        Math.round(best).toLocaleString() + '</td>';
+                    document.getElementById('results').appendChild(row);
+                }
+
+                setTimeout(function() {
+                    const canvas = document.createElement('canvas');
+                    canvas.width = 256;
+                    canvas.height = 256;
+                    const context = canvas.getContext('2d');
+                    measure('fillRect', 200000, function(calls) {
+                        for (let i = 0; i < calls; i++) {
+                            context.fillRect(i & 127, i & 63, 16, 16);
+                        }
+                    });
+
+                    const gl = document.createElement('canvas').getContext('webgl');
+                    if (gl) {
+                        measure('getParameter', 200000, function(calls) {
+                            for (let i = 0; i < calls; i++) {
+                                gl.getParameter(i & 1 ? gl.VENDOR : gl.MAX_TEXTURE_SIZE);
+                            }
+                        });
+                    } else {
+                        const row = document.createElement('tr');
+                        row.innerHTML = '<td>getParameter</td><td colspan="2">WebGL is disabled</td>';
+                        document.getElementById('results').appendChild(row);
+                    }
+                }, 100);
+            </script>
+        </body>
+        </html>
+        """
+
+    @staticmethod
+    def show_error_page(web_view: QWebEngineView, domain: str, error_code: str = 'CONNECTION_FAILED'):
         """Display a custom error page when a connection fails."""
+        search_query = quote_plus(domain)
+        domain = html.escape(domain)
         error_html = f"""
         <!DOCTYPE html>
         <html>
@@ -248,11 +340,11 @@ class PageTemplates:
                     <li>No longer existing</li>
                 </ul>
                 <p>Would you like to search for this instead?</p>
-                <a href="https://www.google.com/search?q={domain}" class="search-button">
+                <a href="https://www.google.com/search?q={search_query}" class="search-button">
                     Search on Google
                 </a>
                 <div class="error-details">
-                    Error Code: CONNECTION_FAILED<br>
+                    Error Code: {error_code}<br>
                     Browser: KEPLER COMMUNITY
                 </div>
             </div>
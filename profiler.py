@@ -0,0 +1,153 @@
+import io
+import time
+import atexit
+import cProfile
+import pstats
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('Profiler')
+
+# Wall-clock spans and per-slot cProfile for --profile runs.
+#
+# Everything here is a no-op until enable() is called: span helpers return after
+# one flag check and profile_methods() leaves classes untouched, so the normal
+# startup path pays nothing for the instrumentation.
+
+enabled = False
+output_prefix = 'kepler_profile'
+top_functions = 40
+
+_origin = time.perf_counter()
+_spans = {}       # name -> [start, end], in the order they started
+_slot_stats = {}  # "Class.method" -> [calls, total seconds, max seconds]
+_profile = None   # Created by the first profiled call
+_depth = 0        # Profiled calls on the stack; only the outermost toggles the profile
+_gui_thread = threading.get_ident()
+_reported = False
+_NO_SPAN = nullcontext()
+
+def enable(prefix='kepler_profile'):
+    """Turn profiling on; the report is written to prefix.pstats and prefix.txt at exit."""
+    global enabled, output_prefix
+    if enabled:
+        return
+    enabled = True
+    output_prefix = prefix
+    atexit.register(write_report)
+
+def start_span(name):
+    if enabled:
+        _spans.setdefault(name, [time.perf_counter(), None])
+
+def end_span(name):
+    if enabled:
+        span = _spans.get(name)
+        if span is not None and span[1] is None:
+            span[1] = time.perf_counter()
+
+def span(name):
+    """Time the with-block as span name."""
+    if not enabled:
+        return _NO_SPAN
+    return _timed_span(name)
+
+@contextmanager
+def _timed_span(name):
+    start_span(name)
+    try:
+        yield
+    finally:
+        end_span(name)
+
+def profile_methods(cls, *names):
+    """Run the named methods of cls under cProfile and count their wall time.
+
+    Methods are replaced on the class, so this has to happen before instances
+    connect them to signals. Only calls on the GUI thread are measured; every
+    profiled slot runs there, including QWebEngineUrlRequestInterceptor's
+    interceptRequest since Qt 6.
+    """
+    if not enabled:
+        return
+    for name in names:
+        label = f"{cls.__name__}.{name}"
+        setattr(cls, name, _profiled(getattr(cls, name), _slot_stats.setdefault(label, [0, 0.0, 0.0])))
+
+def _profiled(function, stats):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global _profile, _depth
+        if threading.get_ident() != _gui_thread:
+            # The stats are not locked and cProfile only sees the thread that enabled it
+            return function(*args, **kwargs)
+        if _profile is None:
+            _profile = cProfile.Profile()
+        outermost = _depth == 0
+        _depth += 1
+        if outermost:
+            try:
+                _profile.enable()
+            except ValueError:
+                # Another profiler owns this interpreter; keep the wall times only
+                outermost = False
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if outermost:
+                _profile.disable()
+            _depth -= 1
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+    return wrapper
+
+def summary(stats=None):
+    lines = ["Startup spans (ms since launch):"]
+    for name, (start, end) in sorted(_spans.items(), key=lambda item: item[1][0]):
+        duration = f"{(end - start) * 1000:10.1f}" if end is not None else "  unfinished"
+        lines.append(f"  {(start - _origin) * 1000:10.1f} {duration}  {name}")
+
+    if _slot_stats:
+        lines += ["", "Profiled slots:", f"  {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  slot"]
+        for label, (calls, total, longest) in sorted(_slot_stats.items(), key=lambda item: -item[1][1]):
+            mean = total / calls if calls else 0
+            lines.append(f"  {calls:8d} {total * 1000:10.1f} {mean * 1000:9.3f} {longest * 1000:9.3f}  {label}")
+
+    if stats is not None and stats.total_calls:
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_functions)
+        lines += ["", f"Top {top_functions} functions inside profiled slots:", stream.getvalue().rstrip()]
+    return "\n".join(lines)
+
+def write_report():
+    """Write the pstats dump and the readable summary; only the first call writes."""
+    global _reported
+    if not enabled or _reported:
+        return
+    _reported = True
+    # A profile that never ran (another profiler owned the interpreter) has no
+    # data, and pstats refuses such a profile outright
+    stats = pstats.Stats(_profile) if _profile is not None and _profile.getstats() else None
+
+    try:
+        if stats is not None:
+            stats.dump_stats(f"{output_prefix}.pstats")
+        text = summary(stats)
+        with open(f"{output_prefix}.txt", 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    except OSError as e:
+        logger.error(f"Could not write profile report: {e}")
+        return
+    logger.info(f"Profile written to {output_prefix}.txt\n{text}")
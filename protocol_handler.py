@@ -1,23 +1,28 @@
+from urllib.parse import quote_plus
 from PySide6.QtCore import QUrl
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import QWebEnginePage
 from error_handling import ErrorHandler
+from url_classifier import HOST, SEARCH
 
 class ProtocolHandler:
     @staticmethod
     def handle_url(browser, url_text: str):
         """Handle URL navigation with proper protocol selection."""
         url_text = url_text.strip()
+
+        # Built-in pages
+        if url_text == 'kepler://fingerprint-benchmark':
+            browser.open_fingerprint_benchmark()
+            return True
         
-        # Handle URLs without protocol
-        if not url_text.startswith(('http://', 'https://', 'file://')):
-            # Check if it's a valid domain
-            if '.' in url_text and not url_text.startswith('javascript:'):
-                ErrorHandler.try_protocols(browser, url_text)
-                return True
-            else:
-                # If no dot, treat as a search query
-                url_text = f'https://www.google.com/search?q={url_text}'
+        # Decide between loading a host and searching without touching the network
+        kind, url_text = browser.url_classifier.classify(url_text)
+        if kind == HOST:
+            ErrorHandler.try_protocols(browser, url_text)
+            return True
+        if kind == SEARCH:
+            url_text = f'https://www.google.com/search?q={quote_plus(url_text)}'
         
         # Create QUrl object
         q = QUrl(url_text)
@@ -29,25 +34,12 @@ class ProtocolHandler:
         # Validate the URL
         if not q.isValid():
             # If invalid, try as a search query
-            search_url = f'https://www.google.com/search?q={url_text}'
+            search_url = f'https://www.google.com/search?q={quote_plus(url_text)}'
             q = QUrl(search_url)
         
         current_widget = browser.tab_widget.currentWidget()
         if current_widget:
-            def handle_navigation_result(ok):
-                if not ok:
-                    ErrorHandler.show_error_page(current_widget, url_text)
-                try:
-                    current_widget.loadFinished.disconnect(handle_navigation_result)
-                except:
-                    pass
-
-            try:
-                current_widget.loadFinished.disconnect()
-            except:
-                pass
-            current_widget.loadFinished.connect(handle_navigation_result)
-            current_widget.setUrl(q)
+            current_widget.navigation.load(q, url_text)
             return True
         else:
             print("No current tab to navigate")
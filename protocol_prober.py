@@ -0,0 +1,143 @@
+import os
+import json
+import time
+from PySide6.QtCore import QObject, Signal, QUrl, QTimer
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from segmented_downloader import http_status
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('ProtocolProber')
+
+PROBE_SCHEMES = ('https', 'http')
+
+class ProtocolProber(QObject):
+    """Finds out which scheme a bare domain answers on by racing HEAD requests.
+
+    HTTPS and HTTP are probed at the same time. HTTPS wins whenever it answers;
+    if HTTP answers first, HTTPS gets a short grace period before HTTP is used.
+    Working schemes are cached per host with a TTL so repeat visits skip the probe;
+    failures are not cached, since they are often the network rather than the
+    host and should not outlive it. Hosts with an HSTS policy go straight to HTTPS
+    without a probe.
+    """
+    hsts_header = Signal(str, str)  # host, Strict-Transport-Security value
+
+    def __init__(self, cache_file='protocol_cache.json', ttl=7 * 24 * 3600, timeout=5000,
+                 https_grace=300, ports=None, hsts_store=None, parent=None):
+        super().__init__(parent)
+        self.cache_file = cache_file
+        self.hsts_store = hsts_store
+        self.ttl = ttl
+        self.timeout = timeout
+        self.https_grace = https_grace
+        self.ports = ports or {}  # scheme -> port, lets local stand-in servers replace 443/80
+        self.network_manager = QNetworkAccessManager(self)
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable protocol cache: {e}")
+            return {}
+        now = time.time()
+        return {host: entry for host, entry in cache.items() if entry.get('scheme') and entry.get('expires', 0) > now}
+
+    def save_cache(self):
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.cache, f)
+        except OSError as e:
+            logger.error(f"Error saving protocol cache: {e}")
+
+    def build_url(self, scheme, domain):
+        url = QUrl(f'{scheme}://{domain}')
+        if scheme in self.ports:
+            url.setPort(self.ports[scheme])
+        return url
+
+    def cache_key(self, domain):
+        url = QUrl(f'http://{domain}')
+        return url.host() + (f':{url.port()}' if url.port() != -1 else '')
+
+    def cached_scheme(self, domain):
+        """Return the cached scheme, or None when the host needs probing."""
+        entry = self.cache.get(self.cache_key(domain))
+        if entry is None:
+            return None
+        if entry['expires'] <= time.time():
+            del self.cache[self.cache_key(domain)]
+            return None
+        return entry['scheme']
+
+    def invalidate(self, domain):
+        if self.cache.pop(self.cache_key(domain), None) is not None:
+            self.save_cache()
+
+    def probe(self, domain, callback):
+        """Call callback with the URL to navigate to, or None when neither scheme answers."""
+        if self.hsts_store and self.hsts_store.should_upgrade(QUrl(f'http://{domain}').host()):
+            # Probing plain HTTP here would be the very request HSTS forbids
+            QTimer.singleShot(0, lambda: callback(self.build_url('https', domain)))
+            return
+
+        scheme = self.cached_scheme(domain)
+        if scheme is not None:
+            QTimer.singleShot(0, lambda: callback(self.build_url(scheme, domain)))
+            return
+
+        logger.info(f"Probing protocols for {domain}")
+        results = {}
+        replies = {}
+        grace_timer = QTimer(self)
+        grace_timer.setSingleShot(True)
+        done = [False]
+
+        def finish(scheme):
+            if done[0]:
+                return
+            done[0] = True
+            grace_timer.stop()
+            grace_timer.deleteLater()
+            for reply in list(replies.values()):
+                reply.abort()
+            if scheme:
+                self.cache[self.cache_key(domain)] = {'scheme': scheme, 'expires': time.time() + self.ttl}
+                self.save_cache()
+            logger.info(f"Protocol probe for {domain}: {scheme or 'unreachable'}")
+            callback(self.build_url(scheme, domain) if scheme else None)
+
+        def on_finished(scheme, reply):
+            replies.pop(scheme, None)
+            reply.deleteLater()
+            if done[0]:
+                return
+            # Any HTTP response, even an error status, proves the server speaks this scheme.
+            # The status is only read once the error code shows a response arrived.
+            results[scheme] = http_status(reply) is not None
+            if scheme == 'https' and results[scheme] and reply.hasRawHeader('Strict-Transport-Security'):
+                self.hsts_header.emit(reply.url().host(), bytes(reply.rawHeader('Strict-Transport-Security').data()).decode('latin-1'))
+            if results.get('https'):
+                finish('https')
+            elif len(results) == len(PROBE_SCHEMES):
+                finish('http' if results['http'] else '')
+            elif results.get('http'):
+                grace_timer.start(self.https_grace)
+
+        grace_timer.timeout.connect(lambda: finish('http'))
+        for scheme in PROBE_SCHEMES:
+            request = QNetworkRequest(self.build_url(scheme, domain))
+            request.setAttribute(QNetworkRequest.RedirectPolicyAttribute, QNetworkRequest.ManualRedirectPolicy)
+            request.setTransferTimeout(self.timeout)
+            reply = self.network_manager.head(request)
+            replies[scheme] = reply
+            reply.finished.connect(lambda scheme=scheme, reply=reply: on_finished(scheme, reply))
@@ -1,12 +1,7 @@
-import psutil
 import os
 import time
 import threading
 from PySide6.QtCore import QObject, Signal, QTimer
-import win32job
-import win32process
-import win32api
-import win32con
 import logging
 
 # Set up logging
@@ -24,19 +19,55 @@ JOB_OBJECT_LIMIT_WORKINGSET = 0x00000001
 JOB_OBJECT_LIMIT_PROCESS_TIME = 0x00000002
 JOB_OBJECT_CPU_RATE_CONTROL = 0x00000004
 
+# pywin32 modules, imported by load_win32() the first time a job object is needed
+win32job = win32process = win32api = win32con = None
+
+def load_win32():
+    """Import the pywin32 job object modules once; False where they are unavailable."""
+    global win32job, win32process, win32api, win32con
+    if win32job is None:
+        try:
+            import win32job, win32process, win32api, win32con
+        except ImportError as e:
+            logger.info(f"Job objects unavailable: {e}")
+            return False
+    return True
+
 class ResourceManager(QObject):
+    """Process limits and usage sampling.
+
+    Construction is cheap so the window can paint first. start_job() puts the process
+    in a job object and must run before any web engine process is spawned, since
+    children only join a job their parent already belongs to; start() imports psutil
+    and starts the sampling timers, and can wait until after the first paint.
+    """
     resource_update = Signal(dict)
     
     def __init__(self):
         super().__init__()
-        self.process = psutil.Process(os.getpid())
+        self.process = None
+        self.job = None
         self.network_limit = None
         self.cpu_limit = None
         self.memory_limit = None
         
+        self.last_net_io = None
+        self.last_time = time.time()
+
+    def start_job(self):
+        if self.job is None and load_win32():
+            self.create_job()
+
+    def start(self):
+        if self.process is not None:
+            return
+        import psutil
+        self.process = psutil.Process(os.getpid())
         self.last_net_io = psutil.net_io_counters()
         self.last_time = time.time()
-        
+        self.setup_timers()
+
+    def create_job(self):
         try:
             # Create a new job object
             security_attributes = None
@@ -71,9 +102,6 @@ class ResourceManager(QObject):
             logger.error(f"Failed to create job object: {e}")
             self.job = None
 
-        # Initialize timers after moving to the main thread
-        QTimer.singleShot(0, self.setup_timers)
-
     def setup_timers(self):
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self.update_resource_usage)
@@ -130,6 +158,7 @@ class ResourceManager(QObject):
             logger.error(f"Failed to set CPU limit: {e}")
 
     def set_memory_limit(self, limit_mb):
+        import psutil
         try:
             self.memory_limit = limit_mb
             if self.job and limit_mb is not None:
@@ -176,6 +205,7 @@ class ResourceManager(QObject):
         logger.info(f"Network limit set to {limit_kbps} kbps")
 
     def enforce_limits(self):
+        import psutil
         try:
             if self.memory_limit:
                 current_memory = self.process.memory_info().rss / (1024 * 1024)
@@ -201,6 +231,7 @@ class ResourceManager(QObject):
             logger.error(f"Error enforcing limits: {e}")
 
     def update_resource_usage(self):
+        import psutil
         try:
             current_time = time.time()
             current_net_io = psutil.net_io_counters()
@@ -0,0 +1,400 @@
+import os
+import json
+import time
+from PySide6.QtCore import QObject, Signal, QTimer, QUrl
+from PySide6.QtNetwork import QNetworkRequest, QNetworkReply
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_download.log'
+)
+logger = logging.getLogger('SegmentedDownloader')
+
+MIN_SEGMENT_SIZE = 1024 * 1024
+STATE_SUFFIX = '.kepler-part'
+# Per-reply cap on what Qt buffers ahead of us; a throttled reply stops reading its socket once full
+READ_BUFFER_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.1  # seconds between progress signals
+
+def http_status(reply):
+    """The reply's HTTP status code, or None if it failed before any response arrived."""
+    error = reply.error()
+    # Qt reports HTTP error statuses as its 2xx (content) and 4xx (server) error codes, and a 400
+    # as ProtocolInvalidOperationError; every other error means no response arrived
+    if error != QNetworkReply.NoError and error.value // 100 not in (2, 4) \
+            and error != QNetworkReply.ProtocolInvalidOperationError:
+        return None
+    return reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+
+def unique_path(path):
+    """path, or 'name (n).ext' for the first n that neither a file nor a checkpoint is using."""
+    root, ext = os.path.splitext(path)
+    candidate, n = path, 1
+    while os.path.exists(candidate) or os.path.exists(candidate + STATE_SUFFIX):
+        candidate = f"{root} ({n}){ext}"
+        n += 1
+    return candidate
+
+class SegmentedDownload(QObject):
+    """Downloads one file over parallel HTTP Range requests into a preallocated file.
+
+    Segment offsets are checkpointed next to the target file so an interrupted
+    download resumes each segment where it stopped. Servers that don't advertise
+    Accept-Ranges, or don't send a Content-Length, get a plain single-stream
+    download instead, which resumes with an open-ended Range request where the
+    server honours one and starts over where it doesn't.
+    """
+    progress = Signal(int, int)  # received bytes, total bytes
+    finished = Signal(str)
+    failed = Signal(str)
+    accepted = Signal()  # the server answered the first probe
+    rejected = Signal(str)  # the first probe failed before anything was written
+
+    def __init__(self, network_manager, url, path, segments=4, max_retries=3, headers=None, parent=None):
+        super().__init__(parent)
+        self.network_manager = network_manager
+        self.url = QUrl(url)
+        self.headers = headers or {}  # raw headers sent with every request, e.g. Referer
+        self.path = path
+        self.state_path = path + STATE_SUFFIX
+        self.segment_count = max(1, segments)
+        self.max_retries = max_retries
+
+        self.total_bytes = -1
+        self.segments = []  # [start, end (inclusive), next offset to write]
+        self.retries = []
+        self.replies = {}
+        self.file = None
+        self.single_stream = False
+        self.stream_offset = 0  # where the single stream's response starts in the file
+        self.refused_status = None  # status of a stream response that was not the file
+        self.running = False
+        self.throttled = False
+        self._last_progress = 0.0
+
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.timeout.connect(self.save_state)
+
+    @property
+    def received_bytes(self):
+        return sum(position - start for start, _, position in self.segments)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.throttled = False
+        if self.load_state():
+            logger.info(f"Resuming segmented download of {self.url.toString()}")
+            if self.single_stream:
+                self._start_single_stream(os.path.getsize(self.path))
+            else:
+                self._start_segments()
+        else:
+            reply = self.network_manager.head(self._request())
+            reply.finished.connect(lambda: self._on_probe_finished(reply))
+
+    def resume(self):
+        """Same as start(); named like QWebEngineDownloadRequest so the manager can treat both alike."""
+        self.start()
+
+    def pause(self):
+        self.running = False
+        self._abort_replies()
+        self.save_state()
+        self._close_file()
+
+    def set_throttled(self, throttled):
+        """Stop or restart reading the open replies, for bandwidth shaping.
+
+        Unlike pause(), the connections stay open: a throttled reply fills its
+        READ_BUFFER_SIZE buffer and Qt stops reading its socket, so the server
+        is held back by TCP flow control and nothing has to be requested again.
+        """
+        if throttled == self.throttled:
+            return
+        self.throttled = throttled
+        if not throttled:
+            # Buffered data raises no new readyRead, so drain it here
+            for index, reply in list(self.replies.items()):
+                if self.replies.get(index) is not reply:
+                    continue  # dropped by a fallback while draining an earlier reply
+                if self.single_stream:
+                    self._on_stream_data(reply)
+                else:
+                    self._on_segment_data(index, reply)
+
+    def cancel(self):
+        self.running = False
+        self._abort_replies()
+        self._close_file()
+        for path in (self.path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load_state(self):
+        if not os.path.exists(self.state_path) or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get('url') != self.url.toString():
+            return False
+        if state.get('single_stream'):
+            # The bytes on disk are the stream's progress
+            self.total_bytes = state['total']
+            self.single_stream = True
+            self.segments = []
+            return True
+        if os.path.getsize(self.path) != state['total']:
+            return False
+
+        self.total_bytes = state['total']
+        self.single_stream = False
+        self.segments = state['segments']
+        self.retries = [0] * len(self.segments)
+        return True
+
+    def save_state(self):
+        state = {'url': self.url.toString(), 'total': self.total_bytes}
+        if self.single_stream:
+            state['single_stream'] = True
+        elif self.segments:
+            state['segments'] = self.segments
+        else:
+            return
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+
+    def _request(self):
+        request = QNetworkRequest(self.url)
+        for name, value in self.headers.items():
+            request.setRawHeader(name, value)
+        return request
+
+    def _get(self, request):
+        reply = self.network_manager.get(request)
+        reply.setReadBufferSize(READ_BUFFER_SIZE)
+        return reply
+
+    def _emit_progress(self, received, force=False):
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(received, self.total_bytes)
+
+    def _on_probe_finished(self, reply):
+        reply.deleteLater()
+        if not self.running:
+            return
+
+        status = http_status(reply)
+        if reply.error() != QNetworkReply.NoError and status not in (405, 501):
+            # Nothing is on disk yet, so the caller can still hand the download elsewhere.
+            # A server that only refuses HEAD gets a plain GET below.
+            self.running = False
+            logger.warning(f"Probe of {self.url.toString()} failed: {reply.errorString()}")
+            self.rejected.emit(reply.errorString())
+            return
+        self.accepted.emit()
+
+        # Follow redirects once, so every segment hits the final location
+        self.url = reply.url()
+        self.single_stream = False
+        accepts_ranges = (status not in (405, 501)
+                          and bytes(reply.rawHeader('Accept-Ranges').data()).strip().lower() == b'bytes')
+        length = reply.header(QNetworkRequest.ContentLengthHeader)
+        self.total_bytes = int(length) if length is not None and status not in (405, 501) else -1
+
+        if not accepts_ranges or self.total_bytes < 2 * MIN_SEGMENT_SIZE:
+            self._start_single_stream()
+            return
+
+        # Preallocate so every segment can write straight to its own offset
+        with open(self.path, 'wb') as f:
+            f.truncate(self.total_bytes)
+
+        count = min(self.segment_count, self.total_bytes // MIN_SEGMENT_SIZE)
+        size = self.total_bytes // count
+        self.segments = []
+        for index in range(count):
+            start = index * size
+            end = self.total_bytes - 1 if index == count - 1 else start + size - 1
+            self.segments.append([start, end, start])
+        self.retries = [0] * count
+        self.save_state()
+        self._start_segments()
+
+    def _start_segments(self):
+        self.file = open(self.path, 'r+b')
+        self.checkpoint_timer.start(1000)
+        for index, (_, end, position) in enumerate(self.segments):
+            if position <= end:
+                self._request_segment(index)
+        self._check_complete()
+
+    def _request_segment(self, index):
+        _, end, position = self.segments[index]
+        request = self._request()
+        request.setRawHeader(b'Range', f'bytes={position}-{end}'.encode())
+        reply = self._get(request)
+        self.replies[index] = reply
+        reply.readyRead.connect(lambda: not self.throttled and self._on_segment_data(index, reply))
+        reply.finished.connect(lambda: self._on_segment_finished(index, reply))
+
+    def _on_segment_data(self, index, reply):
+        if not self.running:
+            return
+        status = http_status(reply)
+        if status != 206:
+            if status is not None and reply.error() == QNetworkReply.NoError:
+                # The server ignored the range; stop it before Qt buffers the whole file
+                self._fall_back_to_single_stream(status)
+            return  # error bodies are not file data; _on_segment_finished retries
+        data = reply.readAll().data()
+        segment = self.segments[index]
+        # Never write past the segment, whatever the server sends
+        data = data[:segment[1] + 1 - segment[2]]
+        self.file.seek(segment[2])
+        self.file.write(data)
+        segment[2] += len(data)
+        self._emit_progress(self.received_bytes)
+
+    def _on_segment_finished(self, index, reply):
+        reply.deleteLater()
+        if self.replies.get(index) is reply:
+            del self.replies[index]
+        if not self.running:
+            return
+
+        self._on_segment_data(index, reply)
+        if not self.running or self.single_stream:
+            return  # the data check fell back to a single stream
+        _, end, position = self.segments[index]
+        if position <= end:
+            self.retries[index] += 1
+            if self.retries[index] > self.max_retries:
+                self._fail(f"Segment {index} failed: {reply.errorString()}")
+                return
+            delay = 500 * 2 ** (self.retries[index] - 1)
+            logger.info(f"Retrying segment {index} from offset {position} in {delay} ms")
+            QTimer.singleShot(delay, lambda: self.running and self._request_segment(index))
+            return
+
+        self._check_complete()
+
+    def _check_complete(self):
+        if self.running and all(position > end for _, end, position in self.segments):
+            self.running = False
+            self.checkpoint_timer.stop()
+            self._close_file()
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            self._emit_progress(self.received_bytes, force=True)
+            logger.info(f"Segmented download finished: {self.path}")
+            self.finished.emit(self.path)
+
+    def _fall_back_to_single_stream(self, status):
+        logger.warning(f"Range request answered with {status}, falling back to a single stream")
+        self.running = False
+        self._abort_replies()
+        self._close_file()
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        self.running = True
+        self._start_single_stream()
+
+    def _start_single_stream(self, offset=0):
+        self.single_stream = True
+        self.segments = []
+        self.stream_offset = offset
+        self.refused_status = None
+        request = self._request()
+        if offset:
+            request.setRawHeader(b'Range', f'bytes={offset}-'.encode())
+        reply = self._get(request)
+        self.replies[0] = reply
+        reply.readyRead.connect(lambda: not self.throttled and self._on_stream_data(reply))
+        reply.finished.connect(lambda: self._on_stream_finished(reply))
+
+    def _on_stream_data(self, reply):
+        if not self.running:
+            return
+        if self.file is None and not self._open_stream_file(reply):
+            return
+        data = reply.readAll().data()
+        self.file.write(data)
+        self._emit_progress(self.file.tell())
+
+    def _open_stream_file(self, reply):
+        """Open the target for the stream's response once its status shows what the body is.
+
+        206 for the requested offset continues the file, 200 replaces it with the whole
+        file again. Anything else is turned away and the file is left as it was.
+        """
+        status = http_status(reply)
+        if status is None:
+            return False  # no response yet, or the connection failed
+        offset = self.stream_offset
+        content_range = bytes(reply.rawHeader('Content-Range').data())
+        if offset and status == 206 and content_range.startswith(f'bytes {offset}-'.encode()):
+            self.file = open(self.path, 'r+b')
+            self.file.seek(offset)
+            self.file.truncate()
+        elif status == 200 and reply.error() == QNetworkReply.NoError:
+            if offset:
+                logger.info(f"Range not honoured on resume, restarting {self.url.toString()}")
+            self.stream_offset = 0
+            self.file = open(self.path, 'wb')
+        else:
+            self.refused_status = status
+            if reply.isRunning():
+                reply.abort()  # don't let Qt buffer an error page we won't write
+            return False
+        return True
+
+    def _on_stream_finished(self, reply):
+        reply.deleteLater()
+        self.replies.pop(0, None)
+        if not self.running:
+            return
+        self._on_stream_data(reply)
+        opened = self.file is not None
+        self.running = False
+        self._close_file()
+        if opened and reply.error() == QNetworkReply.NoError:
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            self._emit_progress(os.path.getsize(self.path), force=True)
+            self.finished.emit(self.path)
+            return
+
+        if self.refused_status is not None:
+            error = f"Server answered {self.refused_status} for bytes {self.stream_offset}-"
+        else:
+            error = reply.errorString()
+        if os.path.exists(self.path):
+            self.save_state()  # retry continues from what is on disk
+        logger.warning(f"Single-stream download of {self.url.toString()} failed: {error}")
+        self.failed.emit(error)
+
+    def _fail(self, message):
+        logger.error(message)
+        self.pause()
+        self.failed.emit(message)
+
+    def _abort_replies(self):
+        for reply in list(self.replies.values()):
+            reply.abort()
+        self.replies.clear()
+
+    def _close_file(self):
+        self.checkpoint_timer.stop()
+        if self.file:
+            self.file.close()
+            self.file = None
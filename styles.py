@@ -1,28 +1,92 @@
-def get_main_window_style():
-    return """
-        QMainWindow {
-            background-color: #240970;
+# The whole UI is styled by one application stylesheet, set once with
+# QApplication.setStyleSheet(). Rules are scoped by object names and dynamic
+# properties instead of being set on each widget, so Qt parses the sheet once
+# and switching theme is a single swap.
+#
+#   QMainWindow#browserWindow        the browser window
+#   QWidget#titleBar                 its title bar, QLabel#windowTitleLabel inside
+#   QMainWindow#browserWindow QToolBar
+#                                    the toolbar, matched through its parent because it
+#                                    sizes itself from the style as soon as it is created
+#   QLineEdit#urlBar                 the address bar
+#   QPushButton[chromeButton="true"] icon buttons in the title bar and toolbar
+#   QPushButton#micButton            the microphone toggle, :checked while capturing
+#   QProgressBar#micLevel            its input level, [voice="true"] while someone speaks
+#   QWidget#bookmarkMenu             the bookmark popup, QLabel#bookmarkMenuHeader inside
+#   CustomInputDialog, ResourceDialog
+#                                    dialogs; [squareCorners="true"] on Windows 10, with
+#                                    QWidget#dialogTitle, QLabel#dialogTitleLabel and
+#                                    QPushButton#dialogCloseButton in their title bar
+
+DEFAULT_THEME = 'dark'
+
+THEMES = {
+    'dark': {
+        'window': '#240970',
+        'panel': '#1a0748',
+        'accent': '#3d1db8',
+        'accent_hover': '#4f29d6',
+        'text': 'white',
+        'hover_start': '#1a0748',
+        'hover_end': '#1d1580',
+        'pressed_start': '#261FA0',
+        'pressed_end': '#200860',
+        'selection': 'darkgray',
+        'focus_border': 'lightgray',
+        'voice': '#3ddc84',
+    },
+    'light': {
+        'window': '#ece9f7',
+        'panel': '#d9d3f0',
+        'accent': '#3d1db8',
+        'accent_hover': '#4f29d6',
+        'text': '#1a0748',
+        'hover_start': '#d9d3f0',
+        'hover_end': '#c8c0ec',
+        'pressed_start': '#b8aee6',
+        'pressed_end': '#a99de0',
+        'selection': 'lightgray',
+        'focus_border': 'black',
+        'voice': '#1e9e55',
+    },
+}
+
+current_theme = DEFAULT_THEME
+
+def theme_color(name):
+    """A color of the current theme, for widgets that paint their own background."""
+    return THEMES[current_theme][name]
+
+def get_application_style(theme=DEFAULT_THEME):
+    c = THEMES[theme]
+    return f"""
+        QMainWindow#browserWindow {{
+            background-color: {c['window']};
             border: none;
-        }
-        QWidget#titleBar {
-            background-color: #1a0748;
+        }}
+        QWidget#titleBar {{
+            background-color: {c['window']};
             border-top-left-radius: 10px;
             border-top-right-radius: 10px;
-        }
-    """
+        }}
+        QWidget#titleBar QLabel {{
+            background-color: {c['window']};
+        }}
+        QLabel#windowTitleLabel {{
+            color: {c['text']};
+            padding: 5px;
+            font-size: 16px;
+            font-weight: bold;
+            font-family: 'Trebuchet MS', sans-serif;
+        }}
 
-def get_toolbar_style():
-    return """
-        QToolBar {
-            background-color: #240970;
+        QMainWindow#browserWindow QToolBar {{
+            background-color: {c['window']};
             spacing: 10px;
             border: none;
-        }
-    """
+        }}
 
-def get_button_style():
-    return """
-        QPushButton {
+        QPushButton[chromeButton="true"] {{
             background-color: transparent;
             border-style: none;
             border-width: 0px;
@@ -31,239 +95,166 @@ def get_button_style():
             font: bold 16px;
             min-width: 1em;
             padding: 4px;
-        }
-        QPushButton:hover {
-            background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #1a0748, stop:1 #1d1580);
+        }}
+        QPushButton[chromeButton="true"]:hover {{
+            background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 {c['hover_start']}, stop:1 {c['hover_end']});
             color: white;
             font-weight: bold;
-        }
-        QPushButton:pressed {
-            background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 #261FA0, stop:1 #200860);
-        }
-    """
-
-def get_line_edit_style(light_mode=False):
-    if light_mode:
-        return """
-            QLineEdit {
-                border-radius: 10px;
-                padding: 0 8px;
-                selection-background-color: lightgray;
-                font-size: 20px;
-            }
-            QLineEdit:focus {
-                border: 2px solid black;
-            }
-        """
-    else:
-        return """
-            QLineEdit {
-                border-radius: 10px;
-                padding: 0 8px;
-                selection-background-color: darkgray;
-                font-size: 20px;
-            }
-            QLineEdit:focus {
-                border: 2px solid lightgray;
-            }
-        """
+        }}
+        QPushButton[chromeButton="true"]:pressed {{
+            background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 {c['pressed_start']}, stop:1 {c['pressed_end']});
+        }}
 
-def get_title_button_style():
-    return """
-        QPushButton {
-            background-color: transparent;
+        QPushButton#micButton:checked {{
+            background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 {c['pressed_start']}, stop:1 {c['pressed_end']});
+        }}
+        QProgressBar#micLevel {{
+            background-color: {c['panel']};
             border: none;
-        }
-        QPushButton:hover {
-            background-color: rgba(255, 255, 255, 30);
-        }
-        QPushButton:pressed {
-            background-color: rgba(255, 255, 255, 50);
-        }
-    """
+            border-radius: 3px;
+        }}
+        QProgressBar#micLevel::chunk {{
+            background-color: {c['accent_hover']};
+            border-radius: 3px;
+        }}
+        QProgressBar#micLevel[voice="true"]::chunk {{
+            background-color: {c['voice']};
+        }}
 
-def get_bookmark_menu_style():
-    return """
-        QWidget {
-            background-color: #240970;
-            border: 2px solid #1a0748;
+        QLineEdit#urlBar {{
             border-radius: 10px;
-        }
-        QPushButton {
-            color: white;
+            padding: 0 8px;
+            selection-background-color: {c['selection']};
+            font-size: 20px;
+        }}
+        QLineEdit#urlBar:focus {{
+            border: 2px solid {c['focus_border']};
+        }}
+
+        QWidget#bookmarkMenu, QWidget#bookmarkMenu QWidget {{
+            background-color: {c['window']};
+            border: 2px solid {c['panel']};
+            border-radius: 10px;
+        }}
+        QWidget#bookmarkMenu QPushButton {{
+            color: {c['text']};
             background-color: transparent;
             border: none;
             text-align: left;
             padding: 8px;
             border-radius: 5px;
-        }
-        QPushButton:hover {
-            background-color: #1a0748;
-        }
-        QLabel {
-            color: white;
+        }}
+        QWidget#bookmarkMenu QPushButton:hover {{
+            background-color: {c['panel']};
+        }}
+        QWidget#bookmarkMenu QLabel {{
+            color: {c['text']};
             padding: 8px;
             font-weight: bold;
-        }
-    """
-
-def get_bookmark_header_style():
-    return """
-        font-size: 14px;
-        border-bottom: 1px solid #1a0748;
-    """
+        }}
+        QWidget#bookmarkMenu QLabel#bookmarkMenuHeader {{
+            font-size: 14px;
+            border-bottom: 1px solid {c['panel']};
+        }}
 
-def get_resource_dialog_style(is_windows_10=False):
-    base_style = """
-        QDialog {
-            background-color: #240970;
-            color: white;
-            border: 1px solid #3d1db8;
-            %s
-        }
-        QLabel {
-            color: white;
+        CustomInputDialog, ResourceDialog {{
+            background-color: {c['window']};
+            color: {c['text']};
+            border: 1px solid {c['accent']};
+            border-radius: 10px;
+        }}
+        CustomInputDialog[squareCorners="true"], ResourceDialog[squareCorners="true"] {{
+            border-radius: 0px;
+        }}
+        CustomInputDialog QLabel, ResourceDialog QLabel {{
+            color: {c['text']};
+            font-size: 14px;
+        }}
+        CustomInputDialog QLineEdit {{
+            background-color: {c['panel']};
+            color: {c['text']};
+            border: 1px solid {c['accent']};
+            border-radius: 5px;
+            padding: 5px;
             font-size: 14px;
-        }
-        QSpinBox {
-            background-color: #1a0748;
+        }}
+        CustomInputDialog QPushButton, ResourceDialog QPushButton {{
+            background-color: {c['accent']};
             color: white;
-            border: 1px solid #3d1db8;
+            border: none;
+            border-radius: 5px;
+            padding: 5px 10px;
+            font-size: 14px;
+        }}
+        CustomInputDialog QPushButton:hover, ResourceDialog QPushButton:hover {{
+            background-color: {c['accent_hover']};
+        }}
+        ResourceDialog QSpinBox {{
+            background-color: {c['panel']};
+            color: {c['text']};
+            border: 1px solid {c['accent']};
             border-radius: 5px;
             padding: 5px;
             font-size: 14px;
             min-width: 150px;
-        }
-        QSpinBox::up-button {
+        }}
+        ResourceDialog QSpinBox::up-button {{
             width: 25px;
-            border-left: 1px solid #3d1db8;
-            border-bottom: 1px solid #3d1db8;
+            border-left: 1px solid {c['accent']};
+            border-bottom: 1px solid {c['accent']};
             border-top-right-radius: 5px;
-            background: #1a0748;
+            background: {c['panel']};
             subcontrol-origin: border;
             subcontrol-position: top right;
-        }
-        QSpinBox::up-button:hover {
-            background: #4f29d6;
-        }
-        QSpinBox::up-arrow {
+        }}
+        ResourceDialog QSpinBox::up-button:hover {{
+            background: {c['accent_hover']};
+        }}
+        ResourceDialog QSpinBox::up-arrow {{
             width: 12px;
             height: 12px;
-            color: white;
+            color: {c['text']};
             font-size: 14px;
-        }
-        QSpinBox::down-button {
+        }}
+        ResourceDialog QSpinBox::down-button {{
             width: 25px;
-            border-left: 1px solid #3d1db8;
-            border-top: 1px solid #3d1db8;
+            border-left: 1px solid {c['accent']};
+            border-top: 1px solid {c['accent']};
             border-bottom-right-radius: 5px;
-            background: #1a0748;
+            background: {c['panel']};
             subcontrol-origin: border;
             subcontrol-position: bottom right;
-        }
-        QSpinBox::down-button:hover {
-            background: #4f29d6;
-        }
-        QSpinBox::down-arrow {
+        }}
+        ResourceDialog QSpinBox::down-button:hover {{
+            background: {c['accent_hover']};
+        }}
+        ResourceDialog QSpinBox::down-arrow {{
             width: 12px;
             height: 12px;
-            color: white;
-            font-size: 14px;
-        }
-        QPushButton {
-            background-color: #3d1db8;
-            color: white;
-            border: none;
-            border-radius: 5px;
-            padding: 5px 10px;
+            color: {c['text']};
             font-size: 14px;
-        }
-        QPushButton:hover {
-            background-color: #4f29d6;
-        }
-    """ % ("" if is_windows_10 else "border-radius: 10px;")
-    
-    return base_style
-
-def get_custom_input_dialog_style(is_windows_10=False):
-    if is_windows_10:
-        return """
-            QDialog {
-                background-color: #240970;
-                color: white;
-                border: 1px solid #3d1db8;
-            }
-            QLabel {
-                color: white;
-                font-size: 14px;
-            }
-            QLineEdit {
-                background-color: #1a0748;
-                color: white;
-                border: 1px solid #3d1db8;
-                border-radius: 5px;
-                padding: 5px;
-                font-size: 14px;
-            }
-            QPushButton {
-                background-color: #3d1db8;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 5px 10px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #4f29d6;
-            }
-        """
-    else:
-        return """
-            QDialog {
-                background-color: #240970;
-                color: white;
-                border: 1px solid #3d1db8;
-                border-radius: 10px;
-            }
-            QLabel {
-                color: white;
-                font-size: 14px;
-            }
-            QLineEdit {
-                background-color: #1a0748;
-                color: white;
-                border: 1px solid #3d1db8;
-                border-radius: 5px;
-                padding: 5px;
-                font-size: 14px;
-            }
-            QPushButton {
-                background-color: #3d1db8;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 5px 10px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #4f29d6;
-            }
-        """
+        }}
 
-def get_dialog_title_style():
-    return """
-        background-color: #240970; 
-        border-top-left-radius: 10px; 
-        border-top-right-radius: 10px;
-    """
+        QWidget#dialogTitle, QWidget#dialogTitle * {{
+            background-color: {c['window']};
+            border-top-left-radius: 10px;
+            border-top-right-radius: 10px;
+        }}
+        QWidget#dialogTitle QLabel#dialogTitleLabel {{
+            font-weight: bold;
+            font-size: 16px;
+        }}
+        QWidget#dialogTitle QPushButton#dialogCloseButton {{
+            background-color: transparent;
+        }}
 
-def get_dialog_title_label_style():
-    return """
-        font-weight: bold; 
-        font-size: 16px;
+        RoundedWebView {{
+            background-color: transparent;
+        }}
     """
 
-def get_dialog_close_button_style():
-    return """
-        background-color: transparent;
-    """
\ No newline at end of file
+def apply_theme(app, theme=DEFAULT_THEME):
+    """Style the whole application with theme; calling it again swaps the theme in one step."""
+    global current_theme
+    current_theme = theme
+    app.setStyleSheet(get_application_style(theme))
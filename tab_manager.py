@@ -1,4 +1,3 @@
-import os
 from PySide6.QtCore import QUrl, QTimer, Qt
 from PySide6.QtGui import QMouseEvent
 from PySide6.QtWebEngineWidgets import QWebEngineView
@@ -6,46 +5,51 @@ from PySide6.QtWebEngineCore import QWebEnginePage
 from PySide6.QtWidgets import QWidget, QMenu
 from PySide6.QtGui import QPainter, QPainterPath, QRegion
 from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest
-from download_manager import DownloadManager
 from page_templates import PageTemplates
-from error_handling import ErrorHandler
-
-download_manager = DownloadManager()
+from navigation_controller import NavigationController
+from crash_recovery import CrashRecovery
+from asset_registry import IMAGES_DIR
 
 class CustomWebEnginePage(QWebEnginePage):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._loading_error = False
         self._web_view = parent
-        self._error_handled = False
+        self.fingerprint_manager = None
+        self._fingerprint_key = None
+        self._fingerprint_state = None  # (state key, token) the current document was patched under
+
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        # Install this site's fingerprint before the new document is created
+        if is_main_frame and self.fingerprint_manager:
+            self.apply_site_fingerprint(url)
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
+
+    def apply_site_fingerprint(self, url):
+        site = self.fingerprint_manager.site_for_host(url.host())
+        key = (site, self.fingerprint_manager.generation)
+        if key != self._fingerprint_key:
+            self._fingerprint_key = key
+            script = self.fingerprint_manager.get_script_for_site(site)
+            self.fingerprint_manager.install_script(self.scripts(), script)
+        # The document about to be created is patched under the installed script's state
+        self._fingerprint_state = self.fingerprint_manager.get_site_state(site)
+
+    def refresh_fingerprint(self):
+        """Bring a live page up to the current fingerprint generation if a rotation made it stale."""
+        if not self.fingerprint_manager or self._fingerprint_key is None:
+            return
+        if self._fingerprint_key[1] != self.fingerprint_manager.generation:
+            state_key, state_token = self._fingerprint_state
+            self.apply_site_fingerprint(self.url())
+            # The open document keeps its patches and updater; only its identity and token change
+            script, token = self.fingerprint_manager.build_update_script(self._fingerprint_key[0], state_key, state_token)
+            self.runJavaScript(script)
+            self._fingerprint_state = (state_key, token)
 
     def javaScriptConsoleMessage(self, level, message, line, source):
         # Suppress console messages
         pass
 
-    def certificateError(self, error):
-        if not self._error_handled:
-            self._error_handled = True
-            self._loading_error = True
-            # Stop any current load
-            self._web_view.stop()
-            # Show our error page
-            ErrorHandler.show_error_page(self._web_view, self._web_view.url().toString())
-        return True
-
-    def loadStarted(self):
-        self._loading_error = False
-        self._error_handled = False
-
-    def loadFinished(self, ok):
-        if not ok and not self._error_handled:
-            self._error_handled = True
-            self._loading_error = True
-            # Stop any current load
-            self._web_view.stop()
-            # Show our error page
-            ErrorHandler.show_error_page(self._web_view, self._web_view.url().toString())
-
     # Override to prevent default error page and dialogs
     def javaScriptAlert(self, securityOrigin, msg):
         pass
@@ -59,11 +63,12 @@ class CustomWebEnginePage(QWebEnginePage):
 class RoundedWebView(QWebEngineView):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("background-color: transparent;")
         self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         self.setAttribute(Qt.WA_TranslucentBackground, False)
         self._page = CustomWebEnginePage(self)
         self.setPage(self._page)
+        self.navigation = NavigationController(self)
+        self.crash_recovery = CrashRecovery(self)
 
     def page(self):
         return self._page
@@ -92,7 +97,7 @@ class RoundedWebView(QWebEngineView):
     def open_link_in_new_tab(self, url: QUrl):
         self.window().add_new_tab(url)
 
-def add_new_tab(tab_widget, url_bar, download_manager, qurl=None, label="New Tab"):
+def add_new_tab(tab_widget, url_bar, download_manager, qurl=None, label="New Tab", html=None):
     browser = RoundedWebView()
     i = tab_widget.addTab(browser, label)
     tab_widget.setCurrentIndex(i)
@@ -105,17 +110,16 @@ def add_new_tab(tab_widget, url_bar, download_manager, qurl=None, label="New Tab
     browser.urlChanged.connect(lambda qurl, browser=browser: update_url(qurl, browser, url_bar))
     browser.loadFinished.connect(lambda _: QTimer.singleShot(0, update_tab_title))
 
-    QTimer.singleShot(0, lambda: load_url(browser, qurl))
+    QTimer.singleShot(0, lambda: load_url(browser, qurl, html))
     return browser
 
-def load_url(browser, qurl):
+def load_url(browser, qurl, html=None):
     if qurl:
-        browser.page()._loading_error = False
-        browser.setUrl(qurl)
+        browser.navigation.load(qurl)
     else:
-        homepage_content = PageTemplates.get_homepage()
-        base_url = QUrl.fromLocalFile(os.path.abspath('Images/'))
-        browser.setHtml(homepage_content, base_url)
+        content = html or PageTemplates.get_homepage()
+        base_url = QUrl.fromLocalFile(IMAGES_DIR)
+        browser.setHtml(content, base_url)
 
 def update_url(qurl, browser, url_bar):
     if browser == browser.parent().currentWidget():
@@ -0,0 +1,54 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PySide6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+@pytest.fixture
+def run_until(qapp):
+    """Spin the event loop until condition() holds; fails the test after timeout seconds."""
+    from PySide6.QtCore import QEventLoop, QTimer
+
+    def run_until(condition, timeout=10.0):
+        loop = QEventLoop()
+        poll = QTimer()
+        poll.timeout.connect(lambda: condition() and loop.quit())
+        poll.start(10)
+        deadline = QTimer()
+        deadline.setSingleShot(True)
+        deadline.timeout.connect(loop.quit)
+        deadline.start(int(timeout * 1000))
+        if not condition():
+            loop.exec()
+        poll.stop()
+        deadline.stop()
+        assert condition(), f"gave up waiting after {timeout} s"
+
+    return run_until
+
+@pytest.fixture
+def http_server():
+    """Start a local ThreadingHTTPServer for a handler class; returns (server, base url)."""
+    servers = []
+
+    def start(handler, wrap_socket=None):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        if wrap_socket:
+            server.socket = wrap_socket(server.socket)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
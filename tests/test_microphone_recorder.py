@@ -0,0 +1,155 @@
+import threading
+
+import numpy as np
+import pytest
+
+from microphone_manager import AudioRingBuffer, MicrophoneRecorder, PA_CONTINUE, PA_COMPLETE
+
+RATE = 8000
+CHUNK = 256
+
+def counting(start, count):
+    """int16 samples start, start + 1, ... wrapping at 32768, so gaps and tears are visible."""
+    return (np.arange(start, start + count) % 32768).astype(np.int16)
+
+def is_contiguous(samples):
+    return len(samples) < 2 or bool(np.all(np.diff(samples.astype(np.int64)) % 32768 == 1))
+
+class FakeStream:
+    """Stands in for a PyAudio stream: calls the callback with counting chunks on demand."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.position = 0
+        self.active = False
+        self.started = 0
+        self.closed = 0
+        self.results = []
+
+    def feed(self, chunks):
+        for _ in range(chunks):
+            data = counting(self.position, CHUNK).tobytes()
+            self.results.append(self.callback(data, CHUNK, None, 0))
+            self.position += CHUNK
+
+    def start_stream(self):
+        self.active = True
+        self.started += 1
+
+    def stop_stream(self):
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.active = False
+        self.closed += 1
+
+class RecordingMeter:
+    def __init__(self):
+        self.blocks = []
+
+    def process(self, data):
+        self.blocks.append(len(data) // 2)
+
+@pytest.fixture
+def recorder():
+    streams = []
+
+    def open_stream(callback):
+        streams.append(FakeStream(callback))
+        return streams[-1]
+
+    recorder = MicrophoneRecorder(RATE, CHUNK, max_frames=10, open_stream=open_stream, meter=RecordingMeter())
+    recorder.fake = streams[0]
+    return recorder
+
+def test_ring_starts_empty():
+    ring = AudioRingBuffer(16)
+    assert len(ring.read()) == 0
+    assert [len(view) for view in ring.views()] == [0]
+
+def test_ring_keeps_the_latest_samples_across_the_wrap():
+    ring = AudioRingBuffer(10)
+    ring.write(counting(0, 7).tobytes())
+    ring.write(counting(7, 7).tobytes())
+    assert ring.read().tolist() == list(range(4, 14))
+    assert ring.read(3).tolist() == [11, 12, 13]
+    views = ring.views()
+    assert len(views) == 2
+    assert np.concatenate(views).tolist() == list(range(4, 14))
+
+def test_ring_write_larger_than_capacity_keeps_the_tail():
+    ring = AudioRingBuffer(8)
+    ring.write(counting(0, 3).tobytes())
+    ring.write(counting(3, 20))  # any buffer-protocol object works
+    assert ring.read().tolist() == list(range(15, 23))
+    assert ring.written == 23
+
+def test_views_share_memory_and_read_copies():
+    ring = AudioRingBuffer(16)
+    ring.write(counting(0, 12).tobytes())
+    views = ring.views(5)
+    assert len(views) == 1 and np.shares_memory(views[0], ring.buffer)
+    copy = ring.read(5)
+    assert not np.shares_memory(copy, ring.buffer)
+    ring.write(counting(12, 16).tobytes())
+    # The copy outlives the writer coming round again, the view does not
+    assert copy.tolist() == [7, 8, 9, 10, 11]
+    assert views[0].tolist() != [7, 8, 9, 10, 11]
+
+def test_recorder_returns_the_last_milliseconds(recorder):
+    recorder.fake.feed(25)  # more than the 10 chunks the ring holds
+    samples = recorder.get_samples(100)
+    assert len(samples) == RATE * 100 // 1000
+    assert is_contiguous(samples)
+    assert samples[-1] == 25 * CHUNK - 1
+
+    everything = recorder.get_samples()
+    assert len(everything) == 10 * CHUNK
+    assert everything[0] == 15 * CHUNK
+    views = recorder.get_sample_views(100)
+    assert np.concatenate(views).tolist() == samples.tolist()
+
+def test_every_block_reaches_the_meter(recorder):
+    recorder.fake.feed(4)
+    assert recorder.meter.blocks == [CHUNK] * 4
+
+def test_stream_keeps_running_until_closed(recorder):
+    stream = recorder.fake
+    recorder.start()
+    recorder.start()
+    assert stream.started == 1 and recorder.is_active()
+    recorder.pause()
+    assert not recorder.is_active()
+    recorder.start()
+    assert stream.started == 2
+
+    stream.feed(1)
+    recorder.close()
+    recorder.close()
+    stream.feed(1)
+    assert stream.closed == 1
+    assert [result[1] for result in stream.results] == [PA_CONTINUE, PA_COMPLETE]
+    assert not recorder.is_active()
+
+def test_reads_during_writes_are_never_torn():
+    ring = AudioRingBuffer(2 * CHUNK)
+    done = threading.Event()
+
+    def writer():
+        for index in range(50000):
+            ring.write(counting(index * CHUNK, CHUNK).tobytes())
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    while not done.is_set():
+        samples = ring.read()
+        assert is_contiguous(samples)
+        reads += 1
+    thread.join()
+    assert reads > 0
+    assert is_contiguous(ring.read())
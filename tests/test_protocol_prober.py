@@ -0,0 +1,141 @@
+import json
+import time
+import shutil
+import socket
+import subprocess
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from protocol_prober import ProtocolProber
+from hsts_store import HstsStore
+
+class HeadHandler(BaseHTTPRequestHandler):
+    hsts = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        # Any status proves the scheme works, as it does for real servers rejecting HEAD
+        self.send_response(405)
+        if self.hsts:
+            self.send_header('Strict-Transport-Security', self.hsts)
+        self.end_headers()
+
+class HstsHeadHandler(HeadHandler):
+    hsts = 'max-age=600'
+
+@pytest.fixture(scope='module')
+def tls_context(tmp_path_factory):
+    """Server context with a throwaway self-signed certificate made by the openssl tool."""
+    import ssl
+    if shutil.which('openssl') is None:
+        pytest.skip("the HTTPS stand-in needs the openssl command line tool")
+    directory = tmp_path_factory.mktemp('tls')
+    cert, key = str(directory / 'cert.pem'), str(directory / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+                   check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+@pytest.fixture
+def trust_any_certificate(qapp):
+    from PySide6.QtNetwork import QSslConfiguration, QSslSocket
+    original = QSslConfiguration.defaultConfiguration()
+    config = QSslConfiguration.defaultConfiguration()
+    config.setPeerVerifyMode(QSslSocket.VerifyNone)  # the stand-in's certificate is self-signed
+    QSslConfiguration.setDefaultConfiguration(config)
+    yield
+    QSslConfiguration.setDefaultConfiguration(original)
+
+@pytest.fixture
+def stand_ins(http_server, tls_context, trust_any_certificate):
+    """Ports of an HTTPS and an HTTP stand-in, plus one nothing listens on."""
+    https, _ = http_server(HeadHandler, lambda sock: tls_context.wrap_socket(sock, server_side=True))
+    http, _ = http_server(HeadHandler)
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        closed = sock.getsockname()[1]
+    return {'https': https.server_port, 'http': http.server_port, 'closed': closed}
+
+@pytest.fixture
+def make_prober(qapp, tmp_path):
+    cache_file = str(tmp_path / 'protocol_cache.json')
+
+    def make_prober(https_port, http_port, **kwargs):
+        return ProtocolProber(cache_file=cache_file, https_grace=200, timeout=2000,
+                              ports={'https': https_port, 'http': http_port}, **kwargs)
+
+    make_prober.cache_file = cache_file
+    return make_prober
+
+@pytest.fixture
+def probe(run_until):
+    """Probe domain with prober; returns (scheme or None, seconds taken)."""
+    def probe(prober, domain='127.0.0.1'):
+        result = []
+        began = time.monotonic()
+        prober.probe(domain, lambda url: result.append(url.scheme() if url else None))
+        run_until(lambda: result)
+        return result[0], time.monotonic() - began
+
+    return probe
+
+def test_https_wins_when_both_answer(stand_ins, make_prober, probe):
+    scheme, _ = probe(make_prober(stand_ins['https'], stand_ins['http']))
+    assert scheme == 'https'
+    with open(make_prober.cache_file) as f:
+        assert [entry['scheme'] for entry in json.load(f).values()] == ['https']
+
+def test_repeat_visit_is_answered_from_the_cache(stand_ins, make_prober, probe):
+    probe(make_prober(stand_ins['https'], stand_ins['http']))
+    # A new prober reads the cache file; with both stand-ins out of reach only the cache can answer
+    scheme, elapsed = probe(make_prober(stand_ins['closed'], stand_ins['closed']))
+    assert scheme == 'https'
+    assert elapsed < 0.1
+
+def test_http_only_host_answers_after_the_grace_period(stand_ins, make_prober, probe):
+    scheme, elapsed = probe(make_prober(stand_ins['closed'], stand_ins['http']))
+    assert scheme == 'http'
+    # Well under the 2 s timeout a full HTTPS page load would have cost
+    assert elapsed < 1.0
+
+def test_unreachable_host_is_not_cached(stand_ins, make_prober, probe, http_server):
+    scheme, _ = probe(make_prober(stand_ins['closed'], stand_ins['closed']))
+    assert scheme is None
+
+    # The same host comes back on HTTP and is probed again rather than answered from the cache
+    back, _ = http_server(HeadHandler)
+    scheme, _ = probe(make_prober(stand_ins['closed'], back.server_port))
+    assert scheme == 'http'
+
+def test_expired_cache_entries_are_dropped_on_load(make_prober):
+    with open(make_prober.cache_file, 'w') as f:
+        json.dump({'old.example': {'scheme': 'http', 'expires': time.time() - 1},
+                   'fresh.example': {'scheme': 'https', 'expires': time.time() + 60},
+                   'failed.example': {'scheme': '', 'expires': time.time() + 60}}, f)
+    prober = make_prober(1, 1)
+    assert prober.cached_scheme('old.example') is None
+    assert prober.cached_scheme('failed.example') is None
+    assert prober.cached_scheme('fresh.example') == 'https'
+
+def test_hsts_host_goes_to_https_without_a_probe(make_prober, probe, tmp_path):
+    store = HstsStore(preload_file=str(tmp_path / 'missing.txt'), observed_file=str(tmp_path / 'hsts.json'))
+    store.observe('secure.example', 'max-age=600')
+    # Nothing listens on either port, so only the HSTS shortcut can produce an answer
+    scheme, elapsed = probe(make_prober(1, 1, hsts_store=store), 'secure.example')
+    assert scheme == 'https'
+    assert elapsed < 0.1
+
+def test_strict_transport_security_header_is_reported(http_server, tls_context, trust_any_certificate,
+                                                       make_prober, probe):
+    https, _ = http_server(HstsHeadHandler, lambda sock: tls_context.wrap_socket(sock, server_side=True))
+    prober = make_prober(https.server_port, 1)
+    headers = []
+    prober.hsts_header.connect(lambda host, value: headers.append((host, value)))
+    scheme, _ = probe(prober)
+    assert scheme == 'https'
+    assert headers == [('127.0.0.1', 'max-age=600')]
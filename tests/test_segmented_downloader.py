@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from segmented_downloader import SegmentedDownload, STATE_SUFFIX, unique_path
+
+def make_handler(payload, ranges=True, content_length=True, ignore_get_ranges=False,
+                 get_status=None, bytes_per_second=0):
+    """A handler class serving payload with per-class counters of requests and bytes sent."""
+
+    class Handler(BaseHTTPRequestHandler):
+        requests = []  # (method, Range header)
+        bytes_sent = 0
+        lock = threading.Lock()
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_headers(self, honour_range):
+            size = len(payload)
+            start, end = 0, size - 1
+            range_header = self.headers.get('Range')
+            with self.lock:
+                Handler.requests.append((self.command, range_header))
+            if honour_range and range_header and range_header.startswith('bytes='):
+                first, _, last = range_header[6:].partition('-')
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            else:
+                self.send_response(200)
+            if ranges:
+                self.send_header('Accept-Ranges', 'bytes')
+            if content_length:
+                self.send_header('Content-Length', str(end - start + 1))
+            self.end_headers()
+            return start, end
+
+        def do_HEAD(self):
+            self._send_headers(ranges)
+
+        def do_GET(self):
+            if get_status:
+                body = b'<html><body>Error</body></html>'
+                with self.lock:
+                    Handler.requests.append((self.command, self.headers.get('Range')))
+                self.send_response(get_status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            start, end = self._send_headers(ranges and not ignore_get_ranges)
+            position, began = start, time.monotonic()
+            try:
+                while position <= end:
+                    block = payload[position:min(position + 64 * 1024, end + 1)]
+                    self.wfile.write(block)
+                    position += len(block)
+                    with self.lock:
+                        Handler.bytes_sent += len(block)
+                    if bytes_per_second:
+                        ahead = (position - start) / bytes_per_second - (time.monotonic() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client aborted the request
+
+        @classmethod
+        def gets(cls):
+            return [range_header for method, range_header in cls.requests if method == 'GET']
+
+    return Handler
+
+@pytest.fixture
+def payload():
+    return os.urandom(8 * 1024 * 1024)
+
+@pytest.fixture
+def download(qapp, tmp_path):
+    """Create a SegmentedDownload that records its outcome in job.result."""
+    from PySide6.QtNetwork import QNetworkAccessManager
+    manager = QNetworkAccessManager()
+
+    def download(url, name='payload.bin', segments=4):
+        job = SegmentedDownload(manager, url, str(tmp_path / name), segments)
+        job.result = {}
+        job.finished.connect(lambda path: job.result.setdefault('finished', path))
+        job.failed.connect(lambda error: job.result.setdefault('failed', error))
+        job.rejected.connect(lambda error: job.result.setdefault('rejected', error))
+        return job
+
+    return download
+
+def interrupt_when(job, fraction, size):
+    """Pause job once fraction of size has arrived and resume it 100 ms later."""
+    from PySide6.QtCore import QTimer
+    job.interrupted_at = None
+
+    def on_progress(received, total):
+        if job.interrupted_at is None and received >= size * fraction:
+            job.interrupted_at = received
+            job.pause()
+            QTimer.singleShot(100, job.resume)
+
+    job.progress.connect(on_progress)
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def test_segments_reassemble_the_file(http_server, download, run_until, payload):
+    handler = make_handler(payload)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    job.start()
+    run_until(lambda: job.result)
+
+    assert job.result == {'finished': job.path}
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+    assert not os.path.exists(job.path + STATE_SUFFIX)
+    assert len(handler.gets()) == 4
+    assert all(range_header.startswith('bytes=') for range_header in handler.gets())
+
+def test_interrupted_segments_resume_where_they_stopped(http_server, download, run_until, payload):
+    handler = make_handler(payload, bytes_per_second=8 * 1024 * 1024)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    interrupt_when(job, 0.4, len(payload))
+    job.start()
+    run_until(lambda: job.result)
+
+    assert job.result == {'finished': job.path}
+    assert job.interrupted_at is not None
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+    # Resumed segments ask only for their missing bytes
+    assert handler.bytes_sent <= 1.1 * len(payload)
+
+def test_no_range_support_uses_one_plain_stream(http_server, download, run_until, payload):
+    handler = make_handler(payload, ranges=False)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    job.start()
+    run_until(lambda: job.result)
+
+    assert job.result == {'finished': job.path}
+    assert job.single_stream
+    assert handler.gets() == [None]
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+
+def test_single_stream_resumes_with_an_open_ended_range(http_server, download, run_until, payload):
+    # Without a Content-Length there is nothing to split, but the server still honours Range
+    handler = make_handler(payload, content_length=False, bytes_per_second=8 * 1024 * 1024)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    interrupt_when(job, 0.4, len(payload))
+    job.start()
+    run_until(lambda: job.result)
+
+    assert job.result == {'finished': job.path}
+    gets = handler.gets()
+    assert gets[0] is None and len(gets) == 2
+    assert gets[1].startswith('bytes=') and gets[1].endswith('-') and gets[1] != 'bytes=0-'
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+    assert handler.bytes_sent <= 1.1 * len(payload)
+
+def test_single_stream_starts_over_when_range_is_ignored(http_server, download, run_until, payload):
+    handler = make_handler(payload, ranges=False, bytes_per_second=8 * 1024 * 1024)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    interrupt_when(job, 0.4, len(payload))
+    job.start()
+    run_until(lambda: job.result)
+
+    assert job.result == {'finished': job.path}
+    assert job.interrupted_at is not None
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+
+def test_ranged_get_answered_with_200_falls_back_before_buffering(http_server, download, run_until):
+    # HEAD advertises ranges, every GET sends the whole file anyway
+    payload = os.urandom(16 * 1024 * 1024)
+    handler = make_handler(payload, ignore_get_ranges=True, bytes_per_second=16 * 1024 * 1024)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    job.start()
+    run_until(lambda: job.result, timeout=20)
+
+    assert job.result == {'finished': job.path}
+    assert job.single_stream
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+    # The segment replies were dropped at their first bytes rather than read to the end
+    assert handler.bytes_sent < 1.5 * len(payload)
+
+@pytest.mark.parametrize('status', [416, 503])
+def test_refused_resume_leaves_the_file_alone(http_server, download, run_until, status):
+    handler = make_handler(b'', get_status=status)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin')
+    partial = os.urandom(100 * 1024)
+    with open(job.path, 'wb') as f:
+        f.write(partial)
+    with open(job.state_path, 'w') as f:
+        json.dump({'url': job.url.toString(), 'total': -1, 'single_stream': True}, f)
+
+    job.start()
+    run_until(lambda: job.result)
+
+    assert str(status) in job.result['failed']
+    assert handler.gets() == [f'bytes={len(partial)}-']
+    with open(job.path, 'rb') as f:
+        assert f.read() == partial
+    # The checkpoint survives, so a later retry continues from the same byte
+    assert os.path.exists(job.state_path)
+
+def test_unreachable_server_is_rejected_before_anything_is_written(download, run_until):
+    job = download('http://127.0.0.1:1/payload.bin')
+    job.start()
+    run_until(lambda: job.result)
+
+    assert 'rejected' in job.result
+    assert not os.path.exists(job.path)
+
+def test_unique_path_skips_files_and_checkpoints(tmp_path):
+    target = tmp_path / 'file.bin'
+    assert unique_path(str(target)) == str(target)
+    target.write_bytes(b'')
+    (tmp_path / 'file (1).bin.kepler-part').write_text('{}')
+    assert unique_path(str(target)) == str(tmp_path / 'file (2).bin')
+
+@pytest.mark.parametrize('ranges', [True, False])
+def test_throttling_holds_the_connections_open(http_server, download, run_until, ranges):
+    from PySide6.QtCore import QTimer
+    payload = os.urandom(64 * 1024 * 1024)
+    handler = make_handler(payload, ranges=ranges, bytes_per_second=32 * 1024 * 1024)
+    _, base = http_server(handler)
+    job = download(base + '/payload.bin', segments=2)
+    progress = []
+    job.progress.connect(lambda received, total: progress.append(received))
+    job.start()
+    run_until(lambda: progress and progress[-1] >= 2 * 1024 * 1024)
+
+    job.set_throttled(True)
+    throttled_at = len(progress)
+    elapsed = []
+    QTimer.singleShot(1000, lambda: elapsed.append(True))
+    run_until(lambda: elapsed)
+    # Nothing is read while throttled. Unthrottled, the server would have sent nearly all of
+    # the file by now; held back by full buffers it sends little more than the buffers hold.
+    assert len(progress) == throttled_at
+    assert handler.bytes_sent < len(payload) / 2
+
+    job.set_throttled(False)
+    run_until(lambda: job.result, timeout=20)
+    assert job.result == {'finished': job.path}
+    assert file_digest(job.path) == hashlib.sha256(payload).hexdigest()
+    # Throttling never aborted a reply, so nothing was requested twice
+    assert len(handler.gets()) == (2 if ranges else 1)
+    assert handler.bytes_sent == len(payload)
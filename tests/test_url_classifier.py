@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from url_classifier import UrlClassifier, PublicSuffixList, split_host_port, PSL_FILE, NAVIGATE, HOST, SEARCH
+
+# input -> (kind, text handed to the navigation step)
+CLASSIFY_CORPUS = [
+    ('https://example.com', (NAVIGATE, 'https://example.com')),
+    ('HTTP://Example.com/Path', (NAVIGATE, 'HTTP://Example.com/Path')),
+    ('file:///tmp/report.pdf', (NAVIGATE, 'file:///tmp/report.pdf')),
+    ('about:blank', (NAVIGATE, 'about:blank')),
+    ('example.com', (HOST, 'example.com')),
+    ('  example.com  ', (HOST, 'example.com')),
+    ('www.bbc.co.uk/news', (HOST, 'www.bbc.co.uk/news')),
+    ('example.com:8443/login?next=/', (HOST, 'example.com:8443/login?next=/')),
+    ('user.github.io', (HOST, 'user.github.io')),
+    ('пример.рф', (HOST, 'пример.рф')),
+    ('xn--e1afmkfd.xn--p1ai', (HOST, 'xn--e1afmkfd.xn--p1ai')),
+    ('localhost', (HOST, 'localhost')),
+    ('localhost:8080', (HOST, 'localhost:8080')),
+    ('app.localhost:3000/debug', (HOST, 'app.localhost:3000/debug')),
+    ('127.0.0.1', (HOST, '127.0.0.1')),
+    ('192.168.1.1:8080/admin', (HOST, '192.168.1.1:8080/admin')),
+    ('::1', (HOST, '[::1]')),
+    ('[::1]:3000', (HOST, '[::1]:3000')),
+    ('fe80::1/status', (HOST, '[fe80::1]/status')),
+    ('printer.local', (HOST, 'printer.local')),
+    ('wiki.corp', (HOST, 'wiki.corp')),
+    ('router.home.arpa', (HOST, 'router.home.arpa')),
+    ('nas:5000', (HOST, 'nas:5000')),
+    ('intranet', (HOST, 'intranet')),  # Listed as a known intranet host below
+    ('wiki', (SEARCH, 'wiki')),
+    ('foo.notatld', (SEARCH, 'foo.notatld')),
+    ('readme.txt', (SEARCH, 'readme.txt')),
+    ('how to cook rice', (SEARCH, 'how to cook rice')),
+    ('python.org tutorial', (SEARCH, 'python.org tutorial')),
+    ('?example.com', (SEARCH, 'example.com')),
+    ('user@example.com', (SEARCH, 'user@example.com')),
+    ('javascript:alert(1)', (SEARCH, 'javascript:alert(1)')),
+    ('foo:bar', (SEARCH, 'foo:bar')),
+    ('example.com:99999', (SEARCH, 'example.com:99999')),
+    ('-bad-.com', (SEARCH, '-bad-.com')),
+    ('3.14', (SEARCH, '3.14')),
+    ('', (SEARCH, '')),
+]
+
+# host -> registrable domain, mostly from the publicsuffix.org test vectors
+REGISTRABLE_CORPUS = [
+    ('example.com', 'example.com'),
+    ('www.example.com', 'example.com'),
+    ('a.b.example.com', 'example.com'),
+    ('www.bbc.co.uk', 'bbc.co.uk'),
+    ('co.uk', 'co.uk'),
+    ('user.github.io', 'user.github.io'),
+    ('b.c.kobe.jp', 'b.c.kobe.jp'),
+    ('a.b.c.kobe.jp', 'b.c.kobe.jp'),
+    ('city.kobe.jp', 'city.kobe.jp'),
+    ('www.city.kobe.jp', 'city.kobe.jp'),
+    ('www.ck', 'www.ck'),
+    ('www.www.ck', 'www.ck'),
+    ('b.test.ck', 'b.test.ck'),
+    ('a.b.test.ck', 'b.test.ck'),
+    ('食狮.com.cn', '食狮.com.cn'),
+    ('www.食狮.公司.cn', '食狮.公司.cn'),
+    ('xn--85x722f.xn--55qx5d.cn', 'xn--85x722f.xn--55qx5d.cn'),
+    ('www.xn--85x722f.xn--55qx5d.cn', 'xn--85x722f.xn--55qx5d.cn'),
+    ('localhost', 'localhost'),
+    ('192.168.0.1', '192.168.0.1'),
+]
+
+@pytest.fixture(scope='module')
+def suffix_list():
+    return PublicSuffixList(cache_file=None)
+
+@pytest.fixture(scope='module')
+def classifier(suffix_list):
+    return UrlClassifier(suffix_list, intranet_hosts=['intranet'])
+
+@pytest.mark.parametrize('text, expected', CLASSIFY_CORPUS)
+def test_classify(classifier, text, expected):
+    assert classifier.classify(text) == expected
+
+@pytest.mark.parametrize('host, expected', REGISTRABLE_CORPUS)
+def test_registrable_domain(suffix_list, host, expected):
+    assert suffix_list.registrable_domain(host) == expected
+
+@pytest.mark.parametrize('authority, expected', [
+    ('example.com', ('example.com', None)),
+    ('example.com:8080', ('example.com', '8080')),
+    ('[::1]:3000', ('::1', '3000')),
+    ('::1', ('::1', None)),
+    ('[::1]x', None),
+    ('[::1', None),
+    ('example.com:0', None),
+    ('example.com:65536', None),
+    ('example.com:http', None),
+])
+def test_split_host_port(authority, expected):
+    assert split_host_port(authority) == expected
+
+def test_intranet_hosts_can_be_added(suffix_list):
+    classifier = UrlClassifier(suffix_list)
+    assert classifier.classify('buildbox') == (SEARCH, 'buildbox')
+    classifier.add_intranet_host('BuildBox')
+    assert classifier.classify('buildbox') == (HOST, 'buildbox')
+
+def test_compiled_trie_is_cached_and_rebuilt_when_the_list_changes(tmp_path, suffix_list):
+    cache_file = str(tmp_path / 'psl.cache')
+    compiled = PublicSuffixList(cache_file=cache_file)
+    assert os.path.exists(cache_file)
+    cached = PublicSuffixList(cache_file=cache_file)
+    assert cached.rule_count == compiled.rule_count == suffix_list.rule_count
+    assert cached.root == compiled.root
+
+    # A different list file invalidates the cache instead of serving the old trie
+    small_list = tmp_path / 'small.dat'
+    small_list.write_text('// comment\ncom\n*.ck\n!www.ck\n', encoding='utf-8')
+    small = PublicSuffixList(path=str(small_list), cache_file=cache_file)
+    assert small.rule_count == 3
+    assert small.registrable_domain('a.b.example.com') == 'example.com'
+    assert small.registrable_domain('www.www.ck') == 'www.ck'
+    assert PublicSuffixList(path=PSL_FILE, cache_file=cache_file).rule_count == suffix_list.rule_count
+
+def test_missing_list_file_leaves_an_empty_trie(tmp_path):
+    empty = PublicSuffixList(path=str(tmp_path / 'missing.dat'), cache_file=None)
+    assert empty.rule_count == 0
+    # The implicit "*" rule still applies
+    assert empty.registrable_domain('a.b.example.com') == 'example.com'
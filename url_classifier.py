@@ -0,0 +1,233 @@
+import os
+import re
+import marshal
+import ipaddress
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='kepler_error.log'
+)
+logger = logging.getLogger('UrlClassifier')
+
+PSL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_list.dat')
+
+CACHE_VERSION = 1
+
+# Classification results
+NAVIGATE = 'navigate'  # Already a full URL, load it as-is
+HOST = 'host'          # A host without scheme, pick the protocol before loading
+SEARCH = 'search'      # Anything else goes to the search engine
+
+NAVIGABLE_SCHEMES = ('http://', 'https://', 'file://')
+OPAQUE_SCHEMES = ('about:', 'data:', 'view-source:', 'kepler:', 'mailto:')
+
+# Suffixes reserved for private networks, never delegated in public DNS
+INTRANET_SUFFIXES = ('.localhost', '.local', '.lan', '.home', '.home.arpa', '.internal',
+                     '.intranet', '.corp', '.localdomain', '.test')
+
+_LABEL = re.compile(r'^(?!-)[^\s!"#$%&\'()*+,/:;<=>?@\[\\\]^`{|}~]{1,63}(?<!-)$')
+
+# Trie node keys; labels can never contain these characters
+_TERMINAL = '$'
+_EXCEPTION = '!'
+
+class PublicSuffixList:
+    """Public Suffix List compiled into a trie of dicts keyed by labels, right to left.
+
+    Parsing the full list takes ~100 ms, so the compiled trie is cached with marshal
+    and only rebuilt when the list file changes.
+    """
+
+    def __init__(self, path=PSL_FILE, cache_file='public_suffix_list.cache'):
+        self.root = {}
+        self.rule_count = 0
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.error(f"Public Suffix List unavailable: {e}")
+            return
+        source_key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+        if cache_file and self.load_cache(cache_file, source_key):
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                rule = line.split(None, 1)[0] if line.strip() else ''
+                if rule and not rule.startswith('//'):
+                    self.add_rule(rule)
+        logger.info(f"Compiled {self.rule_count} public suffix rules")
+        if cache_file:
+            self.save_cache(cache_file, source_key)
+
+    def load_cache(self, cache_file, source_key):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, self.rule_count, self.root = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if tuple(cached_key) != source_key:
+            self.root, self.rule_count = {}, 0
+            return False
+        return True
+
+    def save_cache(self, cache_file, source_key):
+        try:
+            with open(cache_file, 'wb') as f:
+                marshal.dump((source_key, self.rule_count, self.root), f)
+        except OSError as e:
+            logger.warning(f"Could not cache compiled suffix list: {e}")
+
+    def add_rule(self, rule):
+        exception = rule.startswith('!')
+        rule = rule.lstrip('!').lower()
+        variants = [rule]
+        if not rule.isascii():
+            # Hosts may arrive in either Unicode or punycode form
+            try:
+                variants.append('.'.join(label.encode('idna').decode('ascii') for label in rule.split('.')))
+            except UnicodeError:
+                pass
+        for variant in variants:
+            node = self.root
+            for label in reversed(variant.split('.')):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if exception else _TERMINAL] = True
+        self.rule_count += 1
+
+    def is_known_tld(self, tld):
+        return tld in self.root
+
+    def public_suffix_length(self, labels):
+        """Number of trailing labels that form the public suffix, following the PSL algorithm."""
+        node = self.root
+        length = 1  # The implicit "*" rule
+        for depth, label in enumerate(reversed(labels), 1):
+            child = node.get(label)
+            if child is None:
+                child = node.get('*')
+                if child is None:
+                    break
+            if _EXCEPTION in child:
+                # "!www.ck" makes www.ck registrable despite the "*.ck" rule
+                return depth - 1
+            if _TERMINAL in child:
+                length = depth
+            node = child
+        return length
+
+    def registrable_domain(self, host):
+        """eTLD+1 of host, or host itself when it is a public suffix or an IP literal."""
+        host = host.lower().rstrip('.')
+        if not host or is_ip_address(host):
+            return host
+        labels = host.split('.')
+        suffix_length = self.public_suffix_length(labels)
+        if suffix_length >= len(labels):
+            return host
+        return '.'.join(labels[-suffix_length - 1:])
+
+_public_suffix_list = None
+
+def get_public_suffix_list():
+    """Shared PSL trie, compiled on first use."""
+    global _public_suffix_list
+    if _public_suffix_list is None:
+        _public_suffix_list = PublicSuffixList()
+    return _public_suffix_list
+
+def is_ip_address(host):
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+def split_host_port(authority):
+    """Split "host[:port]" or "[v6][:port]"; returns (host, port) or None if malformed."""
+    if authority.startswith('['):
+        end = authority.find(']')
+        if end == -1:
+            return None
+        host, rest = authority[1:end], authority[end + 1:]
+        if rest and not rest.startswith(':'):
+            return None
+        port = rest[1:] if rest else None
+    elif authority.count(':') > 1:
+        # Bare IPv6 literal such as ::1 or fe80::1
+        host, port = authority, None
+    else:
+        host, _, port = authority.partition(':')
+        port = port if _ else None
+
+    if port is not None and not (port.isdigit() and 0 < int(port) < 65536):
+        return None
+    return host, port
+
+class UrlClassifier:
+    """Decides instantly whether omnibox text is a URL, a host to load or a search query."""
+
+    def __init__(self, public_suffix_list=None, intranet_hosts=()):
+        self._public_suffix_list = public_suffix_list
+        self.intranet_hosts = {host.lower() for host in intranet_hosts}
+
+    @property
+    def public_suffix_list(self):
+        if self._public_suffix_list is None:
+            self._public_suffix_list = get_public_suffix_list()
+        return self._public_suffix_list
+
+    def add_intranet_host(self, host):
+        self.intranet_hosts.add(host.lower())
+
+    def classify(self, text):
+        """Return (kind, text) where text is ready for that kind of navigation."""
+        text = text.strip()
+        if not text:
+            return SEARCH, text
+
+        lowered = text.lower()
+        if lowered.startswith(NAVIGABLE_SCHEMES) or lowered.startswith(OPAQUE_SCHEMES):
+            return NAVIGATE, text
+        if lowered.startswith('javascript:') or any(c.isspace() for c in text):
+            return SEARCH, text
+        if text.startswith('?'):
+            return SEARCH, text[1:].strip()
+
+        # Everything before the first path, query or fragment character is the authority
+        cut = len(text)
+        for separator in '/?#':
+            index = text.find(separator)
+            if index != -1 and index < cut:
+                cut = index
+        authority = text[:cut]
+        if not authority or '@' in authority:
+            return SEARCH, text
+
+        parts = split_host_port(authority)
+        if parts is None:
+            return SEARCH, text
+        host, port = parts
+        host = host.lower().rstrip('.')
+
+        if is_ip_address(host):
+            if ':' in host and not authority.startswith('['):
+                # Bare IPv6 needs brackets to survive as a URL
+                return HOST, f'[{host}]' + text[cut:]
+            return HOST, text
+        if not host or not all(_LABEL.match(label) for label in host.split('.')):
+            return SEARCH, text
+        if host == 'localhost' or host.endswith(INTRANET_SUFFIXES) or host in self.intranet_hosts:
+            return HOST, text
+
+        labels = host.split('.')
+        if len(labels) == 1:
+            # Single-label names are only hosts when they clearly address a server
+            return (HOST, text) if port is not None else (SEARCH, text)
+
+        if self.public_suffix_list.is_known_tld(labels[-1]):
+            return HOST, text
+        return SEARCH, text